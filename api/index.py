@@ -5,20 +5,19 @@ from urllib.parse import urlparse, parse_qs
 from http.server import BaseHTTPRequestHandler
 
 # Import backend modules
-from backend import models, schemas, scraper, llm, database
+from backend import models, schemas, scraper, llm, database, llm_cache, jobs, scrape_cache, singleflight, quiz_history, quiz_pipeline
 # from backend.create_tables import create_tables # Removed to prevent issues
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Ensure tables are created
-try:
-    if database.SQL_AVAILABLE and database.engine:
-        models.Base.metadata.create_all(bind=database.engine)
-        logger.info("Database tables created.")
-except Exception as e:
-    logger.error(f"Failed to create tables: {e}")
+# Ensure tables are created; requests after this only check a flag
+database.init_db()
+
+# Concurrent quiz requests for the same article (one handler thread each)
+# share one scrape/generate/save run and all get its result
+quiz_requests = singleflight.Group()
 
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
@@ -29,10 +28,18 @@ class handler(BaseHTTPRequestHandler):
                 self.send_header('Content-type', 'application/json')
                 self.end_headers()
                 self.wfile.write(json.dumps({"message": "AI Wiki Quiz Generator API is running"}).encode())
-            elif path == '/api/quizzes':
+            elif urlparse(path).path == '/api/quizzes':
                 self.handle_get_quizzes()
             elif path == '/api/debug':
                 self.handle_debug()
+            elif path == '/api/llm/status':
+                self.handle_llm_status()
+            elif path == '/api/metrics':
+                self.handle_metrics()
+            elif urlparse(path).path == '/api/autocomplete':
+                self.handle_autocomplete()
+            elif path.startswith('/api/jobs/'):
+                self.handle_get_job(path[len('/api/jobs/'):])
             elif path.startswith('/api/quiz/'):
                 parts = path.split('/')
                 if len(parts) == 4 and parts[3].isdigit():
@@ -51,6 +58,12 @@ class handler(BaseHTTPRequestHandler):
             path = self.path
             if path == '/api/quiz':
                 self.handle_generate_quiz()
+            elif path == '/api/quiz/batch':
+                self.handle_generate_batch()
+            elif path == '/api/quiz/draft':
+                self.handle_generate_draft()
+            elif path == '/api/jobs':
+                self.handle_create_job()
             else:
                 self.send_error(404, "Not Found")
         except Exception as e:
@@ -90,7 +103,7 @@ class handler(BaseHTTPRequestHandler):
             self.send_error(500, str(e))
 
     def get_db(self):
-        # Ensure tables exist
+        # Ensure tables exist (a flag check once the schema is verified)
         database.init_db()
 
         if not database.SessionLocal:
@@ -122,7 +135,11 @@ class handler(BaseHTTPRequestHandler):
             "tables": tables,
             "vercel_env": os.environ.get("VERCEL", "Not set"),
             "tmp_files": os.listdir("/tmp") if os.path.exists("/tmp") else "No /tmp",
-            "cwd": os.getcwd()
+            "cwd": os.getcwd(),
+            "llm_cache": llm_cache.stats(),
+            "llm_backends": llm.llm_router.get_router().snapshot(llm.configured_backends()),
+            "quiz_requests_in_flight": len(quiz_requests.in_flight()),
+            "schema_ready": database.schema_ready()
         }
         
         self.send_response(200)
@@ -130,6 +147,18 @@ class handler(BaseHTTPRequestHandler):
         self.end_headers()
         self.wfile.write(json.dumps(response).encode())
 
+    def handle_llm_status(self):
+        self.send_response(200)
+        self.send_header('Content-type', 'application/json')
+        self.end_headers()
+        self.wfile.write(json.dumps(llm.backend_status()).encode())
+
+    def handle_metrics(self):
+        self.send_response(200)
+        self.send_header('Content-type', 'application/json')
+        self.end_headers()
+        self.wfile.write(json.dumps(llm.metrics.summary()).encode())
+
     def handle_generate_quiz(self):
         content_length = int(self.headers['Content-Length'])
         post_data = self.rfile.read(content_length)
@@ -146,40 +175,95 @@ class handler(BaseHTTPRequestHandler):
         database.init_db()
 
         try:
-            # Scrape
-            scraped_data = scraper.scrape_wikipedia(url)
-            logger.info(f"Scraping successful. Title: {scraped_data.get('title')}")
+            fresh = bool(data.get('fresh', False))
+            key = (scrape_cache.normalize_url(url), fresh)
+            response, shared = quiz_requests.do(key, self.run_quiz_pipeline, url, fresh)
+            if shared:
+                logger.info(f"Joined in-flight quiz generation for {key[0]}")
 
-            # Generate quiz
-            quiz_data = llm.generate_quiz_data(scraped_data)
-            logger.info("Quiz generation successful")
+            self.send_response(200)
+            self.send_header('Content-type', 'application/json')
+            self.end_headers()
+            self.wfile.write(json.dumps(response).encode())
 
-            # Save to DB
-            db_quiz = None
-            db_gen = self.get_db()
-            db = next(db_gen, None)
-            if db:
-                try:
-                    db_quiz = models.Quiz(
-                        url=url,
-                        title=quiz_data.get("title"),
-                        summary=quiz_data.get("summary"),
-                        data=json.dumps(quiz_data)
-                    )
-                    db.add(db_quiz)
-                    db.commit()
-                    db.refresh(db_quiz)
-                    logger.info(f"Saved quiz to database with ID: {db_quiz.id}")
-                except Exception as e:
-                    logger.error(f"Failed to save to database: {e}")
+        except ValueError as ve:
+            logger.error(f"ValueError: {ve}")
+            self.send_error(400, str(ve))
+        except Exception as e:
+            logger.error(f"Unexpected error: {e}")
+            self.send_error(500, str(e))
+
+    def run_quiz_pipeline(self, url, fresh):
+        # Scrape, generate and save. The run is shared by every waiting
+        # request, so it uses a session of its own
+        db_gen = self.get_db()
+        db = next(db_gen, None)
+        try:
+            return quiz_pipeline.run_quiz_pipeline(db, url, fresh)
+        finally:
+            db_gen.close()
+
+    def handle_create_job(self):
+        content_length = int(self.headers['Content-Length'])
+        data = json.loads(self.rfile.read(content_length).decode('utf-8'))
+        url = data.get('url')
+
+        if not url:
+            self.send_error(400, "URL required")
+            return
 
+        database.init_db()
+        # Workers live as long as this instance stays warm; a job whose
+        # instance went away is requeued by the next one once its lease expires
+        jobs.start_workers()
+        db_gen = self.get_db()
+        db = next(db_gen, None)
+        if not db:
+            self.send_error(503, "Database not available")
+            return
+        try:
+            job = jobs.enqueue(db, url, bool(data.get('fresh', False)))
+        except ValueError as ve:
+            self.send_error(503, str(ve))
+            return
+
+        self.send_response(202)
+        self.send_header('Content-type', 'application/json')
+        self.end_headers()
+        self.wfile.write(json.dumps(jobs.job_to_dict(job)).encode())
+
+    def handle_get_job(self, job_id):
+        database.init_db()
+        jobs.start_workers()
+        db_gen = self.get_db()
+        db = next(db_gen, None)
+        job = jobs.get_job(db, job_id) if db else None
+        if job is None:
+            self.send_error(404, "Job not found")
+            return
+
+        self.send_response(200)
+        self.send_header('Content-type', 'application/json')
+        self.end_headers()
+        self.wfile.write(json.dumps(jobs.job_to_dict(job)).encode())
+
+    def handle_generate_draft(self):
+        content_length = int(self.headers['Content-Length'])
+        data = json.loads(self.rfile.read(content_length).decode('utf-8'))
+        url = data.get('url')
+
+        if not url:
+            self.send_error(400, "URL required")
+            return
+
+        try:
+            scraped_data = scraper.scrape_wikipedia(url)
+            quiz_data = llm.generate_local_quiz_data(scraped_data)
             response = {
-                "id": db_quiz.id if db_quiz else None,
                 "url": url,
                 "title": quiz_data.get("title"),
                 "summary": quiz_data.get("summary"),
                 "data": quiz_data,
-                "created_at": db_quiz.created_at.isoformat() if db_quiz else None
             }
 
             self.send_response(200)
@@ -194,10 +278,79 @@ class handler(BaseHTTPRequestHandler):
             logger.error(f"Unexpected error: {e}")
             self.send_error(500, str(e))
 
+    def handle_generate_batch(self):
+        content_length = int(self.headers['Content-Length'])
+        data = json.loads(self.rfile.read(content_length).decode('utf-8'))
+        urls = list(dict.fromkeys(u.strip() for u in data.get('urls') or [] if u and u.strip()))
+        max_urls = int(os.getenv("QUIZ_BATCH_MAX_URLS", "20"))
+
+        if not urls:
+            self.send_error(400, "At least one URL is required")
+            return
+        if len(urls) > max_urls:
+            self.send_error(400, f"At most {max_urls} URLs per batch")
+            return
+
+        logger.info(f"Received batch quiz request for {len(urls)} URLs")
+        database.init_db()
+
+        try:
+            scraped = {r["url"]: r for r in scraper.scrape_many(urls)}
+            ready = [url for url in urls if scraped[url]["data"]]
+            quiz_results = llm.generate_quiz_batch(
+                [scraped[url]["data"] for url in ready], use_cache=not data.get('fresh', False)
+            ) if ready else []
+            generated = dict(zip(ready, quiz_results))
+
+            db_gen = self.get_db()
+            db = next(db_gen, None)
+            response = []
+            for url in urls:
+                quiz_data = generated.get(url)
+                if quiz_data is None or "error" in quiz_data:
+                    response.append({"url": url, "error": quiz_data["error"] if quiz_data else scraped[url]["error"]})
+                    continue
+                db_quiz = quiz_pipeline.save_quiz(db, url, quiz_data) if db else None
+                response.append(quiz_pipeline.quiz_response(url, quiz_data, db_quiz))
+            db_gen.close()
+
+            self.send_response(200)
+            self.send_header('Content-type', 'application/json')
+            self.end_headers()
+            self.wfile.write(json.dumps(response).encode())
+
+        except ValueError as ve:
+            logger.error(f"ValueError: {ve}")
+            self.send_error(400, str(ve))
+        except Exception as e:
+            logger.error(f"Unexpected error: {e}")
+            self.send_error(500, str(e))
+
+    def handle_autocomplete(self):
+        params = parse_qs(urlparse(self.path).query)
+        prefix = params.get('q', [''])[0]
+        try:
+            limit = max(1, min(int(params.get('limit', ['10'])[0]), 20))
+        except ValueError:
+            limit = 10
+
+        result = scraper.autocomplete_topics(prefix, limit) if prefix.strip() else []
+
+        self.send_response(200)
+        self.send_header('Content-type', 'application/json')
+        self.end_headers()
+        self.wfile.write(json.dumps(result).encode())
+
     def handle_get_quizzes(self):
-        # Ensure tables exist
-        if database.SQL_AVAILABLE and database.engine:
-            models.Base.metadata.create_all(bind=database.engine)
+        params = parse_qs(urlparse(self.path).query)
+        cursor = params.get('cursor', [None])[0]
+        view = params.get('view', ['full'])[0]
+        try:
+            limit = int(params.get('limit', ['10'])[0])
+            skip = int(params.get('skip', ['0'])[0])
+        except ValueError:
+            self.send_error(400, "limit and skip must be integers")
+            return
 
         db_gen = self.get_db()
         db = next(db_gen, None)
@@ -208,21 +361,16 @@ class handler(BaseHTTPRequestHandler):
             self.wfile.write(json.dumps([]).encode())
             return
 
-        quizzes = db.query(models.Quiz).order_by(models.Quiz.created_at.desc()).limit(10).all()
-        result = []
-        for q in quizzes:
-            result.append({
-                "id": q.id,
-                "url": q.url,
-                "title": q.title,
-                "summary": q.summary,
-                "data": json.loads(q.data) if isinstance(q.data, str) else q.data,
-                "user_answers": json.loads(q.user_answers) if isinstance(q.user_answers, str) and q.user_answers else q.user_answers,
-                "created_at": q.created_at.isoformat()
-            })
+        try:
+            result, next_cursor = quiz_history.list_quizzes(db, limit, cursor, view, skip)
+        except ValueError as ve:
+            self.send_error(400, str(ve))
+            return
 
         self.send_response(200)
         self.send_header('Content-type', 'application/json')
+        if next_cursor:
+            self.send_header('X-Next-Cursor', next_cursor)
         self.end_headers()
         self.wfile.write(json.dumps(result).encode())
 
@@ -233,31 +381,34 @@ class handler(BaseHTTPRequestHandler):
             self.send_error(503, "Database not available")
             return
 
+        # Revalidation only needs the row's version and token, not the quiz data
+        row = db.query(models.Quiz.version, models.Quiz.etag_token).filter(models.Quiz.id == quiz_id).first()
+        if not row:
+            self.send_error(404, "Quiz not found")
+            return
+        etag = quiz_history.quiz_etag(quiz_id, row.version, row.etag_token)
+        if quiz_history.etag_matches(self.headers.get('If-None-Match'), etag):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', quiz_history.QUIZ_CACHE_CONTROL)
+            self.end_headers()
+            return
+
         quiz = db.query(models.Quiz).filter(models.Quiz.id == quiz_id).first()
         if not quiz:
             self.send_error(404, "Quiz not found")
             return
 
-        result = {
-            "id": quiz.id,
-            "url": quiz.url,
-            "title": quiz.title,
-            "summary": quiz.summary,
-            "data": json.loads(quiz.data) if isinstance(quiz.data, str) else quiz.data,
-            "user_answers": json.loads(quiz.user_answers) if isinstance(quiz.user_answers, str) and quiz.user_answers else quiz.user_answers,
-            "created_at": quiz.created_at.isoformat()
-        }
+        result = quiz_history.quiz_to_dict(quiz)
 
         self.send_response(200)
         self.send_header('Content-type', 'application/json')
+        self.send_header('ETag', quiz_history.quiz_etag(quiz.id, quiz.version, quiz.etag_token))
+        self.send_header('Cache-Control', quiz_history.QUIZ_CACHE_CONTROL)
         self.end_headers()
         self.wfile.write(json.dumps(result).encode())
 
     def handle_delete_quiz(self, quiz_id):
-        # Ensure tables exist
-        if database.SQL_AVAILABLE and database.engine:
-            models.Base.metadata.create_all(bind=database.engine)
-
         db_gen = self.get_db()
         db = next(db_gen, None)
         if not db:
@@ -284,10 +435,6 @@ class handler(BaseHTTPRequestHandler):
         data = json.loads(post_data.decode('utf-8'))
         user_answers = data.get("user_answers", {})
 
-        # Ensure tables exist
-        if database.SQL_AVAILABLE and database.engine:
-            models.Base.metadata.create_all(bind=database.engine)
-
         db_gen = self.get_db()
         db = next(db_gen, None)
         if not db:
@@ -308,6 +455,9 @@ class handler(BaseHTTPRequestHandler):
 
         quiz.data = json.dumps(quiz_data)
         quiz.user_answers = json.dumps(user_answers)
+        quiz.score = quiz_history.score_answers(quiz_data, user_answers)
+        # Changes the quiz's ETag, so cached copies are refetched
+        quiz.version = (quiz.version or 1) + 1
 
         db.commit()
         db.refresh(quiz)
@@ -316,12 +466,5 @@ class handler(BaseHTTPRequestHandler):
         self.send_response(200)
         self.send_header('Content-type', 'application/json')
         self.end_headers()
-        self.wfile.write(json.dumps({"message": "Results saved successfully", "quiz": {
-            "id": quiz.id,
-            "url": quiz.url,
-            "title": quiz.title,
-            "summary": quiz.summary,
-            "data": json.loads(quiz.data) if isinstance(quiz.data, str) else quiz.data,
-            "user_answers": json.loads(quiz.user_answers) if isinstance(quiz.user_answers, str) and quiz.user_answers else quiz.user_answers,
-            "created_at": quiz.created_at.isoformat()
-        }}).encode())
+        self.wfile.write(json.dumps({"message": "Results saved successfully",
+                                     "quiz": quiz_history.quiz_to_dict(quiz)}).encode())
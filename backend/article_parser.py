@@ -0,0 +1,193 @@
+import os
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+# Which HTML engine extracts article fields: "bs4" (pure Python, html.parser),
+# "lxml" (C-backed) or "auto" (lxml when installed, bs4 otherwise). bs4 is
+# the default because the engines repair malformed markup differently (see
+# extract_article); opt in to lxml where pages are known to be well-formed.
+HTML_PARSER = os.getenv("HTML_PARSER", "bs4").lower()
+
+# Same limits the original scraper used. Raising MAX_CONTENT_SECTIONS gives
+# the prompt's context packer (context_packer.py) more sections to choose from.
+MAX_CONTENT_SECTIONS = int(os.getenv("MAX_CONTENT_SECTIONS", "3"))  # Intro + 3 sections
+FALLBACK_TEXT_CHARS = 6000
+
+
+def get_engine(engine: str = None) -> str:
+    """Resolve the configured engine name to "bs4" or "lxml"."""
+    engine = (engine or HTML_PARSER).lower()
+    if engine == "auto":
+        return "lxml" if LXML_AVAILABLE else "bs4"
+    if engine == "lxml" and not LXML_AVAILABLE:
+        raise ValueError("HTML_PARSER is set to 'lxml' but lxml is not installed")
+    if engine not in ("bs4", "lxml"):
+        raise ValueError(f"Unknown HTML parser engine: {engine}")
+    return engine
+
+
+def extract_article(content, engine: str = None) -> dict:
+    """
+    Extract title, summary, sections and full_text from rendered Wikipedia
+    article HTML. On well-formed markup, like the pages in
+    sample_data/pages, both engines return identical results. On malformed
+    markup they can differ: lxml closes an unclosed <p> at the next <p>
+    or at a block element inside it, and drops CDATA text, where
+    html.parser keeps it all in the paragraph.
+    """
+    if get_engine(engine) == "lxml":
+        return _extract_lxml(content)
+    return _extract_bs4(content)
+
+
+def _extract_bs4(content) -> dict:
+    soup = BeautifulSoup(content, 'html.parser')
+
+    # Extract title
+    title_tag = soup.find('h1', {'id': 'firstHeading'})
+    title = title_tag.get_text(strip=True) if title_tag else "Unknown Title"
+
+    # Extract summary (first paragraph)
+    summary_paragraph = soup.find('p', class_=lambda x: x != 'mw-empty-elt')
+    summary = summary_paragraph.get_text(strip=True) if summary_paragraph else ""
+
+    # Extract sections (headings)
+    sections = []
+    for heading in soup.find_all(['h2', 'h3'], {'class': 'mw-headline'}):
+        sections.append(heading.get_text(strip=True))
+
+    # Extract content from introduction and first few sections only for speed
+    content_text = ""
+
+    # 1. Get introduction (paragraphs before first h2)
+    intro_div = soup.find('div', {'id': 'mw-content-text'})
+    if intro_div:
+        parser_output = intro_div.find('div', {'class': 'mw-parser-output'})
+        if parser_output:
+            # Get direct paragraphs until first h2
+            for element in parser_output.children:
+                if element.name == 'h2':
+                    break
+                if element.name == 'p':
+                    content_text += element.get_text(strip=True) + "\n\n"
+
+            # 2. Get the first few main sections
+            sections_count = 0
+            for element in parser_output.find_all(['h2', 'p', 'h3']):
+                if element.name == 'h2':
+                    sections_count += 1
+                    if sections_count > MAX_CONTENT_SECTIONS:
+                        break
+                    content_text += f"\n## {element.get_text(strip=True)}\n"
+                elif element.name in ['p', 'h3']:
+                    content_text += element.get_text(strip=True) + "\n"
+
+    # Fallback if sophisticated parsing fails
+    if not content_text:
+        content_text = soup.get_text()[:FALLBACK_TEXT_CHARS]
+
+    return {
+        "title": title,
+        "summary": summary,
+        "sections": sections,
+        "full_text": content_text
+    }
+
+
+# --- lxml engine ---------------------------------------------------------
+# Mirrors BeautifulSoup's get_text(strip=True) semantics: comments and the
+# contents of <script>/<style> are not text, tails always are.
+
+_SKIP_TEXT_TAGS = {"script", "style"}
+
+
+def _iter_strings(element):
+    if isinstance(element.tag, str) and element.tag not in _SKIP_TEXT_TAGS and element.text:
+        yield element.text
+    for child in element:
+        yield from _iter_strings(child)
+        if child.tail:
+            yield child.tail
+
+
+def _text(element) -> str:
+    return "".join(s.strip() for s in _iter_strings(element) if s.strip())
+
+
+def _classes(element):
+    return (element.get("class") or "").split()
+
+
+def _is_summary_paragraph(element) -> bool:
+    # Equivalent of class_=lambda x: x != 'mw-empty-elt' in BeautifulSoup:
+    # only a paragraph whose class is exactly "mw-empty-elt" is skipped.
+    cls = element.get("class")
+    return cls is None or cls.split() != ["mw-empty-elt"]
+
+
+def _extract_lxml(content) -> dict:
+    if isinstance(content, bytes):
+        # Wikipedia always serves UTF-8; don't let lxml guess
+        parser = lxml.html.HTMLParser(encoding="utf-8")
+        root = lxml.html.document_fromstring(content, parser=parser)
+    else:
+        root = lxml.html.document_fromstring(content)
+
+    title = "Unknown Title"
+    for h1 in root.iter("h1"):
+        if h1.get("id") == "firstHeading":
+            title = _text(h1)
+            break
+
+    summary = ""
+    for p in root.iter("p"):
+        if _is_summary_paragraph(p):
+            summary = _text(p)
+            break
+
+    sections = [
+        _text(heading)
+        for heading in root.iter("h2", "h3")
+        if "mw-headline" in _classes(heading)
+    ]
+
+    content_text = ""
+    intro_div = next((d for d in root.iter("div") if d.get("id") == "mw-content-text"), None)
+    if intro_div is not None:
+        parser_output = next(
+            (d for d in intro_div.iterdescendants("div") if "mw-parser-output" in _classes(d)),
+            None
+        )
+        if parser_output is not None:
+            for element in parser_output:
+                if element.tag == "h2":
+                    break
+                if element.tag == "p":
+                    content_text += _text(element) + "\n\n"
+
+            sections_count = 0
+            for element in parser_output.iter("h2", "p", "h3"):
+                if element.tag == "h2":
+                    sections_count += 1
+                    if sections_count > MAX_CONTENT_SECTIONS:
+                        break
+                    content_text += f"\n## {_text(element)}\n"
+                else:
+                    content_text += _text(element) + "\n"
+
+    if not content_text:
+        # Rare path (not an article layout). Whitespace handling of the raw
+        # document text differs between parsers, so defer to BeautifulSoup.
+        content_text = BeautifulSoup(content, 'html.parser').get_text()[:FALLBACK_TEXT_CHARS]
+
+    return {
+        "title": title,
+        "summary": summary,
+        "sections": sections,
+        "full_text": content_text
+    }
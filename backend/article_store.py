@@ -0,0 +1,137 @@
+"""
+Compact read-only article store built from a Wikipedia dump.
+
+Layout of a store directory:
+    articles.dat  concatenated UTF-8 JSON records, one per article
+    index.bin     open-addressing hash table mapping a title key to the
+                  (offset, length) of its record in articles.dat
+
+Both files are memory-mapped, so opening a store is instant whatever its
+size, and a lookup is one hash, a probe or two in index.bin and one slice
+of articles.dat - no network and no index loading.
+"""
+
+import os
+import mmap
+import json
+import struct
+import hashlib
+from urllib.parse import urlsplit, unquote
+
+INDEX_MAGIC = b"WQAS"
+INDEX_VERSION = 1
+HEADER = struct.Struct("<4sII")  # magic, version, slot count
+# 128-bit key hash (all zero = empty), record offset, record length. At 128
+# bits a collision between two titles is not a practical concern, so slots
+# don't store the title itself.
+SLOT = struct.Struct("<QQQQ")
+
+DATA_FILE = "articles.dat"
+INDEX_FILE = "index.bin"
+
+
+def title_key(title: str) -> str:
+    """Canonical lookup key: spaces for underscores, first letter upper-cased."""
+    title = title.replace("_", " ").strip()
+    title = " ".join(title.split())
+    return title[:1].upper() + title[1:]
+
+
+def url_key(url: str) -> str:
+    path = urlsplit(url).path
+    if "/wiki/" not in path:
+        raise ValueError(f"Not a Wikipedia article URL: {url}")
+    return title_key(unquote(path.split("/wiki/", 1)[1]))
+
+
+def key_hash(key: str):
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+    high = int.from_bytes(digest[:8], "little") or 1  # 0 marks an empty slot
+    low = int.from_bytes(digest[8:], "little")
+    return high, low
+
+
+def write_index(path: str, entries) -> None:
+    """
+    Write index.bin for entries, a list of (key, offset, length). The table
+    is kept at most half full so probes stay short.
+    """
+    slot_count = 8
+    while slot_count < len(entries) * 2:
+        slot_count *= 2
+    table = bytearray(SLOT.size * slot_count)
+    mask = slot_count - 1
+
+    for key, offset, length in entries:
+        high, low = key_hash(key)
+        slot = high & mask
+        while True:
+            existing, _, _, _ = SLOT.unpack_from(table, slot * SLOT.size)
+            if existing == 0:
+                SLOT.pack_into(table, slot * SLOT.size, high, low, offset, length)
+                break
+            slot = (slot + 1) & mask
+
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(INDEX_MAGIC, INDEX_VERSION, slot_count))
+        f.write(table)
+
+
+class ArticleStore:
+    """Read-only view of a store directory produced by dump_ingest.py."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._data_file = open(os.path.join(directory, DATA_FILE), "rb")
+        self._index_file = open(os.path.join(directory, INDEX_FILE), "rb")
+        self._data = mmap.mmap(self._data_file.fileno(), 0, access=mmap.ACCESS_READ) \
+            if os.path.getsize(self._data_file.name) else b""
+        self._index = mmap.mmap(self._index_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self._slot_count = HEADER.unpack_from(self._index, 0)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            raise ValueError(f"Not an article store index: {self._index_file.name}")
+        self._mask = self._slot_count - 1
+
+    def __len__(self):
+        count = 0
+        for slot in range(self._slot_count):
+            if SLOT.unpack_from(self._index, HEADER.size + slot * SLOT.size)[0]:
+                count += 1
+        return count
+
+    def get(self, title: str):
+        """Scraper output dict for an article title (or redirect title), or None."""
+        high, low = key_hash(title_key(title))
+        slot = high & self._mask
+        for _ in range(self._slot_count):
+            stored_high, stored_low, offset, length = SLOT.unpack_from(
+                self._index, HEADER.size + slot * SLOT.size
+            )
+            if stored_high == 0:
+                return None
+            if stored_high == high and stored_low == low:
+                return json.loads(self._data[offset:offset + length].decode("utf-8"))
+            slot = (slot + 1) & self._mask
+        return None
+
+    def get_by_url(self, url: str):
+        return self.get(url_key(url))
+
+    def close(self):
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._index.close()
+        self._data_file.close()
+        self._index_file.close()
+
+
+_store = None
+
+
+def get_store(directory: str):
+    """Process-wide store for directory, opened on first use."""
+    global _store
+    if _store is None or _store.directory != directory:
+        _store = ArticleStore(directory)
+    return _store
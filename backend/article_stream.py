@@ -0,0 +1,227 @@
+import codecs
+from html.parser import HTMLParser
+
+try:
+    from .article_parser import MAX_CONTENT_SECTIONS, FALLBACK_TEXT_CHARS
+except ImportError:
+    from article_parser import MAX_CONTENT_SECTIONS, FALLBACK_TEXT_CHARS
+
+CHUNK_SIZE = 16 * 1024
+
+# Elements that never get an end tag (mirrors BeautifulSoup's html.parser builder)
+VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "keygen",
+    "link", "menuitem", "meta", "param", "source", "track", "wbr", "basefont",
+    "bgsound", "command", "frame", "image", "isindex", "nextid", "spacer",
+}
+SKIP_TEXT_TAGS = {"script", "style"}
+
+
+class StreamingArticleExtractor(HTMLParser):
+    """
+    Event-based extractor for Wikipedia article HTML.
+
+    Feed it the document in chunks; it keeps only the title, the first
+    paragraph, the intro and the first max_sections h2 sections, and sets
+    done as soon as the next h2 starts so the caller can stop reading.
+
+    Output differs slightly from article_parser.extract_article: the intro
+    is "paragraphs before the first h2" wherever the h2 sits, the intro
+    paragraphs are not repeated in the section text, and sections lists
+    only the headings before the cutoff (the full parse lists every
+    heading on the page), since nothing after it is read.
+    """
+
+    def __init__(self, max_sections: int = MAX_CONTENT_SECTIONS):
+        super().__init__(convert_charrefs=True)
+        self.max_sections = max_sections
+        self.done = False
+
+        self.title = None
+        self.summary = None
+        self.sections = []
+        self.intro_text = ""
+        self.section_text = ""
+        self.fallback_text = ""
+
+        self._pending = []  # Text seen since the last markup event
+        self._stack = []  # Open tag names
+        self._skip_depth = 0  # >0 while inside <script>/<style>
+        self._content_depth = None  # Stack depth of div#mw-content-text
+        self._output_depth = None  # Stack depth of div.mw-parser-output
+        self._h2_count = 0
+        self._capture = None  # (kind, stack depth, parts) of the element being read
+
+    # --- tree bookkeeping ---------------------------------------------------
+
+    def handle_starttag(self, tag, attrs):
+        self._flush_text()
+        if self.done:
+            return
+        attrs = dict(attrs)
+        if tag in VOID_ELEMENTS:
+            return
+
+        self._stack.append(tag)
+        depth = len(self._stack)
+        classes = (attrs.get("class") or "").split()
+
+        if tag in SKIP_TEXT_TAGS:
+            self._skip_depth += 1
+
+        if tag == "div":
+            if self._content_depth is None and attrs.get("id") == "mw-content-text":
+                self._content_depth = depth
+            elif (self._content_depth is not None and self._output_depth is None
+                  and "mw-parser-output" in classes):
+                self._output_depth = depth
+
+        if self._capture is not None:
+            return
+
+        if self._output_depth is not None and tag == "h2":
+            self._h2_count += 1
+            if self._h2_count > self.max_sections:
+                # Checked before anything is captured, so the heading that
+                # ends the parse is not half-read into sections
+                self.done = True
+                return
+
+        if tag == "h1" and self.title is None and attrs.get("id") == "firstHeading":
+            self._capture = ("title", depth, [])
+        elif tag == "p" and self.summary is None and (
+                attrs.get("class") is None or classes != ["mw-empty-elt"]):
+            self._capture = ("summary", depth, [])
+        elif tag in ("h2", "h3") and "mw-headline" in classes:
+            self._capture = ("section", depth, [])
+
+        if self._output_depth is not None and tag in ("h2", "h3", "p"):
+            if self._capture is None:
+                self._capture = (tag, depth, [])
+            else:
+                # Summary/section heading doubles as body content
+                self._capture = (f"{self._capture[0]}+{tag}", depth, self._capture[2])
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        self._flush_text()
+        if self.done or tag not in self._stack:
+            return
+        # Pop up to and including the matching open tag
+        while self._stack:
+            open_tag = self._stack.pop()
+            depth = len(self._stack) + 1
+            if open_tag in SKIP_TEXT_TAGS:
+                self._skip_depth -= 1
+            if self._capture is not None and self._capture[1] == depth:
+                self._finish_capture()
+            if self._output_depth == depth:
+                # End of the article body, nothing more to collect
+                self._output_depth = None
+                self.done = True
+            if self._content_depth == depth:
+                self._content_depth = None
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        # A text node can arrive in several pieces when it spans feed() chunks
+        if not self.done:
+            self._pending.append(data)
+
+    def handle_comment(self, data):
+        self._flush_text()
+
+    def handle_decl(self, decl):
+        self._flush_text()
+
+    def handle_pi(self, data):
+        self._flush_text()
+
+    def _flush_text(self):
+        if not self._pending:
+            return
+        text = "".join(self._pending)
+        self._pending = []
+        if self._skip_depth:
+            return
+        if len(self.fallback_text) < FALLBACK_TEXT_CHARS:
+            if not text.strip():
+                # BeautifulSoup collapses whitespace-only strings the same way
+                text = "\n" if "\n" in text else " "
+            self.fallback_text += text
+        if self._capture is not None:
+            stripped = text.strip()
+            if stripped:
+                self._capture[2].append(stripped)
+
+    # --- field assembly -----------------------------------------------------
+
+    def _finish_capture(self):
+        kinds, _, parts = self._capture
+        self._capture = None
+        text = "".join(parts)
+        for kind in kinds.split("+"):
+            if kind == "title":
+                self.title = text
+            elif kind == "summary":
+                self.summary = text
+            elif kind == "section" and text:
+                self.sections.append(text)
+            elif kind == "h2":
+                self.section_text += f"\n## {text}\n"
+            elif kind == "p" and self._h2_count == 0:
+                self.intro_text += text + "\n\n"
+            elif kind in ("p", "h3"):
+                self.section_text += text + "\n"
+
+    def fields(self) -> dict:
+        self._flush_text()
+        if self._capture is not None:
+            self._finish_capture()
+        content_text = self.intro_text + self.section_text
+        if not content_text:
+            content_text = self.fallback_text[:FALLBACK_TEXT_CHARS]
+        return {
+            "title": self.title if self.title is not None else "Unknown Title",
+            "summary": self.summary or "",
+            "sections": self.sections,
+            "full_text": content_text
+        }
+
+
+def extract_streaming(response, max_sections: int = MAX_CONTENT_SECTIONS) -> dict:
+    """
+    Read a streamed requests response incrementally and extract the article
+    fields, closing the connection as soon as enough content has been seen.
+    """
+    extractor = StreamingArticleExtractor(max_sections=max_sections)
+    # requests assumes ISO-8859-1 when no charset is given; Wikipedia is UTF-8
+    content_type = response.headers.get("Content-Type", "").lower()
+    encoding = response.encoding if "charset" in content_type and response.encoding else "utf-8"
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    try:
+        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+            extractor.feed(decoder.decode(chunk))
+            if extractor.done:
+                break
+        else:
+            extractor.feed(decoder.decode(b"", final=True))
+            extractor.close()
+    finally:
+        response.close()
+    return extractor.fields()
+
+
+def extract_streaming_text(chunks, max_sections: int = MAX_CONTENT_SECTIONS) -> dict:
+    """Same as extract_streaming, for an iterable of already-decoded text chunks."""
+    extractor = StreamingArticleExtractor(max_sections=max_sections)
+    for chunk in chunks:
+        extractor.feed(chunk)
+        if extractor.done:
+            break
+    return extractor.fields()
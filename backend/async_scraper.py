@@ -0,0 +1,152 @@
+import asyncio
+import codecs
+import datetime
+
+try:
+    from . import scraper, scrape_cache, http_client, article_stream
+except ImportError:
+    import scraper
+    import scrape_cache
+    import http_client
+    import article_stream
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+DNS_ERROR_MARKERS = ("name resolution", "getaddrinfo failed", "failed to resolve", "name or service not known")
+
+
+def log_to_file(message):
+    try:
+        with open("debug_log.txt", "a", encoding="utf-8") as f:
+            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            f.write(f"[{timestamp}] [ASYNC SCRAPER] {message}\n")
+    except Exception:
+        pass
+
+
+async def scrape_wikipedia_async(url: str, mode: str = None) -> dict:
+    """
+    Async counterpart of scraper.scrape_wikipedia with the same output and
+    error messages. Network I/O and retry backoff never block the event loop,
+    and HTML parsing runs in a worker thread.
+    Without httpx installed it runs the sync scraper in a thread instead.
+    """
+    if not http_client.HTTPX_AVAILABLE or (mode or scraper.SCRAPE_MODE).lower() in ("api", "dump"):
+        # API mode is a small JSON call on the shared session and dump mode a
+        # local lookup; both just run in a thread
+        return await asyncio.to_thread(scraper.scrape_wikipedia, url, mode)
+
+    import httpx
+
+    max_retries = 3
+    retry_delay = 2  # seconds
+    mode = (mode or scraper.SCRAPE_MODE).lower()
+    if mode not in scraper.SCRAPE_MODES:
+        raise ValueError(f"Unknown scrape mode: {mode}")
+    cache_variant = None if mode == "html" else mode
+
+    log_to_file(f"Scraping URL: {url} (mode={mode})")
+
+    cached = await asyncio.to_thread(scrape_cache.get_entry, url, cache_variant)
+    if cached and scrape_cache.is_fresh(cached):
+        log_to_file(f"Cache hit (fresh): {url}")
+        return cached["data"]
+
+    headers = dict(scraper.REQUEST_HEADERS)
+    if cached:
+        headers.update(scrape_cache.conditional_headers(cached))
+
+    client = http_client.get_async_client()
+    last_error = None
+
+    for attempt in range(max_retries):
+        try:
+            async with client.stream("GET", url, headers=headers) as response:
+                if response.status_code == 304 and cached:
+                    log_to_file(f"Cache hit (revalidated): {url}")
+                    await asyncio.to_thread(scrape_cache.mark_revalidated, url, cached, cache_variant)
+                    return cached["data"]
+
+                if response.status_code in RETRY_STATUSES and attempt < max_retries - 1:
+                    last_error = f"HTTP {response.status_code}"
+                    await asyncio.sleep(retry_delay * (attempt + 1))
+                    continue
+                _raise_for_status(url, response.status_code)
+
+                if mode == "stream":
+                    fields = await _extract_streaming(response)
+                    result = scraper.build_scrape_result(fields)
+                else:
+                    content = await response.aread()
+                    result = await asyncio.to_thread(scraper.parse_article_html, content)
+
+                etag = response.headers.get("ETag")
+                last_modified = response.headers.get("Last-Modified")
+
+            await asyncio.to_thread(
+                scrape_cache.store, url, result, etag, last_modified, cache_variant
+            )
+            return result
+
+        except httpx.TimeoutException as e:
+            last_error = e
+            if attempt < max_retries - 1:
+                await asyncio.sleep(retry_delay * (attempt + 1))
+                continue
+            raise ValueError(
+                f"Connection timeout while scraping {url}. "
+                "Please check your internet connection and try again."
+            )
+        except httpx.TransportError as e:
+            last_error = e
+            if attempt < max_retries - 1:
+                await asyncio.sleep(retry_delay * (attempt + 1))
+                continue
+            if any(marker in str(e).lower() for marker in DNS_ERROR_MARKERS):
+                raise ValueError(
+                    f"Network connection error: Cannot resolve Wikipedia domain.\n"
+                    "Possible causes:\n"
+                    "1. No internet connection\n"
+                    "2. DNS server issues\n"
+                    "3. Firewall blocking access\n"
+                    "4. VPN or proxy issues\n\n"
+                    "Please check your internet connection and try again."
+                )
+            raise ValueError(
+                f"Connection error while scraping {url}: {str(e)}\n"
+                "Please check your internet connection and try again."
+            )
+        except ValueError:
+            raise
+        except Exception as e:
+            raise ValueError(f"Failed to scrape {url}: {str(e)}")
+
+    raise ValueError(
+        f"Failed to scrape {url} after {max_retries} attempts ({last_error}). "
+        "Please check your internet connection."
+    )
+
+
+def _raise_for_status(url: str, status_code: int) -> None:
+    if status_code < 400:
+        return
+    if status_code == 404:
+        raise ValueError(f"Wikipedia page not found: {url}\nPlease check the URL and try again.")
+    if status_code == 403:
+        raise ValueError(f"Access forbidden: {url}\nWikipedia may be blocking the request.")
+    raise ValueError(f"HTTP error {status_code} while scraping {url}")
+
+
+async def _extract_streaming(response) -> dict:
+    # Feeding a 16 KB chunk to the event parser takes well under a millisecond,
+    # so this runs on the loop; leaving the block closes the connection early.
+    extractor = article_stream.StreamingArticleExtractor()
+    content_type = response.headers.get("Content-Type", "").lower()
+    encoding = response.encoding if "charset" in content_type and response.encoding else "utf-8"
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    async for chunk in response.aiter_bytes(article_stream.CHUNK_SIZE):
+        extractor.feed(decoder.decode(chunk))
+        if extractor.done:
+            return extractor.fields()
+    extractor.feed(decoder.decode(b"", final=True))
+    extractor.close()
+    return extractor.fields()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Scrape a list of Wikipedia URLs in parallel.
+
+Usage:
+    python bulk_scrape.py urls.txt [--concurrency 8] [--per-host 4] [--mode html|stream] [--output out.jsonl]
+
+The input file has one URL per line (blank lines and lines starting with #
+are skipped). Results are written as JSON lines in completion order, one
+{"url", "data", "error"} object per URL.
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+# Add the backend directory to the path so we can import modules
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+from scraper import scrape_many, SCRAPE_MODES
+
+
+def read_urls(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.strip().startswith("#")]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape many Wikipedia articles in parallel.")
+    parser.add_argument("url_file", help="File with one Wikipedia URL per line")
+    parser.add_argument("--concurrency", type=int, default=8, help="Maximum pages fetched at once")
+    parser.add_argument("--per-host", type=int, default=4, help="Maximum pages fetched at once per host")
+    parser.add_argument("--mode", choices=SCRAPE_MODES, default=None, help="Scrape mode (default: SCRAPE_MODE)")
+    parser.add_argument("--output", help="Write JSON lines here instead of stdout")
+    args = parser.parse_args(argv)
+
+    urls = read_urls(args.url_file)
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+
+    start = time.time()
+    ok = failed = 0
+    try:
+        for result in scrape_many(urls, concurrency=args.concurrency, per_host=args.per_host, mode=args.mode):
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            out.flush()
+            if result["error"]:
+                failed += 1
+                print(f"FAILED {result['url']}: {result['error']}", file=sys.stderr)
+            else:
+                ok += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(f"Scraped {ok} of {len(urls)} URLs ({failed} failed) in {time.time() - start:.1f}s", file=sys.stderr)
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+import os
+import time
+import threading
+import datetime
+from collections import deque
+
+# Open the circuit when at least this fraction of the last CIRCUIT_WINDOW
+# calls failed (and there were at least CIRCUIT_MIN_CALLS of them)
+FAILURE_RATE_THRESHOLD = float(os.getenv("CIRCUIT_FAILURE_RATE", "0.5"))
+MIN_CALLS = int(os.getenv("CIRCUIT_MIN_CALLS", "5"))
+WINDOW = int(os.getenv("CIRCUIT_WINDOW", "20"))
+# Seconds an open circuit waits before letting a probe through; doubled
+# after every failed probe, up to CIRCUIT_MAX_COOLDOWN
+COOLDOWN = float(os.getenv("CIRCUIT_COOLDOWN", "30"))
+MAX_COOLDOWN = float(os.getenv("CIRCUIT_MAX_COOLDOWN", "300"))
+# Calls allowed through at once while half-open
+HALF_OPEN_PROBES = int(os.getenv("CIRCUIT_HALF_OPEN_PROBES", "1"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def log_to_file(message):
+    try:
+        with open("debug_log.txt", "a", encoding="utf-8") as f:
+            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            f.write(f"[{timestamp}] [CIRCUIT] {message}\n")
+    except Exception:
+        pass
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a backend whose circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Failure tracking for one model.
+
+    closed: calls go through and their outcomes are kept in a sliding
+    window; too high a failure rate opens the circuit. open: calls are
+    refused without a request until the cool-down has passed. half_open:
+    a limited number of probe calls go through; a success closes the
+    circuit, a failure opens it again with a longer cool-down.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._outcomes = deque(maxlen=WINDOW)  # True per success, False per failure
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._cooldown = COOLDOWN
+        self._probes = 0
+        self._rejected = 0
+
+    def available(self) -> bool:
+        """Whether a call would be let through now, without claiming a slot."""
+        with self._lock:
+            if self._state_at(time.time()) == OPEN:
+                return False
+            return self._state != HALF_OPEN or self._probes < HALF_OPEN_PROBES
+
+    def acquire(self) -> bool:
+        """Claim permission for one call. Every True must be followed by record()."""
+        with self._lock:
+            state = self._state_at(time.time())
+            if state == HALF_OPEN and self._state == OPEN:
+                self._state = HALF_OPEN
+                self._probes = 0
+                log_to_file(f"{self.name} half-open, probing")
+            if state == OPEN or (state == HALF_OPEN and self._probes >= HALF_OPEN_PROBES):
+                self._rejected += 1
+                return False
+            if state == HALF_OPEN:
+                self._probes += 1
+            return True
+
+    def record(self, ok: bool) -> None:
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probes = max(0, self._probes - 1)
+                if ok:
+                    self._state = CLOSED
+                    self._outcomes.clear()
+                    self._cooldown = COOLDOWN
+                    log_to_file(f"{self.name} closed after successful probe")
+                else:
+                    self._cooldown = min(MAX_COOLDOWN, self._cooldown * 2)
+                    self._open()
+                return
+
+            self._outcomes.append(ok)
+            if self._state == CLOSED and len(self._outcomes) >= MIN_CALLS:
+                failures = self._outcomes.count(False)
+                if failures / len(self._outcomes) >= FAILURE_RATE_THRESHOLD:
+                    self._open()
+
+    def release(self) -> None:
+        """Give back an acquired slot without an outcome (the caller gave up)."""
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probes = max(0, self._probes - 1)
+
+    def status(self) -> dict:
+        with self._lock:
+            now = time.time()
+            state = self._state_at(now)
+            failures = self._outcomes.count(False)
+            return {
+                "state": state,
+                "failure_rate": round(failures / len(self._outcomes), 3) if self._outcomes else 0.0,
+                "window_calls": len(self._outcomes),
+                "rejected": self._rejected,
+                "retry_in": round(max(0.0, self._opened_at + self._cooldown - now), 1) if state == OPEN else 0.0,
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._outcomes.clear()
+            self._state = CLOSED
+            self._cooldown = COOLDOWN
+            self._probes = 0
+            self._rejected = 0
+
+    def _open(self):
+        self._state = OPEN
+        self._opened_at = time.time()
+        self._outcomes.clear()
+        log_to_file(f"{self.name} opened for {self._cooldown:.0f}s")
+
+    def _state_at(self, now: float) -> str:
+        # An open circuit whose cool-down has passed is due a probe
+        if self._state == OPEN and now - self._opened_at >= self._cooldown:
+            return HALF_OPEN
+        return self._state
+
+
+_lock = threading.Lock()
+_breakers = {}  # model/backend name -> CircuitBreaker
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    with _lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name)
+        return breaker
+
+
+def call(name: str, fn):
+    """
+    Run fn() through name's circuit: raises CircuitOpenError without
+    calling fn when the circuit refuses, otherwise records the outcome.
+    """
+    breaker = get_breaker(name)
+    if not breaker.acquire():
+        raise CircuitOpenError(f"Circuit open for {name}")
+    try:
+        result = fn()
+    except Exception:
+        breaker.record(False)
+        raise
+    breaker.record(True)
+    return result
+
+
+def statuses(names=None) -> dict:
+    with _lock:
+        names = list(_breakers) if names is None else list(names)
+    return {name: get_breaker(name).status() for name in names}
+
+
+def reset() -> None:
+    with _lock:
+        _breakers.clear()
@@ -0,0 +1,151 @@
+import os
+import re
+import math
+
+# Prompt budget for article text, in estimated tokens (about 4 characters
+# per token for English). The old fixed cut was full_text[:4000], ~1000 tokens.
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1000"))
+# Sections longer than this are split into paragraph-sized chunks
+MAX_CHUNK_TOKENS = 200
+# A chunk sharing this fraction of its words with an already chosen chunk
+# (or with the summary, which is already in the prompt) adds nothing new
+DUPLICATE_OVERLAP = 0.8
+
+WORD_RE = re.compile(r"[A-Za-z0-9]+")
+STOPWORDS = frozenset("""
+a an and are as at be been but by for from had has have he her his in into is it its
+of on or she that the their them there they this to was were which who will with
+""".split())
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + 3) // 4
+
+
+def terms(text: str) -> list:
+    return [w for w in (m.group(0).lower() for m in WORD_RE.finditer(text))
+            if len(w) > 2 and w not in STOPWORDS]
+
+
+def split_chunks(full_text: str) -> list:
+    """
+    Split scraper full_text ("## Heading" lines between sections) into
+    chunks of at most MAX_CHUNK_TOKENS, as dicts with heading, text, position.
+    Repeated paragraphs are kept only where they first appear.
+    """
+    sections = []
+    heading, lines = None, []
+    for line in full_text.split("\n"):
+        if line.startswith("## "):
+            sections.append((heading, lines))
+            heading, lines = line[3:].strip(), []
+        else:
+            lines.append(line)
+    sections.append((heading, lines))
+
+    chunks = []
+    seen = set()  # Paragraphs repeated verbatim (infobox echoes, captions) are kept once
+    for heading, lines in sections:
+        paragraphs = []
+        for line in lines:
+            paragraph = line.strip()
+            key = " ".join(terms(paragraph))
+            if paragraph and key not in seen:
+                seen.add(key)
+                paragraphs.append(paragraph)
+        current = []
+        for paragraph in paragraphs:
+            if current and estimate_tokens(" ".join(current + [paragraph])) > MAX_CHUNK_TOKENS:
+                chunks.append({"heading": heading, "text": "\n".join(current), "position": len(chunks)})
+                current = []
+            current.append(paragraph)
+        if current:
+            chunks.append({"heading": heading, "text": "\n".join(current), "position": len(chunks)})
+    return chunks
+
+
+def score_chunks(chunks: list, query: str) -> list:
+    """
+    TF-IDF relevance of each chunk to the query terms (title and key
+    entities), length-normalised so long chunks don't win on size alone.
+    """
+    query_terms = set(terms(query))
+    chunk_terms = [terms(chunk["text"]) for chunk in chunks]
+    document_frequency = {}
+    for words in chunk_terms:
+        for word in set(words):
+            document_frequency[word] = document_frequency.get(word, 0) + 1
+
+    count = len(chunks)
+    scores = []
+    for words in chunk_terms:
+        if not words:
+            scores.append(0.0)
+            continue
+        frequencies = {}
+        for word in words:
+            frequencies[word] = frequencies.get(word, 0) + 1
+        score = sum(
+            (1 + math.log(frequencies[word])) * math.log(1 + count / document_frequency[word])
+            for word in query_terms if word in frequencies
+        )
+        scores.append(score / math.sqrt(len(words)))
+    return scores
+
+
+def _overlap(words: set, other: set) -> float:
+    return len(words & other) / len(words) if words else 1.0
+
+
+def pack_context(scraped_data: dict, budget: int = None) -> str:
+    """
+    Article text for the quiz prompt, at most budget estimated tokens.
+
+    Text that already fits is returned unchanged. Otherwise the text is
+    split into section chunks, chunks that repeat the summary or an earlier
+    pick are dropped, and the best-scoring ones are added greedily until
+    the budget is full. Picks are emitted in article order under their
+    section headings.
+    """
+    budget = CONTEXT_TOKEN_BUDGET if budget is None else budget
+    full_text = scraped_data.get("full_text") or ""
+    if estimate_tokens(full_text) <= budget:
+        return full_text
+
+    chunks = split_chunks(full_text)
+    entities = scraped_data.get("key_entities") or {}
+    query = " ".join([scraped_data.get("title") or ""] + [
+        name for names in entities.values() if isinstance(names, list) for name in names
+    ])
+    scores = score_chunks(chunks, query)
+    summary_words = set(terms(scraped_data.get("summary") or ""))
+
+    # Best first; earlier chunks win ties since articles lead with the essentials
+    ranked = sorted(range(len(chunks)), key=lambda i: (-scores[i], chunks[i]["position"]))
+    chosen, chosen_words, used = [], [], 0
+    for i in ranked:
+        chunk = chunks[i]
+        words = set(terms(chunk["text"]))
+        if summary_words and _overlap(words, summary_words) >= DUPLICATE_OVERLAP:
+            continue
+        if any(_overlap(words, other) >= DUPLICATE_OVERLAP for other in chosen_words):
+            continue
+        cost = estimate_tokens(chunk["text"]) + (estimate_tokens(chunk["heading"]) + 1 if chunk["heading"] else 0)
+        if used + cost > budget:
+            continue
+        chosen.append(chunk)
+        chosen_words.append(words)
+        used += cost
+
+    if not chosen:
+        # A single oversized paragraph: fall back to a plain cut
+        return full_text[:budget * 4]
+
+    parts = []
+    last_heading = None
+    for chunk in sorted(chosen, key=lambda c: c["position"]):
+        if chunk["heading"] and chunk["heading"] != last_heading:
+            parts.append(f"## {chunk['heading']}")
+        last_heading = chunk["heading"]
+        parts.append(chunk["text"])
+    return "\n".join(parts)
@@ -1,10 +1,12 @@
 import os
+import time
+import threading
 from dotenv import load_dotenv
 
 load_dotenv()
 
 try:
-    from sqlalchemy import create_engine
+    from sqlalchemy import create_engine, event, inspect, text
     from sqlalchemy.ext.declarative import declarative_base
     from sqlalchemy.orm import sessionmaker
     SQL_AVAILABLE = True
@@ -81,28 +83,105 @@ def get_db():
 # REMOVED: Automatic table creation on import caused circular dependency issues.
 # Tables should be created explicitly in main.py startup event or via create_tables.py script.
 
-def init_db():
+# Set once the tables are known to exist, so requests don't pay for
+# create_all (a catalog query per table) every time
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+# The Vercel fallback DB lives in /tmp, which can be wiped under a warm
+# instance; there a "no such table" error means the schema must be rebuilt
+EPHEMERAL_SQLITE = DATABASE_URL.startswith("sqlite:////tmp/")
+
+
+def init_db(force: bool = False):
     """
-    Ensure tables exist. This is idempotent and safe to call.
-    Useful for serverless environments where /tmp might be wiped.
+    Ensure tables exist. The first call runs create_all; later calls return
+    at once unless force is set or a missing table was detected since.
+    Safe to call from any number of threads.
     """
-    if SQL_AVAILABLE and engine:
+    global _schema_ready
+    if _schema_ready and not force:
+        return
+    if not (SQL_AVAILABLE and engine):
+        return
+    with _schema_lock:
+        if _schema_ready and not force:
+            return
         try:
             # Import models locally to ensure they are registered with Base.metadata
             # This avoids circular imports at the top level
-            print(f"Initializing DB at {DATABASE_URL}")
-            # Force import models to register them
             try:
                 from . import models
-                print("Imported models from .")
             except ImportError:
                 import models
-                print("Imported models directly")
 
-            print(f"Registered tables before create: {Base.metadata.tables.keys()}")
+            start = time.perf_counter()
             Base.metadata.create_all(bind=engine)
-            print("Tables created successfully.")
+            added = upgrade_schema(engine)
+            _schema_ready = True
+            print(f"Schema ready at {engine.url}: {len(Base.metadata.tables)} tables "
+                  f"checked in {(time.perf_counter() - start) * 1000:.1f} ms"
+                  + (f", added {', '.join(added)}" if added else ""))
         except Exception as e:
             print(f"Error creating tables: {e}")
 
 
+def upgrade_schema(target_engine) -> list:
+    """
+    Add the columns and indexes the models define but existing tables lack
+    (create_all only creates whole tables). New columns must be nullable or
+    have a server default. Returns the "table.column" names added.
+    """
+    inspector = inspect(target_engine)
+    added = []
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        missing = [column for column in table.columns if column.name not in existing]
+        if missing:
+            with target_engine.begin() as connection:
+                for column in missing:
+                    ddl = column.type.compile(dialect=target_engine.dialect)
+                    if column.server_default is not None:
+                        ddl += f" DEFAULT {_default_sql(column.server_default.arg, target_engine)}"
+                    if not column.nullable:
+                        ddl += " NOT NULL"
+                    connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {ddl}"))
+                    added.append(f"{table.name}.{column.name}")
+        for index in table.indexes:
+            index.create(target_engine, checkfirst=True)
+    return added
+
+
+def _default_sql(arg, target_engine) -> str:
+    if isinstance(arg, str):
+        return "'" + arg.replace("'", "''") + "'"
+    if hasattr(arg, "text"):
+        return arg.text
+    return str(arg.compile(dialect=target_engine.dialect))
+
+
+def schema_ready() -> bool:
+    return _schema_ready
+
+
+def is_missing_table_error(error) -> bool:
+    return "no such table" in str(error).lower()
+
+
+def _on_engine_error(context):
+    # Flag the schema for a rebuild; the next init_db() call re-creates it
+    global _schema_ready
+    if _schema_ready and is_missing_table_error(context.original_exception):
+        print("Table missing (ephemeral database wiped?); schema will be re-created")
+        _schema_ready = False
+
+
+def watch_missing_tables(target_engine) -> None:
+    """Have target_engine's "no such table" errors flag the schema for a rebuild."""
+    event.listen(target_engine, "handle_error", _on_engine_error)
+
+
+if SQL_AVAILABLE and engine is not None and EPHEMERAL_SQLITE:
+    watch_missing_tables(engine)
@@ -0,0 +1,156 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import datetime
+
+
+def log_to_file(message):
+    try:
+        with open("debug_log.txt", "a", encoding="utf-8") as f:
+            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            f.write(f"[{timestamp}] [CACHE] {message}\n")
+    except Exception:
+        pass
+
+
+def default_cache_dir(name: str) -> str:
+    """
+    Pick a writable cache directory. Vercel only allows writes under /tmp,
+    locally we keep the cache next to the backend package.
+    """
+    base = os.getenv("CACHE_DIR")
+    if not base:
+        if os.getenv("VERCEL"):
+            base = "/tmp/wiki_quiz_cache"
+        else:
+            base = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+    return os.path.join(base, name)
+
+
+class DiskCache:
+    """
+    Size-bounded key/value store on disk.
+
+    Each entry is a small JSON file named after the SHA-256 of its key. Reads
+    bump the file's mtime, so when the total size goes over max_bytes the least
+    recently used entries are removed first. Entries older than ttl seconds
+    (if a ttl is set) are treated as missing.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 50 * 1024 * 1024, ttl: float = None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._total_bytes = None  # Computed lazily from the directory listing
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def get(self, key: str):
+        """Return the stored value for key, or None if missing or expired."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if entry.get("key") != key:
+            return None
+        if self.ttl is not None and time.time() - entry.get("stored_at", 0) > self.ttl:
+            self.delete(key)
+            return None
+
+        try:
+            os.utime(path, None)  # Mark as recently used
+        except OSError:
+            pass
+        return entry.get("value")
+
+    def set(self, key: str, value) -> None:
+        """Store a JSON-serializable value under key, evicting old entries if needed."""
+        path = self._path(key)
+        payload = json.dumps({"key": key, "stored_at": time.time(), "value": value})
+
+        with self._lock:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                old_size = os.path.getsize(path) if os.path.exists(path) else 0
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(payload)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                log_to_file(f"Failed to write cache entry {path}: {e}")
+                return
+
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_size()
+            else:
+                self._total_bytes += len(payload.encode("utf-8")) - old_size
+
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def delete(self, key: str) -> None:
+        path = self._path(key)
+        with self._lock:
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+                if self._total_bytes is not None:
+                    self._total_bytes -= size
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        with self._lock:
+            for path, _, _ in self._entries():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._total_bytes = 0
+
+    def _entries(self):
+        """Yield (path, size, mtime) for every entry file."""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            yield path, stat.st_size, stat.st_mtime
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self) -> None:
+        # Caller holds the lock. Drop least recently used entries until we are
+        # back under 90% of the budget, so we don't evict on every write.
+        entries = sorted(self._entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        removed = 0
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                removed += 1
+            except OSError:
+                continue
+        self._total_bytes = total
+        if removed:
+            log_to_file(f"Evicted {removed} entries from {self.directory}")
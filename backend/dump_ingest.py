@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Build an offline article store from a Wikipedia XML dump.
+
+Usage:
+    python dump_ingest.py enwiki-latest-pages-articles.xml.bz2 --output ./article_store [--limit 100000]
+
+Each main-namespace article's wikitext is turned into plain text with
+"== Heading ==" markers, and the same fields the scraper produces are
+precomputed (title, summary, sections, key_entities, full_text). Redirect
+pages are indexed under their own title and point at their target's record.
+Serve the result with SCRAPE_MODE=dump ARTICLE_STORE_PATH=./article_store.
+"""
+
+import os
+import re
+import bz2
+import sys
+import gzip
+import json
+import time
+import argparse
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+# Add the backend directory to the path so we can import modules
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+from article_store import DATA_FILE, INDEX_FILE, title_key, write_index
+from mediawiki import fields_from_extract
+from scraper import build_scrape_result
+
+# --- wikitext to plain text ----------------------------------------------
+
+COMMENT_RE = re.compile(r"<!--.*?-->", re.S)
+REF_RE = re.compile(r"<ref[^>/]*/>|<ref[^>]*>.*?</ref>", re.S | re.I)
+DROP_TAG_BLOCK_RE = re.compile(r"<(gallery|math|score|timeline|syntaxhighlight|source)[^>]*>.*?</\1>", re.S | re.I)
+TAG_RE = re.compile(r"</?[a-zA-Z][^>]*>")
+INNERMOST_TEMPLATE_RE = re.compile(r"\{\{[^{}]*\}\}")
+INNERMOST_TABLE_RE = re.compile(r"\{\|(?:(?!\{\|).)*?\|\}", re.S)
+FILE_LINK_RE = re.compile(r"\[\[(?:File|Image|Category):[^\[\]]*(?:\[\[[^\[\]]*\]\][^\[\]]*)*\]\]", re.I)
+LINK_RE = re.compile(r"\[\[(?:[^|\[\]]*\|)?([^\[\]]*)\]\]")
+EXTERNAL_LINK_RE = re.compile(r"\[(?:https?:)?//[^\s\]]+(?:\s([^\]]*))?\]")
+QUOTES_RE = re.compile(r"'{2,}")
+LIST_MARKER_RE = re.compile(r"^[*#:;]+\s*", re.M)
+MAGIC_WORD_RE = re.compile(r"__[A-Z]+__")
+HEADING_LINE_RE = re.compile(r"^(={2,6})\s*(.+?)\s*\1\s*$")
+
+
+def _remove_nested(pattern, text):
+    previous = None
+    while previous != text:
+        previous = text
+        text = pattern.sub("", text)
+    return text
+
+
+def wikitext_to_text(wikitext: str) -> str:
+    """
+    Approximate the plain-text extract MediaWiki would produce: markup,
+    templates, tables, references and files removed, links reduced to their
+    label, and each heading on its own line as "== Heading ==".
+    """
+    text = COMMENT_RE.sub("", wikitext)
+    text = REF_RE.sub("", text)
+    text = DROP_TAG_BLOCK_RE.sub("", text)
+    text = _remove_nested(INNERMOST_TEMPLATE_RE, text)
+    text = _remove_nested(INNERMOST_TABLE_RE, text)
+    text = FILE_LINK_RE.sub("", text)
+    text = LINK_RE.sub(r"\1", text)
+    text = EXTERNAL_LINK_RE.sub(lambda m: m.group(1) or "", text)
+    text = TAG_RE.sub("", text)
+    text = QUOTES_RE.sub("", text)
+    text = MAGIC_WORD_RE.sub("", text)
+    text = LIST_MARKER_RE.sub("", text)
+    text = text.replace("&nbsp;", " ").replace("&ndash;", "–").replace("&mdash;", "—")
+    text = text.replace("&amp;", "&")
+
+    lines = []
+    for line in text.splitlines():
+        line = line.strip()
+        heading = HEADING_LINE_RE.match(line)
+        if heading:
+            lines.append(f"{heading.group(1)} {heading.group(2).strip()} {heading.group(1)}")
+        elif line:
+            lines.append(" ".join(line.split()))
+    return "\n".join(lines)
+
+
+# --- dump reading --------------------------------------------------------
+
+def open_dump(path: str):
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rb")
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def iter_pages(path: str):
+    """Yield (title, redirect target or None, wikitext) for main-namespace pages."""
+    with open_dump(path) as f:
+        context = ET.iterparse(f, events=("start", "end"))
+        _, root = next(context)
+        for event, elem in context:
+            if event != "end" or _local(elem.tag) != "page":
+                continue
+            title = ns = redirect = text = None
+            for child in elem.iter():
+                name = _local(child.tag)
+                if name == "title":
+                    title = child.text
+                elif name == "ns":
+                    ns = child.text
+                elif name == "redirect":
+                    redirect = child.get("title")
+                elif name == "text":
+                    text = child.text or ""
+            if title and ns == "0":
+                yield title, redirect, text or ""
+            # Drop the parsed page so memory stays flat on multi-GB dumps
+            root.clear()
+
+
+def build_store(dump_path: str, output_dir: str, limit: int = None) -> dict:
+    """Ingest dump_path into output_dir. Returns counts for reporting."""
+    os.makedirs(output_dir, exist_ok=True)
+    offsets = {}  # title key -> (offset, length)
+    redirects = {}  # redirect key -> target key
+    articles = 0
+
+    with open(os.path.join(output_dir, DATA_FILE), "wb") as data_file:
+        for title, redirect, wikitext in iter_pages(dump_path):
+            key = title_key(title)
+            if redirect:
+                redirects[key] = title_key(redirect)
+                continue
+
+            fields = fields_from_extract(title, wikitext_to_text(wikitext))
+            record = build_scrape_result(fields)
+            payload = json.dumps(record, ensure_ascii=False).encode("utf-8")
+            offsets[key] = (data_file.tell(), len(payload))
+            data_file.write(payload)
+            data_file.write(b"\n")
+
+            articles += 1
+            if limit and articles >= limit:
+                break
+
+    entries = [(key, offset, length) for key, (offset, length) in offsets.items()]
+    resolved_redirects = 0
+    for key, target in redirects.items():
+        # Follow short redirect chains; skip redirects to pages we don't have
+        for _ in range(5):
+            if target not in redirects:
+                break
+            target = redirects[target]
+        if target in offsets and key not in offsets:
+            entries.append((key, *offsets[target]))
+            resolved_redirects += 1
+
+    write_index(os.path.join(output_dir, INDEX_FILE), entries)
+    return {"articles": articles, "redirects": resolved_redirects}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build an offline article store from a Wikipedia XML dump.")
+    parser.add_argument("dump", help="pages-articles XML dump (.xml, .xml.bz2 or .xml.gz)")
+    parser.add_argument("--output", required=True, help="Directory to write the store to")
+    parser.add_argument("--limit", type=int, default=None, help="Stop after this many articles")
+    args = parser.parse_args(argv)
+
+    start = time.time()
+    counts = build_store(args.dump, args.output, limit=args.limit)
+    print(f"Stored {counts['articles']} articles and {counts['redirects']} redirects "
+          f"in {args.output} ({time.time() - start:.1f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
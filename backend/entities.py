@@ -0,0 +1,43 @@
+import re
+from collections import Counter
+
+ORGANIZATION_SUFFIXES = frozenset(
+    ["University", "College", "Institute", "Company", "Corporation", "Foundation"]
+)
+
+# One pass finds every "Capitalized Capitalized" or "Capitalized, Capitalized"
+# pair; the separator and the second word decide the category.
+ENTITY_PAIR_RE = re.compile(r"\b([A-Z][a-z]+)(, | )([A-Z][a-z]+)\b")
+
+MAX_ENTITIES = 10
+
+
+def extract_key_entities(text: str, limit: int = MAX_ENTITIES) -> dict:
+    """
+    Extract people, organizations and locations from text in a single regex
+    pass. Each list is ranked by frequency, ties broken by first occurrence,
+    so the same text always yields the same lists in the same order.
+
+      people:        "Alan Turing"           (two capitalized words)
+      organizations: "Princeton University"  (second word is an institution type)
+      locations:     "London, England"       (City, Country)
+    """
+    counts = {"people": Counter(), "organizations": Counter(), "locations": Counter()}
+    first_seen = {}
+
+    for position, match in enumerate(ENTITY_PAIR_RE.finditer(text)):
+        first, separator, second = match.groups()
+        if separator == ", ":
+            category = "locations"
+        elif second in ORGANIZATION_SUFFIXES:
+            category = "organizations"
+        else:
+            category = "people"
+        entity = match.group(0)
+        counts[category][entity] += 1
+        first_seen.setdefault(entity, position)
+
+    return {
+        category: sorted(counter, key=lambda e: (-counter[e], first_seen[e]))[:limit]
+        for category, counter in counts.items()
+    }
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Gemini generateContent API and the OpenRouter chat
+completions API, for offline testing.
+
+Answers every prompt with the quiz from sample_data/sample_output.json.
+`:streamGenerateContent?alt=sse` (and OpenRouter's "stream": true) sends it
+as server-sent events in small pieces with a delay between them, like a
+model generating tokens; the non-streaming calls return it in one response
+after the same total delay. Models listed in FakeLLMHandler.failing_models
+answer 503. Responses carry token usage the way each API reports it
+(usageMetadata / usage), counting 4 characters per token.
+
+Usage:
+    python fake_llm_server.py [--port 8766] [--chunk-delay 0.05]
+    GEMINI_API_BASE=http://127.0.0.1:8766/v1beta GOOGLE_API_KEY=fake python main.py
+    OPENROUTER_API_BASE=http://127.0.0.1:8766/api/v1 OPENROUTER_API_KEY=fake python main.py
+"""
+
+import os
+import re
+import json
+import time
+import argparse
+import threading
+from urllib.parse import urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SAMPLE_OUTPUT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'sample_data', 'sample_output.json')
+MODEL_PATH_RE = re.compile(r"^/v1beta/models/([^/:]+):(generateContent|streamGenerateContent)$")
+OPENROUTER_PATH = "/api/v1/chat/completions"
+
+
+def load_response_text(path: str = SAMPLE_OUTPUT_PATH) -> str:
+    """The canned model output: the sample quiz as pretty-printed JSON."""
+    with open(path, 'r', encoding='utf-8') as f:
+        sample = json.load(f)
+    return json.dumps({"quiz": sample["quiz"], "related_topics": sample.get("related_topics", [])}, indent=2)
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    response_text = ""
+    chunk_size = 64  # characters per streamed event
+    chunk_delay = 0.02  # seconds between events
+    failing_models = set()
+    request_log = []  # (model, method) per call, for tests
+
+    def do_POST(self):
+        path = urlsplit(self.path).path
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+
+        request = json.loads(body or b"{}")
+        prompt_tokens = len(body) // 4
+        response_tokens = len(self.response_text) // 4
+        if path == OPENROUTER_PATH:
+            model = request.get("model", "")
+            streaming = bool(request.get("stream"))
+            method = "chat.completions.stream" if streaming else "chat.completions"
+            usage = {"prompt_tokens": prompt_tokens, "completion_tokens": response_tokens,
+                     "total_tokens": prompt_tokens + response_tokens}
+            full = lambda text: {"choices": [{"message": {"role": "assistant", "content": text}}], "usage": usage}
+            delta = lambda text, last=False: dict({"choices": [{"delta": {"content": text}}]}, **({"usage": usage} if last else {}))
+            done_event = "data: [DONE]"
+        else:
+            match = MODEL_PATH_RE.match(path)
+            if not match:
+                self._send_json(404, {"error": {"code": 404, "message": "Unknown endpoint"}})
+                return
+            model, method = match.groups()
+            streaming = method == "streamGenerateContent"
+            usage = {"promptTokenCount": prompt_tokens, "candidatesTokenCount": response_tokens,
+                     "totalTokenCount": prompt_tokens + response_tokens}
+            full = lambda text: dict(self._candidate(text), usageMetadata=usage)
+            delta = lambda text, last=False: dict(self._candidate(text), **({"usageMetadata": usage} if last else {}))
+            done_event = None
+
+        FakeLLMHandler.request_log.append((model, method))
+        if model in self.failing_models:
+            self._send_json(503, {"error": {"code": 503, "message": "The model is overloaded."}})
+            return
+
+        pieces = [self.response_text[i:i + self.chunk_size]
+                  for i in range(0, len(self.response_text), self.chunk_size)]
+        if not streaming:
+            time.sleep(self.chunk_delay * len(pieces))
+            self._send_json(200, full(self.response_text))
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for i, piece in enumerate(pieces):
+                time.sleep(self.chunk_delay)
+                event = delta(piece, last=i == len(pieces) - 1)
+                self._write_chunk(f"data: {json.dumps(event)}\r\n\r\n".encode("utf-8"))
+            if done_event:
+                self._write_chunk(f"{done_event}\r\n\r\n".encode("utf-8"))
+            self._write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    @staticmethod
+    def _candidate(text):
+        return {"candidates": [{"content": {"parts": [{"text": text}], "role": "model"}}]}
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port: int = 0, chunk_delay: float = 0.02):
+    """
+    Start the fake API in a background thread. Returns (server, api_base)
+    where api_base is the Gemini base; the OpenRouter base is the same
+    host with /api/v1.
+    """
+    FakeLLMHandler.response_text = load_response_text()
+    FakeLLMHandler.chunk_delay = chunk_delay
+    server = ThreadingHTTPServer(("127.0.0.1", port), FakeLLMHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/v1beta"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a canned quiz the way the Gemini API would.")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--chunk-delay", type=float, default=0.05, help="Seconds between streamed pieces")
+    args = parser.parse_args()
+
+    FakeLLMHandler.response_text = load_response_text()
+    FakeLLMHandler.chunk_delay = args.chunk_delay
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), FakeLLMHandler)
+    print(f"Fake Gemini API at http://127.0.0.1:{args.port}/v1beta, "
+          f"fake OpenRouter API at http://127.0.0.1:{args.port}/api/v1")
+    server.serve_forever()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the MediaWiki action API, for offline testing.
+
+Replays the recorded responses in sample_data/mediawiki/*.json. Each file
+is a recorded single-title `action=query&prop=extracts` response; requests
+for several titles get the matching recorded pages merged into one
+response, and unknown titles come back as missing pages, like the real API.
+`action=opensearch` answers with the recorded titles that match the prefix.
+
+Usage:
+    python fake_mediawiki_server.py [--port 8765]
+    MEDIAWIKI_API_URL=http://127.0.0.1:8765/w/api.php SCRAPE_MODE=api python main.py
+"""
+
+import os
+import re
+import glob
+import json
+import argparse
+import threading
+from urllib.parse import urlsplit, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RECORDINGS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'sample_data', 'mediawiki')
+
+
+def load_recordings(directory: str = RECORDINGS_DIR) -> dict:
+    """Map page title -> recorded page object."""
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(directory, '*.json'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            recorded = json.load(f)
+        for page in recorded.get("query", {}).get("pages", []):
+            pages[page["title"]] = page
+    return pages
+
+
+class FakeMediaWikiHandler(BaseHTTPRequestHandler):
+    pages = {}
+    request_log = []  # Titles requested per call, for tests
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        if parts.path != "/w/api.php":
+            self._send_json(404, {"error": {"code": "notfound", "info": "Unknown endpoint"}})
+            return
+
+        params = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        if params.get("action") == "opensearch":
+            self._opensearch(params)
+            return
+        if params.get("action") != "query" or params.get("prop") != "extracts":
+            self._send_json(200, {"error": {"code": "badparams", "info": "Only action=query&prop=extracts is recorded"}})
+            return
+
+        titles = [t for t in params.get("titles", "").split("|") if t]
+        FakeMediaWikiHandler.request_log.append(titles)
+
+        normalized = []
+        pages = []
+        for index, title in enumerate(titles):
+            canonical = title.replace("_", " ")
+            canonical = canonical[:1].upper() + canonical[1:]
+            if canonical != title:
+                normalized.append({"from": title, "to": canonical})
+            page = self.pages.get(canonical)
+            if page is None:
+                pages.append({"ns": 0, "title": canonical, "missing": True})
+                continue
+            page = dict(page)
+            if index > 0:
+                # Mirrors TextExtracts: without exintro only one page gets an extract
+                page.pop("extract", None)
+            pages.append(page)
+
+        query = {"pages": pages}
+        if normalized:
+            query["normalized"] = normalized
+        self._send_json(200, {"batchcomplete": True, "query": query})
+
+    def _opensearch(self, params):
+        # Titles of recorded pages that start with the search text, in title order
+        search = params.get("search", "")
+        limit = int(params.get("limit", "10"))
+        FakeMediaWikiHandler.request_log.append(["opensearch", search])
+        titles = sorted(t for t in self.pages if t.casefold().startswith(search.casefold()))[:limit]
+        urls = [f"https://en.wikipedia.org/wiki/{t.replace(' ', '_')}" for t in titles]
+        self._send_json(200, [search, titles, [""] * len(titles), urls])
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port: int = 0, directory: str = RECORDINGS_DIR):
+    """Start the fake API in a background thread. Returns (server, api_url)."""
+    FakeMediaWikiHandler.pages = load_recordings(directory)
+    server = ThreadingHTTPServer(("127.0.0.1", port), FakeMediaWikiHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/w/api.php"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded MediaWiki API responses.")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    FakeMediaWikiHandler.pages = load_recordings()
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), FakeMediaWikiHandler)
+    print(f"Fake MediaWiki API with {len(FakeMediaWikiHandler.pages)} recorded pages at "
+          f"http://127.0.0.1:{args.port}/w/api.php")
+    server.serve_forever()
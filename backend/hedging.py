@@ -0,0 +1,166 @@
+import os
+import math
+import time
+import threading
+import datetime
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Start the next candidate once the running one is slower than this
+# percentile of its own recent successful latencies
+HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+# Used until a candidate has HEDGE_MIN_SAMPLES recorded latencies
+HEDGE_DEFAULT_DELAY = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY", "10"))
+HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY", "1"))
+HEDGE_MIN_SAMPLES = 10
+LATENCY_WINDOW = 200
+MAX_WORKERS = int(os.getenv("LLM_HEDGE_MAX_WORKERS", "16"))
+# How often run_hedged looks again at a call still queued for a worker, or
+# at a pool that had no free worker for a hedge
+HEDGE_POLL_INTERVAL = 0.05
+
+
+def log_to_file(message):
+    try:
+        with open("debug_log.txt", "a", encoding="utf-8") as f:
+            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            f.write(f"[{timestamp}] [HEDGE] {message}\n")
+    except Exception:
+        pass
+
+
+_latency_lock = threading.Lock()
+_latencies = {}  # candidate name -> deque of recent successful latencies (seconds)
+
+_executor = None
+_executor_lock = threading.Lock()
+_in_pool = 0  # calls submitted to the executor and not finished yet
+
+
+def record_latency(name: str, seconds: float) -> None:
+    with _latency_lock:
+        _latencies.setdefault(name, deque(maxlen=LATENCY_WINDOW)).append(seconds)
+
+
+def hedge_delay(name: str) -> float:
+    """Seconds to wait on name before starting the next candidate."""
+    with _latency_lock:
+        samples = sorted(_latencies.get(name, ()))
+    if len(samples) < HEDGE_MIN_SAMPLES:
+        return HEDGE_DEFAULT_DELAY
+    rank = max(0, math.ceil(HEDGE_PERCENTILE / 100 * len(samples)) - 1)
+    return max(HEDGE_MIN_DELAY, samples[rank])
+
+
+def reset_latencies() -> None:
+    with _latency_lock:
+        _latencies.clear()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="hedge")
+        return _executor
+
+
+def run_hedged(candidates, validate=None, delay_for=hedge_delay):
+    """
+    Call candidates, a list of (name, fn) in preference order, and return
+    (result, name) for the first call that returns a valid result.
+
+    The first candidate starts immediately. The next one starts when the
+    latest one has been running longer than delay_for(its name), or as soon
+    as a call fails. Time spent queued for a pool worker doesn't count as
+    running, and no hedge starts while every worker is taken, so a busy
+    pool doesn't turn its own backlog into extra model calls.
+    validate(result) may raise to reject a result, which counts as a
+    failure. Once a result is accepted, candidates that haven't
+    started are cancelled and the results of in-flight ones are discarded
+    (a blocking HTTP call can't be interrupted, it just runs out in the pool).
+    Raises the last error if every candidate fails.
+    """
+    if not candidates:
+        raise ValueError("No candidates to run")
+    executor = _get_executor()
+    remaining = list(candidates)
+    pending = {}  # future -> name
+    last_error = None
+
+    def launch():
+        """Submit the next candidate. Returns (name, started); _timed sets started["at"] once it runs."""
+        global _in_pool
+        name, fn = remaining.pop(0)
+        started = {}
+        with _executor_lock:
+            _in_pool += 1
+        future = executor.submit(_timed, name, fn, started)
+        future.add_done_callback(_left_pool)
+        pending[future] = name
+        return name, started
+
+    def hedge_due():
+        """Seconds until the latest call is due a hedge (0: now), or None while it is still queued."""
+        name, started = latest
+        if "at" not in started:
+            return None
+        return max(0.0, started["at"] + delay_for(name) - time.perf_counter())
+
+    latest = launch()
+    try:
+        while pending:
+            timeout = None
+            if remaining:
+                due = hedge_due()
+                timeout = HEDGE_POLL_INTERVAL if due is None else due
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                if hedge_due() != 0.0:
+                    continue
+                if not _pool_has_free_worker():
+                    time.sleep(HEDGE_POLL_INTERVAL)
+                    continue
+                log_to_file(f"{latest[0]} slower than {delay_for(latest[0]):.1f}s, hedging with {remaining[0][0]}")
+                latest = launch()
+                continue
+
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    result = future.result()
+                    if validate:
+                        validate(result)
+                except Exception as e:
+                    last_error = e
+                    log_to_file(f"{name} failed: {e}")
+                    continue
+                return result, name
+
+            # Something failed: don't wait out a delay before trying the next one
+            if remaining:
+                latest = launch()
+    finally:
+        for future in pending:
+            future.cancel()
+
+    raise last_error
+
+
+def _pool_has_free_worker() -> bool:
+    with _executor_lock:
+        return _in_pool < MAX_WORKERS
+
+
+def _left_pool(future) -> None:
+    # Finished or cancelled before it ran
+    global _in_pool
+    with _executor_lock:
+        _in_pool -= 1
+
+
+def _timed(name, fn, started):
+    start = started["at"] = time.perf_counter()
+    result = fn()
+    record_latency(name, time.perf_counter() - start)
+    return result
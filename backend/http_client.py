@@ -0,0 +1,151 @@
+"""
+Process-wide HTTP client shared by the scraper and the LLM calls.
+
+A single requests.Session keeps connections alive between requests, so
+repeat calls to Wikipedia or the Gemini API reuse an open TCP/TLS
+connection instead of doing a fresh handshake every time.
+"""
+
+import os
+import asyncio
+import threading
+import datetime
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+
+def log_to_file(message):
+    try:
+        with open("debug_log.txt", "a", encoding="utf-8") as f:
+            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            f.write(f"[{timestamp}] [HTTP] {message}\n")
+    except Exception:
+        pass
+
+
+# Pool settings (override via environment)
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "10"))  # Number of host pools to keep
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "20"))  # Connections kept alive per host
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "10"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "30"))
+LLM_READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", "60"))
+
+# Hosts that get their own dedicated keep-alive pool
+WIKIPEDIA_HOSTS = ["https://en.wikipedia.org", "https://en.m.wikipedia.org"]
+LLM_HOSTS = ["https://generativelanguage.googleapis.com", "https://openrouter.ai"]
+
+_session = None
+_lock = threading.Lock()
+
+_async_client = None
+_async_client_loop = None
+
+
+def _wikipedia_adapter():
+    # Wikipedia reads are idempotent, so transient errors are retried here
+    retry_strategy = Retry(
+        total=3,  # Total number of retries
+        backoff_factor=1,  # Wait 1, 2, 4 seconds between retries
+        status_forcelist=[429, 500, 502, 503, 504],  # HTTP status codes to retry
+        allowed_methods=["GET"]  # Only retry GET requests
+    )
+    return HTTPAdapter(
+        pool_connections=HTTP_POOL_CONNECTIONS,
+        pool_maxsize=HTTP_POOL_MAXSIZE,
+        max_retries=retry_strategy
+    )
+
+
+def _plain_adapter():
+    # LLM calls are expensive POSTs; fallback between models is handled in llm.py
+    return HTTPAdapter(
+        pool_connections=HTTP_POOL_CONNECTIONS,
+        pool_maxsize=HTTP_POOL_MAXSIZE
+    )
+
+
+def _build_session():
+    session = requests.Session()
+    default_adapter = _wikipedia_adapter()
+    session.mount("http://", default_adapter)
+    session.mount("https://", default_adapter)
+    for host in WIKIPEDIA_HOSTS:
+        session.mount(host, _wikipedia_adapter())
+    for host in LLM_HOSTS:
+        session.mount(host, _plain_adapter())
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return the shared session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = _build_session()
+                log_to_file(
+                    f"Created shared HTTP session (pool_connections={HTTP_POOL_CONNECTIONS}, "
+                    f"pool_maxsize={HTTP_POOL_MAXSIZE})"
+                )
+    return _session
+
+
+def close_session() -> None:
+    """Close all pooled connections. A later get_session() starts a new pool."""
+    global _session
+    with _lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+            log_to_file("Closed shared HTTP session")
+
+
+def default_timeout():
+    """(connect, read) timeout for regular requests."""
+    return (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+
+
+def llm_timeout():
+    """(connect, read) timeout for LLM generation requests."""
+    return (HTTP_CONNECT_TIMEOUT, LLM_READ_TIMEOUT)
+
+
+def get_async_client():
+    """
+    Return the shared httpx.AsyncClient for the running event loop.
+    The client is bound to the loop it was created in, so a new one is made
+    if the loop changes (e.g. between test runs).
+    """
+    global _async_client, _async_client_loop
+    if not HTTPX_AVAILABLE:
+        raise RuntimeError("httpx is not installed; async HTTP client unavailable")
+
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client_loop is not loop or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=HTTP_POOL_CONNECTIONS * HTTP_POOL_MAXSIZE,
+                max_keepalive_connections=HTTP_POOL_MAXSIZE
+            ),
+            timeout=httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+            follow_redirects=True
+        )
+        _async_client_loop = loop
+        log_to_file("Created shared async HTTP client")
+    return _async_client
+
+
+async def close_async_client() -> None:
+    global _async_client, _async_client_loop
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+        _async_client_loop = None
+        log_to_file("Closed shared async HTTP client")
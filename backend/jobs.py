@@ -0,0 +1,303 @@
+import os
+import time
+import uuid
+import datetime
+import threading
+from contextlib import contextmanager
+
+try:
+    from . import database, models, quiz_pipeline
+except ImportError:
+    import database
+    import models
+    import quiz_pipeline
+
+# Worker threads per process
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# Seconds an idle worker sleeps between looks at the queue (enqueue() wakes
+# this process's workers at once; the poll picks up other processes' jobs)
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "2"))
+# A running job whose lease has not been renewed for this many seconds is
+# presumed lost (crashed or restarted worker) and is put back in the queue
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "300"))
+# A worker renews the lease of the job it is running this often, so only
+# jobs of a worker that stopped (crashed, restarted, hung) are requeued
+JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", str(JOB_LEASE_SECONDS / 3)))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+# enqueue() refuses new jobs while this many are waiting
+JOB_MAX_QUEUED = int(os.getenv("JOB_MAX_QUEUED", "1000"))
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+def log_to_file(message):
+    try:
+        with open("debug_log.txt", "a", encoding="utf-8") as f:
+            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            f.write(f"[{timestamp}] [JOBS] {message}\n")
+    except Exception:
+        pass
+
+
+def _now():
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+def enqueue(db, url: str, fresh: bool = False):
+    """Store a new queued job and return it. Raises ValueError if the queue is full."""
+    waiting = db.query(models.Job).filter(models.Job.status == QUEUED).count()
+    if waiting >= JOB_MAX_QUEUED:
+        raise ValueError(f"Job queue is full ({waiting} jobs waiting)")
+    job = models.Job(id=uuid.uuid4().hex, url=url, fresh=fresh, status=QUEUED, attempts=0)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    log_to_file(f"Queued job {job.id} for {url}")
+    if _pool is not None:
+        _pool.wake()
+    return job
+
+
+def get_job(db, job_id: str):
+    return db.query(models.Job).filter(models.Job.id == job_id).first()
+
+
+def job_to_dict(job) -> dict:
+    return {
+        "id": job.id,
+        "url": job.url,
+        "status": job.status,
+        "attempts": job.attempts,
+        "error": job.error,
+        "quiz_id": job.quiz_id,
+        "result": job.result,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+def run_quiz_job(db, job) -> dict:
+    """Scrape, generate and save. Returns the body POST /api/quiz would have returned."""
+    return quiz_pipeline.run_quiz_pipeline(db, job.url, job.fresh)
+
+
+def update_owned(db, job_id: str, attempt: int, values: dict) -> bool:
+    """
+    Apply values to a job only while it is still running as the given
+    attempt. False if it is not: its lease ran out and it was requeued
+    (and maybe claimed again), so the result belongs to someone else.
+    """
+    updated = db.query(models.Job).filter(
+        models.Job.id == job_id, models.Job.status == RUNNING, models.Job.attempts == attempt
+    ).update(values, synchronize_session=False)
+    db.commit()
+    return bool(updated)
+
+
+def renew_lease(db, job_id: str, attempt: int) -> bool:
+    """Push back a running job's lease. False if the attempt no longer owns the job."""
+    return update_owned(db, job_id, attempt, {models.Job.lease_expires_at: time.time() + JOB_LEASE_SECONDS})
+
+
+def requeue_expired(db) -> int:
+    """Put running jobs whose lease ran out back in the queue (or fail them if out of attempts)."""
+    now = time.time()
+    expired = db.query(models.Job.id, models.Job.attempts).filter(
+        models.Job.status == RUNNING, models.Job.lease_expires_at < now
+    ).all()
+    return sum(1 for job_id, attempt in expired if requeue_job(db, job_id, attempt, now))
+
+
+def requeue_job(db, job_id: str, attempt: int, now: float) -> bool:
+    """
+    Requeue (or fail) one expired job. Like claim_next, this is a
+    conditional UPDATE: it only applies while the job is still the expired
+    attempt that was read, so a worker acting on a stale read can't undo
+    another worker's requeue and claim. Returns whether it applied.
+    """
+    if attempt >= JOB_MAX_ATTEMPTS:
+        status = FAILED
+        values = {models.Job.status: FAILED, models.Job.error: "Worker lost the job too many times",
+                  models.Job.finished_at: _now()}
+    else:
+        status = QUEUED
+        values = {models.Job.status: QUEUED}
+    values[models.Job.lease_expires_at] = None
+    updated = db.query(models.Job).filter(
+        models.Job.id == job_id, models.Job.status == RUNNING, models.Job.attempts == attempt,
+        models.Job.lease_expires_at < now,
+    ).update(values, synchronize_session=False)
+    db.commit()
+    if updated:
+        log_to_file(f"Job {job_id} lease expired, now {status}")
+    return bool(updated)
+
+
+def claim_next(db):
+    """
+    Mark the oldest queued job as running and return it, or None. The
+    claim is a conditional UPDATE, so two workers (or processes) never
+    get the same job.
+    """
+    while True:
+        candidate = db.query(models.Job.id).filter(models.Job.status == QUEUED) \
+            .order_by(models.Job.created_at, models.Job.id).first()
+        if candidate is None:
+            return None
+        claimed = db.query(models.Job).filter(
+            models.Job.id == candidate.id, models.Job.status == QUEUED
+        ).update({
+            models.Job.status: RUNNING,
+            models.Job.attempts: models.Job.attempts + 1,
+            models.Job.lease_expires_at: time.time() + JOB_LEASE_SECONDS,
+            models.Job.started_at: _now(),
+        }, synchronize_session=False)
+        db.commit()
+        if claimed:
+            return get_job(db, candidate.id)
+        # Another worker got there first; look again
+
+
+class JobWorkerPool:
+    """
+    JOB_WORKERS threads that claim queued jobs from the database and run
+    handler(db, job) on them. The handler's return value is stored as the
+    job's result. A ValueError (bad URL, article not found, quiz
+    generation failed) fails the job; any other error requeues it until
+    JOB_MAX_ATTEMPTS is reached.
+    """
+
+    def __init__(self, workers: int = None, handler=run_quiz_job, session_factory=None):
+        self.workers = JOB_WORKERS if workers is None else workers
+        self.handler = handler
+        self.session_factory = session_factory or database.SessionLocal
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self) -> None:
+        if self._threads or not self.session_factory:
+            return
+        self._stop.clear()
+        db = self.session_factory()
+        try:
+            # Jobs a previous process was running when it stopped
+            requeue_expired(db)
+        finally:
+            db.close()
+        for i in range(max(1, self.workers)):
+            thread = threading.Thread(target=self._run, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        log_to_file(f"Started {len(self._threads)} job workers")
+
+    def stop(self, timeout: float = 5) -> None:
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                worked = self.run_once()
+            except Exception as e:
+                log_to_file(f"Worker error: {e}")
+                worked = False
+            if not worked:
+                self._wake.wait(JOB_POLL_INTERVAL)
+                self._wake.clear()
+
+    @contextmanager
+    def _heartbeat(self, job_id: str, attempt: int):
+        """Renew the job's lease every JOB_HEARTBEAT_SECONDS until the block exits."""
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(JOB_HEARTBEAT_SECONDS):
+                db = self.session_factory()
+                try:
+                    if not renew_lease(db, job_id, attempt):
+                        return
+                except Exception as e:
+                    log_to_file(f"Could not renew lease of job {job_id}: {e}")
+                finally:
+                    db.close()
+
+        thread = threading.Thread(target=beat, name=f"job-heartbeat-{job_id}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def run_once(self) -> bool:
+        """Claim and run one job. Returns False if the queue was empty."""
+        db = self.session_factory()
+        try:
+            requeue_expired(db)
+            job = claim_next(db)
+            if job is None:
+                return False
+            job_id, attempt = job.id, job.attempts
+            log_to_file(f"Running job {job_id} (attempt {attempt})")
+            try:
+                with self._heartbeat(job_id, attempt):
+                    result = self.handler(db, job)
+            except Exception as e:
+                db.rollback()
+                retry = not isinstance(e, ValueError) and attempt < JOB_MAX_ATTEMPTS
+                status = QUEUED if retry else FAILED
+                values = {models.Job.status: status, models.Job.error: str(e), models.Job.lease_expires_at: None}
+                if not retry:
+                    values[models.Job.finished_at] = _now()
+                if update_owned(db, job_id, attempt, values):
+                    log_to_file(f"Job {job_id} failed ({status}): {e}")
+                else:
+                    log_to_file(f"Job {job_id} attempt {attempt} failed after losing its lease: {e}")
+                return True
+
+            if update_owned(db, job_id, attempt, {
+                models.Job.status: DONE,
+                models.Job.result: result,
+                models.Job.error: None,
+                models.Job.quiz_id: (result or {}).get("id"),
+                models.Job.lease_expires_at: None,
+                models.Job.finished_at: _now(),
+            }):
+                log_to_file(f"Job {job_id} done")
+            else:
+                log_to_file(f"Job {job_id} attempt {attempt} finished after losing its lease; result dropped")
+            return True
+        finally:
+            db.close()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def start_workers() -> JobWorkerPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = JobWorkerPool()
+            _pool.start()
+        return _pool
+
+
+def stop_workers() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.stop()
+            _pool = None
@@ -1,12 +1,25 @@
 
 
 import os
-import re
 import json
-import requests
+import time
 from dotenv import load_dotenv
 import datetime
 
+try:
+    from . import http_client, llm_cache, hedging, llm_stream, context_packer, llm_router, circuit_breaker, llm_batch, local_quiz, metrics
+except ImportError:
+    import http_client
+    import llm_cache
+    import hedging
+    import llm_stream
+    import context_packer
+    import llm_router
+    import circuit_breaker
+    import llm_batch
+    import local_quiz
+    import metrics
+
 def log_to_file(message):
     try:
         with open("debug_log.txt", "a", encoding="utf-8") as f:
@@ -51,7 +64,7 @@ def test_api_connection():
         # Test Google Key
         try:
             url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-flash-latest?key={google_key}"
-            response = requests.get(url, timeout=10)
+            response = http_client.get_session().get(url, timeout=http_client.default_timeout())
             if response.status_code == 200:
                 return True, "Google Gemini API key is valid"
             else:
@@ -65,10 +78,10 @@ def test_api_connection():
     if openrouter_key:
         # Test OpenRouter Key
         try:
-            response = requests.get(
+            response = http_client.get_session().get(
                 "https://openrouter.ai/api/v1/auth/key",
                 headers={"Authorization": f"Bearer {openrouter_key}"},
-                timeout=10
+                timeout=http_client.default_timeout()
             )
             if response.status_code == 200:
                 return True, "OpenRouter API key is valid"
@@ -117,105 +130,402 @@ Output strictly valid JSON only. Do not wrap the output in markdown code blocks
 
 
 
-def generate_with_gemini(api_key, prompt_text):
-    """Generate content using Google Gemini API"""
-    models_to_try = ["gemini-1.5-flash", "gemini-1.5-pro", "gemini-pro"]
-    last_error = None
+# Models tried in order until one succeeds
+GEMINI_MODELS = ["gemini-1.5-flash", "gemini-1.5-pro", "gemini-pro"]
 
-    for model_name in models_to_try:
-        try:
-            log_to_file(f"Attempting Gemini with model: {model_name}")
-            url = f"https://generativelanguage.googleapis.com/v1beta/models/{model_name}:generateContent?key={api_key}"
-            headers = {"Content-Type": "application/json"}
-            data = {
-                "contents": [{"parts": [{"text": prompt_text}]}],
-                "generationConfig": {
-                    "temperature": 0.7,
-                    "topK": 40,
-                    "topP": 0.95,
-                    "maxOutputTokens": 2048,
-                }
-            }
-
-            response = requests.post(url, headers=headers, json=data, timeout=60)
-
-            if response.status_code != 200:
-                raise Exception(f"API Error {response.status_code}: {response.text}")
-
-            result = response.json()
-            return result['candidates'][0]['content']['parts'][0]['text']
+GENERATION_CONFIG = {
+    "temperature": 0.7,
+    "topK": 40,
+    "topP": 0.95,
+    "maxOutputTokens": 2048,
+}
 
-        except Exception as e:
-            last_error = e
-            log_to_file(f"Gemini model {model_name} failed: {str(e)}")
-            continue
+# Batch requests (generate_quiz_batch) answer for several articles at once
+# and get a larger output limit
+BATCH_GENERATION_CONFIG = dict(GENERATION_CONFIG, maxOutputTokens=int(os.getenv("LLM_BATCH_MAX_OUTPUT_TOKENS", "8192")))
 
-    raise Exception(f"All Gemini models failed. Last error: {last_error}")
+# Overridable so tests and local development can point at fake_llm_server.py
+GEMINI_API_BASE = os.getenv("GEMINI_API_BASE", "https://generativelanguage.googleapis.com/v1beta").rstrip("/")
+OPENROUTER_API_BASE = os.getenv("OPENROUTER_API_BASE", "https://openrouter.ai/api/v1").rstrip("/")
+OPENROUTER_MODELS = [m.strip() for m in os.getenv("OPENROUTER_MODELS", "google/gemini-flash-1.5").split(",") if m.strip()]
+
+# Providers the router may use, in order of preference for backends it has
+# no measurements for yet. Gemini and OpenRouter are used when their API key
+# is set; "stub" (canned sample quiz, no network) only when listed here.
+LLM_PROVIDERS = [p.strip().lower() for p in os.getenv("LLM_PROVIDERS", "gemini,openrouter").split(",") if p.strip()]
+
+# Hedged mode: rather than waiting out a slow model before falling back,
+# start the next model once the current one is slower than usual and use
+# whichever valid answer arrives first (see hedging.py)
+LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "1") != "0"
+
+# Serve a local_quiz.py quiz (marked "fallback": true) instead of an error
+# when no backend is configured or every backend failed
+LOCAL_QUIZ_FALLBACK = os.getenv("LOCAL_QUIZ_FALLBACK", "1") != "0"
+
+def configured_backends(generation_config=None):
+    """
+    Router backends for every provider in LLM_PROVIDERS that is usable right
+    now. generation_config (default GENERATION_CONFIG) applies to every call.
+    """
+    config = generation_config or GENERATION_CONFIG
+    backends = []
+    for provider in LLM_PROVIDERS:
+        if provider == "gemini":
+            api_key = os.getenv("GOOGLE_API_KEY")
+            if not api_key:
+                continue
+            for model_name in GEMINI_MODELS:
+                backends.append(llm_router.Backend(
+                    model_name, "gemini", model_name,
+                    generate=lambda prompt, key=api_key, model=model_name: request_gemini(key, model, prompt, config),
+                    stream=lambda prompt, key=api_key, model=model_name: stream_gemini(key, model, prompt, config),
+                ))
+        elif provider == "openrouter":
+            api_key = os.getenv("OPENROUTER_API_KEY")
+            if not api_key:
+                continue
+            for model_name in OPENROUTER_MODELS:
+                backends.append(llm_router.Backend(
+                    f"openrouter/{model_name}", "openrouter", model_name,
+                    generate=lambda prompt, key=api_key, model=model_name: request_openrouter(key, model, prompt, config),
+                    stream=lambda prompt, key=api_key, model=model_name: stream_openrouter(key, model, prompt, config),
+                ))
+        elif provider == "stub":
+            backends.append(llm_router.Backend("stub", "stub", "stub", generate=request_stub, stream=stream_stub))
+        else:
+            log_to_file(f"Unknown LLM provider in LLM_PROVIDERS: {provider}")
+    return backends
+
+def call_llm(prompt_text, validate=None, backends=None):
+    """
+    Send prompt_text to the best backend according to the router, falling
+    back (hedged, when enabled) to the next ones. Backends whose circuit is
+    open are skipped. validate(text) may raise to reject a response; that
+    counts as a failure of the backend. Returns (text, backend_name).
+    """
+    if backends is None:
+        backends = configured_backends()
+    if not backends:
+        raise ValueError("No API key configured (GOOGLE_API_KEY or OPENROUTER_API_KEY)")
+    backends = _available(backends)
+
+    router = llm_router.get_router()
+    ranked = router.rank(backends)
+    log_to_file(f"LLM backend order: {', '.join(b.name for b in ranked)}")
+    attempts = []  # backend names in the order calls were started
+    candidates = [
+        (backend.name, lambda backend=backend: _call_tracked(backend, prompt_text, validate, attempts))
+        for backend in ranked
+    ]
 
-def generate_quiz_data(scraped_data):
+    try:
+        if LLM_HEDGE_ENABLED:
+            try:
+                return hedging.run_hedged(candidates)
+            except Exception as e:
+                raise Exception(f"All LLM backends failed. Last error: {e}")
+
+        last_error = None
+        for name, call in candidates:
+            try:
+                return call(), name
+            except Exception as e:
+                last_error = e
+                log_to_file(f"LLM backend {name} failed: {str(e)}")
+        raise Exception(f"All LLM backends failed. Last error: {last_error}")
+    finally:
+        metrics.observe("llm_request_attempts", len(attempts))
+        metrics.increment("llm_retries_total", max(0, len(attempts) - 1))
+
+def _available(backends):
+    """backends minus those whose circuit is open; raises if none are left."""
+    available = [b for b in backends if circuit_breaker.get_breaker(b.name).available()]
+    if not available:
+        raise circuit_breaker.CircuitOpenError(
+            f"All LLM backends are unavailable (circuit open): {', '.join(b.name for b in backends)}")
+    skipped = len(backends) - len(available)
+    if skipped:
+        log_to_file(f"Skipping {skipped} LLM backend(s) with an open circuit")
+    return available
+
+def backend_status():
+    """Circuit and router state of every configured backend, for /api/llm/status."""
+    backends = configured_backends()
+    circuits = circuit_breaker.statuses([b.name for b in backends])
+    rows = []
+    for row in llm_router.get_router().snapshot(backends):
+        backend = next(b for b in backends if b.name == row["name"])
+        rows.append({"provider": backend.provider, "model": backend.model, **row, "circuit": circuits[backend.name]})
+    return {"providers": LLM_PROVIDERS, "backends": rows}
+
+def _call_tracked(backend, prompt_text, validate=None, attempts=None):
+    if attempts is not None:
+        attempts.append(backend.name)
+    start = time.perf_counter()
+    text, outcome = None, "error"
+    with metrics.usage_scope() as usage:
+        try:
+            # The circuit tracks availability only; a rejected response still
+            # counts against the backend in the router
+            text = circuit_breaker.call(backend.name, lambda: backend.generate(prompt_text))
+            outcome = "invalid"
+            if validate:
+                validate(text)
+            outcome = "ok"
+        except circuit_breaker.CircuitOpenError:
+            outcome = "circuit_open"
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            if outcome != "circuit_open":
+                llm_router.get_router().record(backend.name, elapsed, ok=outcome == "ok")
+            record_llm_call(backend, prompt_text, text, elapsed, outcome, usage)
+    return text
+
+def record_llm_call(backend, prompt_text, response_text, seconds, outcome, usage=None, streamed=False):
+    """
+    Metrics for one attempt against one backend. Token counts come from the
+    provider's usage report when it sent one, else they are estimated from
+    the text length (4 characters per token).
+    """
+    usage = usage or {}
+    prompt_tokens = usage.get("prompt_tokens")
+    response_tokens = usage.get("response_tokens")
+    estimated = prompt_tokens is None or (response_text is not None and response_tokens is None)
+    if prompt_tokens is None:
+        prompt_tokens = context_packer.estimate_tokens(prompt_text)
+    if response_tokens is None and response_text is not None:
+        response_tokens = context_packer.estimate_tokens(response_text)
+
+    labels = {"backend": backend.name}
+    metrics.increment("llm_calls_total", backend=backend.name, outcome=outcome)
+    metrics.observe("llm_call_seconds", seconds, backend=backend.name, outcome=outcome)
+    metrics.observe("llm_prompt_chars", len(prompt_text), **labels)
+    metrics.observe("llm_prompt_tokens", prompt_tokens, **labels)
+    metrics.increment("llm_prompt_tokens_total", prompt_tokens, **labels)
+    if response_tokens is not None:
+        metrics.observe("llm_response_tokens", response_tokens, **labels)
+        metrics.increment("llm_response_tokens_total", response_tokens, **labels)
+    metrics.get_registry().record_call({
+        "time": datetime.datetime.now().isoformat(timespec="seconds"),
+        "backend": backend.name,
+        "provider": backend.provider,
+        "model": backend.model,
+        "streamed": streamed,
+        "outcome": outcome,
+        "seconds": round(seconds, 3),
+        "prompt_chars": len(prompt_text),
+        "prompt_tokens": prompt_tokens,
+        "response_chars": len(response_text) if response_text is not None else None,
+        "response_tokens": response_tokens,
+        "tokens_estimated": estimated,
+    })
+
+def request_gemini(api_key, model_name, prompt_text, generation_config=None):
+    """One generateContent call to model_name. Returns the response text."""
+    log_to_file(f"Attempting Gemini with model: {model_name}")
+    url = f"{GEMINI_API_BASE}/models/{model_name}:generateContent?key={api_key}"
+    headers = {"Content-Type": "application/json"}
+    data = {
+        "contents": [{"parts": [{"text": prompt_text}]}],
+        "generationConfig": generation_config or GENERATION_CONFIG
+    }
+
+    response = http_client.get_session().post(url, headers=headers, json=data, timeout=http_client.llm_timeout())
+
+    if response.status_code != 200:
+        raise Exception(f"API Error {response.status_code}: {response.text}")
+
+    result = response.json()
+    usage = result.get("usageMetadata") or {}
+    metrics.note_usage(usage.get("promptTokenCount"), usage.get("candidatesTokenCount"))
+    return result['candidates'][0]['content']['parts'][0]['text']
+
+def stream_gemini(api_key, model_name, prompt_text, generation_config=None):
+    """
+    streamGenerateContent call to model_name over server-sent events.
+    Yields the response text piece by piece as Gemini produces it.
     """
-    Generate quiz data using Google Gemini API.
+    log_to_file(f"Streaming Gemini with model: {model_name}")
+    url = f"{GEMINI_API_BASE}/models/{model_name}:streamGenerateContent?alt=sse&key={api_key}"
+    headers = {"Content-Type": "application/json"}
+    data = {
+        "contents": [{"parts": [{"text": prompt_text}]}],
+        "generationConfig": generation_config or GENERATION_CONFIG
+    }
+
+    with http_client.get_session().post(url, headers=headers, json=data, timeout=http_client.llm_timeout(), stream=True) as response:
+        if response.status_code != 200:
+            raise Exception(f"API Error {response.status_code}: {response.text}")
+
+        for line in response.iter_lines(decode_unicode=True):
+            # Each event is a "data: {GenerateContentResponse}" line
+            if not line or not line.startswith("data:"):
+                continue
+            event = json.loads(line[len("data:"):].strip())
+            usage = event.get("usageMetadata")
+            if usage:
+                # Every event carries the running totals
+                metrics.note_usage(usage.get("promptTokenCount"), usage.get("candidatesTokenCount"))
+            for candidate in event.get("candidates", []):
+                for part in candidate.get("content", {}).get("parts", []):
+                    if part.get("text"):
+                        yield part["text"]
+
+def _openrouter_payload(model_name, prompt_text, stream=False, generation_config=None):
+    config = generation_config or GENERATION_CONFIG
+    payload = {
+        "model": model_name,
+        "messages": [{"role": "user", "content": prompt_text}],
+        "temperature": config["temperature"],
+        "top_p": config["topP"],
+        "top_k": config["topK"],
+        "max_tokens": config["maxOutputTokens"],
+    }
+    if stream:
+        payload["stream"] = True
+    return payload
+
+def request_openrouter(api_key, model_name, prompt_text, generation_config=None):
+    """One OpenRouter chat completion. Returns the response text."""
+    log_to_file(f"Attempting OpenRouter with model: {model_name}")
+    headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+    response = http_client.get_session().post(
+        f"{OPENROUTER_API_BASE}/chat/completions", headers=headers,
+        json=_openrouter_payload(model_name, prompt_text, generation_config=generation_config),
+        timeout=http_client.llm_timeout()
+    )
+
+    if response.status_code != 200:
+        raise Exception(f"API Error {response.status_code}: {response.text}")
+
+    result = response.json()
+    usage = result.get("usage") or {}
+    metrics.note_usage(usage.get("prompt_tokens"), usage.get("completion_tokens"))
+    return result['choices'][0]['message']['content']
+
+def stream_openrouter(api_key, model_name, prompt_text, generation_config=None):
+    """Streaming OpenRouter chat completion (OpenAI-style SSE). Yields text pieces."""
+    log_to_file(f"Streaming OpenRouter with model: {model_name}")
+    headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+    with http_client.get_session().post(
+        f"{OPENROUTER_API_BASE}/chat/completions", headers=headers,
+        json=_openrouter_payload(model_name, prompt_text, stream=True, generation_config=generation_config),
+        timeout=http_client.llm_timeout(), stream=True
+    ) as response:
+        if response.status_code != 200:
+            raise Exception(f"API Error {response.status_code}: {response.text}")
+
+        for line in response.iter_lines(decode_unicode=True):
+            # "data: {...}" events, ": OPENROUTER PROCESSING" keep-alives, "data: [DONE]" at the end
+            if not line or not line.startswith("data:"):
+                continue
+            payload = line[len("data:"):].strip()
+            if payload == "[DONE]":
+                break
+            event = json.loads(payload)
+            usage = event.get("usage")
+            if usage:
+                metrics.note_usage(usage.get("prompt_tokens"), usage.get("completion_tokens"))
+            for choice in event.get("choices", []):
+                text = (choice.get("delta") or {}).get("content")
+                if text:
+                    yield text
+
+def request_stub(prompt_text):
+    """Offline backend: the sample quiz, whatever the prompt."""
+    sample = SAMPLE_QUIZ_DATA or {}
+    return json.dumps({"quiz": sample.get("quiz", []), "related_topics": sample.get("related_topics", [])})
+
+def stream_stub(prompt_text):
+    text = request_stub(prompt_text)
+    for start in range(0, len(text), 64):
+        yield text[start:start + 64]
+
+def parse_quiz_response(content):
+    """
+    Parse the model's quiz JSON, tolerating markdown fences, surrounding
+    text and truncation. Returns (quiz_data, partial); partial means the
+    output was cut off and only its complete questions were recovered.
+    Raises ValueError if no question could be recovered at all.
+    """
+    return llm_stream.parse_quiz_output(content)
+
+def build_prompt(scraped_data):
+    """Render QUIZ_PROMPT_TEMPLATE for scraped article data."""
+    return QUIZ_PROMPT_TEMPLATE.format(
+        title=scraped_data["title"],
+        summary=scraped_data["summary"],
+        sections=", ".join(scraped_data["sections"]),
+        key_entities=json.dumps(scraped_data["key_entities"]),
+        full_text=context_packer.pack_context(scraped_data)
+    )
+
+def build_quiz_result(scraped_data, quiz_data, model_name, partial=False):
+    result = {
+        "title": scraped_data["title"],
+        "summary": scraped_data["summary"],
+        "key_entities": scraped_data["key_entities"],
+        "sections": scraped_data["sections"],
+        "related_topics": quiz_data.get("related_topics", []),
+        "quiz": quiz_data.get("quiz", []),
+        "model": model_name
+    }
+    if partial:
+        result["partial"] = True
+    return result
+
+def generate_quiz_data(scraped_data, use_cache=True):
+    """
+    Generate quiz data with the fastest healthy LLM backend (see llm_router.py).
+    Responses are cached by prompt, model and generation config; pass
+    use_cache=False to force a new generation (the result still replaces
+    the cached one).
     """
     google_key = os.getenv("GOOGLE_API_KEY")
+    openrouter_key = os.getenv("OPENROUTER_API_KEY")
 
-    log_to_file(f"API Keys - Google: {'Set' if google_key else 'Not set'}")
+    log_to_file(f"API Keys - Google: {'Set' if google_key else 'Not set'}, OpenRouter: {'Set' if openrouter_key else 'Not set'}")
 
-    if not google_key:
-         log_to_file("CRITICAL ERROR: No API key set. Falling back to sample data.")
-         raise ValueError("No API key configured (GOOGLE_API_KEY)")
+    start = time.perf_counter()
+    backends = configured_backends()
+    if not backends:
+         fallback = _local_fallback(scraped_data, "no API key set")
+         if fallback:
+             _record_generation(start, "local", fallback)
+             return fallback
+         _record_generation(start, "llm", None)
+         log_to_file("CRITICAL ERROR: No API key set.")
+         raise ValueError("No API key configured (GOOGLE_API_KEY or OPENROUTER_API_KEY)")
 
     try:
         log_to_file(f"Generating quiz for: {scraped_data.get('title')}")
 
-        # Format the prompt
-        prompt_text = QUIZ_PROMPT_TEMPLATE.format(
-            title=scraped_data["title"],
-            summary=scraped_data["summary"],
-            sections=", ".join(scraped_data["sections"]),
-            key_entities=json.dumps(scraped_data["key_entities"]),
-            full_text=scraped_data["full_text"][:4000]
-        )
-
-        content = ""
-
-        # Use Google Gemini API for quiz generation
-        log_to_file("Using Google Gemini API for quiz generation")
-        content = generate_with_gemini(google_key, prompt_text)
-
-        # Clean up content
-        content = content.strip()
-        
-        # Remove markdown code blocks if present
-        if content.startswith("```"):
-            content = re.sub(r"^```(?:json)?\s*", "", content)
-            content = re.sub(r"\s*```$", "", content)
-            
-        # Parse JSON
-        try:
-            quiz_data = json.loads(content)
-        except json.JSONDecodeError:
-            # Try to extract JSON from the response using a non-greedy match for the outer braces
-            # Find the first '{' and the last '}'
-            start_idx = content.find('{')
-            end_idx = content.rfind('}')
-            
-            if start_idx != -1 and end_idx != -1:
-                json_str = content[start_idx:end_idx+1]
-                try:
-                    quiz_data = json.loads(json_str)
-                except json.JSONDecodeError as e:
-                     raise ValueError(f"Failed to parse JSON from response: {e}. Content snippet: {content[:200]}...")
-            else:
-                raise ValueError(f"Failed to find JSON object in response: {content[:200]}...")
+        prompt_text = build_prompt(scraped_data)
+
+        backend_names = [b.name for b in backends]
+        cached = llm_cache.lookup(prompt_text, backend_names, GENERATION_CONFIG) if use_cache else None
+        if cached:
+            log_to_file(f"LLM cache hit ({cached[1]})")
+            content, model_name = cached
+        else:
+            # A response that doesn't parse counts as a failure of that backend
+            content, model_name = call_llm(prompt_text, validate=parse_quiz_response, backends=backends)
+            log_to_file(f"Quiz generated by {model_name}")
+
+        quiz_data, partial = parse_quiz_response(content)
+        if partial:
+            log_to_file(f"Response from {model_name} was truncated; kept {len(quiz_data['quiz'])} complete questions")
 
-        return {
-            "title": scraped_data["title"],
-            "summary": scraped_data["summary"],
-            "key_entities": scraped_data["key_entities"],
-            "sections": scraped_data["sections"],
-            "related_topics": quiz_data.get("related_topics", []),
-            "quiz": quiz_data.get("quiz", [])
-        }
+        # Only complete responses are worth replaying; a truncated one gets
+        # another chance at a full generation next time
+        if not cached and not partial:
+            llm_cache.store(prompt_text, model_name, GENERATION_CONFIG, content)
+
+        result = build_quiz_result(scraped_data, quiz_data, model_name, partial)
+        _record_generation(start, "cache" if cached else "llm", result)
+        return result
 
     except Exception as e:
         log_to_file(f"Quiz generation failed: {e}")
@@ -223,5 +533,220 @@ def generate_quiz_data(scraped_data):
         print(f"Exception type: {type(e).__name__}")
         print(f"Exception message: {str(e)}")
 
+        fallback = _local_fallback(scraped_data, str(e))
+        _record_generation(start, "llm", None)
+        if fallback:
+            _record_generation(start, "local", fallback)
+            return fallback
         # Don't fall back to sample data - raise the error so user knows
-        raise ValueError(f"Quiz generation failed: {str(e)}. Please check your API keys (GOOGLE_API_KEY) in the .env file.")
+        raise ValueError(f"Quiz generation failed: {str(e)}. Please check your API keys (GOOGLE_API_KEY or OPENROUTER_API_KEY) in the .env file.")
+
+def _record_generation(start, source, result):
+    """Per-quiz metrics: where the quiz came from (cache, llm, local), time taken, questions."""
+    outcome = "failed" if result is None else ("partial" if result.get("partial") else "complete")
+    metrics.increment("quiz_generations_total", source=source, result=outcome)
+    metrics.observe("quiz_generation_seconds", time.perf_counter() - start, source=source)
+    if result is not None:
+        metrics.observe("quiz_questions", len(result.get("quiz", [])), source=source)
+
+def generate_local_quiz_data(scraped_data):
+    """Quiz built by local_quiz.py, no network; same result format as generate_quiz_data."""
+    return build_quiz_result(scraped_data, local_quiz.generate_local_quiz(scraped_data), local_quiz.MODEL_NAME)
+
+def _local_fallback(scraped_data, reason):
+    """The local quiz as a stand-in for a failed generation, or None if disabled or empty."""
+    if not LOCAL_QUIZ_FALLBACK:
+        return None
+    result = generate_local_quiz_data(scraped_data)
+    if not result["quiz"]:
+        return None
+    log_to_file(f"Serving local quiz for {scraped_data.get('title')} ({reason})")
+    result["fallback"] = True
+    return result
+
+def generate_quiz_batch(scraped_list, use_cache=True):
+    """
+    Generate quizzes for several articles, packing as many as fit (see
+    llm_batch.py) into each LLM request so the instruction block is sent
+    once per batch instead of once per article.
+
+    Returns a list in input order with, per article, the dict
+    generate_quiz_data would return, or {"title", "error"} if it failed.
+    Articles missing or unparseable in a batch response, and whole batches
+    that failed, are retried one by one with the single-article prompt.
+    With no backend configured each article gets the local quiz, as in
+    generate_quiz_data (see LOCAL_QUIZ_FALLBACK).
+    """
+    backends = configured_backends(BATCH_GENERATION_CONFIG)
+    if not backends:
+        return [_generate_or_error(scraped) for scraped in scraped_list]
+    backend_names = [b.name for b in backends]
+
+    results = [None] * len(scraped_list)
+    prompts = [build_prompt(scraped) for scraped in scraped_list]
+    pending = {}  # batch key -> index
+    for index, scraped in enumerate(scraped_list):
+        cached = llm_cache.lookup(prompts[index], backend_names, GENERATION_CONFIG) if use_cache else None
+        if cached:
+            quiz_data, partial = parse_quiz_response(cached[0])
+            results[index] = build_quiz_result(scraped, quiz_data, cached[1], partial)
+        else:
+            pending[llm_batch.article_key(index)] = index
+
+    rendered = [(key, llm_batch.render_article(key, scraped_list[index])) for key, index in pending.items()]
+    max_articles = llm_batch.max_articles_per_batch(BATCH_GENERATION_CONFIG["maxOutputTokens"])
+    batches = llm_batch.plan_batches(rendered, max_articles)
+    log_to_file(f"Batch generation: {len(scraped_list)} articles, {len(scraped_list) - len(pending)} cached, {len(batches)} requests")
+
+    retry = []
+    for batch in batches:
+        keys = [key for key, _ in batch]
+        if len(keys) == 1:
+            retry.append(pending[keys[0]])
+            continue
+
+        def validate(text, keys=keys):
+            if not llm_batch.split_batch_output(text, keys):
+                raise ValueError("Batch response contained no usable quiz")
+
+        try:
+            content, model_name = call_llm(llm_batch.build_batch_prompt(batch), validate=validate, backends=backends)
+        except Exception as e:
+            log_to_file(f"Batch of {len(keys)} failed, retrying individually: {e}")
+            retry.extend(pending[key] for key in keys)
+            continue
+
+        parsed = llm_batch.split_batch_output(content, keys)
+        for key in keys:
+            index = pending[key]
+            quiz_data = parsed.get(key)
+            if quiz_data is None:
+                retry.append(index)
+                continue
+            # Cached under the single-article prompt, so a later request
+            # for the same article is served without another call
+            llm_cache.store(prompts[index], model_name, GENERATION_CONFIG, json.dumps(quiz_data))
+            results[index] = build_quiz_result(scraped_list[index], quiz_data, model_name)
+        log_to_file(f"Batch of {len(keys)} by {model_name}: {len(parsed)} parsed")
+
+    for index in sorted(retry):
+        # The cache was already checked above
+        results[index] = _generate_or_error(scraped_list[index], use_cache=False)
+    return results
+
+def _generate_or_error(scraped_data, use_cache=True):
+    """generate_quiz_data, with a failure returned as a generate_quiz_batch error entry."""
+    try:
+        return generate_quiz_data(scraped_data, use_cache=use_cache)
+    except ValueError as e:
+        return {"title": scraped_data.get("title"), "error": str(e)}
+
+def stream_quiz_data(scraped_data, use_cache=True):
+    """
+    Streaming counterpart of generate_quiz_data. Yields ("question", dict)
+    for each quiz question as soon as it has been generated, then
+    ("done", quiz_data) with the same dict generate_quiz_data returns.
+
+    Backends are tried in router order, but only until one has produced a
+    question; after that a failure ends the stream with an error rather
+    than starting over on another backend. If none is configured or none
+    produced anything, the local quiz is streamed instead (see
+    LOCAL_QUIZ_FALLBACK).
+    """
+    start = time.perf_counter()
+    backends = [b for b in configured_backends() if b.stream]
+    if not backends:
+        fallback = _local_fallback(scraped_data, "no API key set")
+        if not fallback:
+            _record_generation(start, "llm", None)
+            raise ValueError("No API key configured (GOOGLE_API_KEY or OPENROUTER_API_KEY)")
+        _record_generation(start, "local", fallback)
+        for question in fallback["quiz"]:
+            yield "question", question
+        yield "done", fallback
+        return
+
+    log_to_file(f"Streaming quiz for: {scraped_data.get('title')}")
+    prompt_text = build_prompt(scraped_data)
+
+    cached = llm_cache.lookup(prompt_text, [b.name for b in backends], GENERATION_CONFIG) if use_cache else None
+    if cached:
+        log_to_file(f"LLM cache hit ({cached[1]})")
+        quiz_data, _ = parse_quiz_response(cached[0])
+        result = build_quiz_result(scraped_data, quiz_data, cached[1])
+        _record_generation(start, "cache", result)
+        for question in quiz_data.get("quiz", []):
+            yield "question", question
+        yield "done", result
+        return
+
+    router = llm_router.get_router()
+    last_error = None
+    try:
+        backends = _available(backends)
+    except circuit_breaker.CircuitOpenError as e:
+        backends, last_error = [], e
+    for backend in router.rank(backends):
+        breaker = circuit_breaker.get_breaker(backend.name)
+        if not breaker.acquire():
+            last_error = circuit_breaker.CircuitOpenError(f"Circuit open for {backend.name}")
+            continue
+        parser = llm_stream.QuizStreamParser()
+        attempt_start = time.perf_counter()
+        usage = {}
+        recorded = False
+        try:
+            try:
+                for piece in metrics.collect_usage(backend.stream(prompt_text), usage):
+                    for question in parser.feed(piece):
+                        if len(parser.questions) == 1 and question is parser.questions[0]:
+                            # Time to first question: what a streaming client waits for,
+                            # so counted from the start of the generation, not the attempt
+                            metrics.observe("quiz_first_question_seconds", time.perf_counter() - start,
+                                            backend=backend.name)
+                        yield "question", question
+            except Exception:
+                breaker.record(False)
+                recorded = True
+                record_llm_call(backend, prompt_text, parser.text or None, time.perf_counter() - attempt_start,
+                                "error", usage, streamed=True)
+                raise
+            breaker.record(True)
+            recorded = True
+            try:
+                quiz_data, partial = parser.finish()
+            except Exception:
+                record_llm_call(backend, prompt_text, parser.text, time.perf_counter() - attempt_start,
+                                "invalid", usage, streamed=True)
+                raise
+        except Exception as e:
+            router.record(backend.name, time.perf_counter() - attempt_start, ok=False)
+            last_error = e
+            log_to_file(f"LLM stream {backend.name} failed: {str(e)}")
+            if parser.questions:
+                raise ValueError(f"Quiz generation failed mid-stream: {str(e)}")
+            continue
+        finally:
+            if not recorded:
+                # The client went away mid-stream: no verdict on the backend
+                breaker.release()
+
+        record_llm_call(backend, prompt_text, parser.text, time.perf_counter() - attempt_start, "ok", usage, streamed=True)
+        router.record(backend.name, time.perf_counter() - attempt_start, ok=True)
+        if not partial:
+            llm_cache.store(prompt_text, backend.name, GENERATION_CONFIG, parser.text)
+        log_to_file(f"Quiz streamed by {backend.name}{' (truncated)' if partial else ''}")
+        result = build_quiz_result(scraped_data, quiz_data, backend.name, partial)
+        _record_generation(start, "llm", result)
+        yield "done", result
+        return
+
+    fallback = _local_fallback(scraped_data, str(last_error))
+    _record_generation(start, "llm", None)
+    if fallback:
+        _record_generation(start, "local", fallback)
+        for question in fallback["quiz"]:
+            yield "question", question
+        yield "done", fallback
+        return
+    raise ValueError(f"Quiz generation failed: All LLM backends failed. Last error: {last_error}")
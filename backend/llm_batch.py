@@ -0,0 +1,129 @@
+import os
+import re
+import json
+
+try:
+    from . import context_packer
+    from .llm_stream import usable_quiz
+except ImportError:
+    import context_packer
+    from llm_stream import usable_quiz
+
+# Estimated prompt tokens per batch request, instructions included
+BATCH_TOKEN_BUDGET = int(os.getenv("LLM_BATCH_TOKEN_BUDGET", "6000"))
+# Articles per request are also capped by the output budget: each article's
+# five questions take roughly this many output tokens
+OUTPUT_TOKENS_PER_ARTICLE = int(os.getenv("LLM_BATCH_OUTPUT_TOKENS_PER_ARTICLE", "700"))
+MAX_BATCH_ARTICLES = int(os.getenv("LLM_BATCH_MAX_ARTICLES", "5"))
+
+BATCH_PROMPT_TEMPLATE = """
+You are an expert quiz generator. Your task is to create a highly accurate multiple-choice quiz for EACH of the Wikipedia articles below, based ONLY on that article's content.
+
+Instructions (apply to every article separately):
+1. Generate 5 multiple-choice questions per article.
+2. **IMPORTANT**: Focus on different aspects of the article than typical generic questions.
+3. **STRICT CONSTRAINT**: You must use ONLY the article's own text to generate its questions and answers. Do not use your internal knowledge base or the other articles. If a fact is not in the text, do not ask about it.
+4. Each question must have 4 options (A, B, C, D).
+5. The 'answer' field MUST BE AN EXACT STRING MATCH to one of the options.
+6. Provide a short, clear explanation for why the answer is correct, citing the context if possible.
+7. Vary the difficulty (easy, medium, hard).
+
+{articles}
+
+Output one JSON object with one entry per article, keyed by the article key ({keys}), in this exact format:
+{{
+  "{first_key}": {{
+    "quiz": [
+      {{
+        "question": "Question text",
+        "options": ["Option 1", "Option 2", "Option 3", "Option 4"],
+        "answer": "Option 2",
+        "difficulty": "easy",
+        "explanation": "Explanation here."
+      }}
+    ],
+    "related_topics": ["Topic 1", "Topic 2", "Topic 3"]
+  }}
+}}
+
+Output strictly valid JSON only. Do not wrap the output in markdown code blocks (e.g., ```json ... ```). Just return the raw JSON string.
+"""
+
+ARTICLE_TEMPLATE = """=== Article key: {key} ===
+Article Title: {title}
+Summary: {summary}
+Sections: {sections}
+Key Entities: {key_entities}
+Full Text: {full_text}
+"""
+
+_decoder = json.JSONDecoder()
+
+
+def article_key(index: int) -> str:
+    return f"article_{index + 1}"
+
+
+def render_article(key: str, scraped_data: dict) -> str:
+    return ARTICLE_TEMPLATE.format(
+        key=key,
+        title=scraped_data["title"],
+        summary=scraped_data["summary"],
+        sections=", ".join(scraped_data["sections"]),
+        key_entities=json.dumps(scraped_data["key_entities"]),
+        full_text=context_packer.pack_context(scraped_data),
+    )
+
+
+def max_articles_per_batch(max_output_tokens: int) -> int:
+    return max(1, min(MAX_BATCH_ARTICLES, max_output_tokens // OUTPUT_TOKENS_PER_ARTICLE))
+
+
+def plan_batches(articles: list, max_articles: int = MAX_BATCH_ARTICLES, budget: int = None) -> list:
+    """
+    Group articles (a list of (key, rendered_text)) into batches, in order,
+    so that each batch's estimated prompt stays under budget and holds at
+    most max_articles. An article too big for any batch gets one to itself.
+    """
+    budget = BATCH_TOKEN_BUDGET if budget is None else budget
+    overhead = context_packer.estimate_tokens(BATCH_PROMPT_TEMPLATE)
+    batches, current, used = [], [], overhead
+    for key, text in articles:
+        cost = context_packer.estimate_tokens(text)
+        if current and (used + cost > budget or len(current) >= max_articles):
+            batches.append(current)
+            current, used = [], overhead
+        current.append((key, text))
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def build_batch_prompt(batch: list) -> str:
+    keys = [key for key, _ in batch]
+    return BATCH_PROMPT_TEMPLATE.format(
+        articles="\n".join(text for _, text in batch),
+        keys=", ".join(keys),
+        first_key=keys[0],
+    )
+
+
+def split_batch_output(text: str, keys: list) -> dict:
+    """
+    The per-article quiz dicts in a batch response, by key. Each entry is
+    decoded on its own, so fences, chatter, or a response cut off midway
+    only cost the articles whose entry is broken or missing.
+    """
+    results = {}
+    for key in keys:
+        match = re.search(r'"' + re.escape(key) + r'"\s*:\s*(?=\{)', text)
+        if not match:
+            continue
+        try:
+            value, _ = _decoder.raw_decode(text, match.end())
+        except ValueError:
+            continue
+        if usable_quiz(value):
+            results[key] = {"quiz": value["quiz"], "related_topics": value.get("related_topics", [])}
+    return results
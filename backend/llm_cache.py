@@ -0,0 +1,76 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+try:
+    from .disk_cache import DiskCache, default_cache_dir
+except ImportError:
+    from disk_cache import DiskCache, default_cache_dir
+
+# Cache settings (override via environment)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") != "0"
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR") or default_cache_dir("llm")
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(20 * 1024 * 1024)))
+# Wikipedia articles change slowly, but give a regenerated quiz a chance eventually
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+
+_cache = DiskCache(LLM_CACHE_DIR, max_bytes=LLM_CACHE_MAX_BYTES, ttl=LLM_CACHE_TTL)
+
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "stores": 0}
+
+
+def cache_key(prompt: str, model: str, config: dict) -> str:
+    """Content hash of everything that determines the model's response."""
+    material = json.dumps({"prompt": prompt, "model": model, "config": config}, sort_keys=True)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def lookup(prompt: str, models, config: dict):
+    """
+    Return (response_text, model) for the first of models with a cached
+    response to prompt under config, or None. Counts one hit or miss.
+    """
+    if not LLM_CACHE_ENABLED:
+        return None
+    for model in models:
+        entry = _cache.get(cache_key(prompt, model, config))
+        if entry is not None:
+            _count("hits")
+            return entry["text"], model
+    _count("misses")
+    return None
+
+
+def store(prompt: str, model: str, config: dict, text: str) -> None:
+    if not LLM_CACHE_ENABLED:
+        return
+    _cache.set(cache_key(prompt, model, config), {"text": text, "model": model, "stored_at": time.time()})
+    _count("stores")
+
+
+def stats() -> dict:
+    """Hit/miss counters for this process."""
+    with _stats_lock:
+        result = dict(_stats)
+    lookups = result["hits"] + result["misses"]
+    result["hit_rate"] = round(result["hits"] / lookups, 3) if lookups else None
+    result["enabled"] = LLM_CACHE_ENABLED
+    return result
+
+
+def reset_stats() -> None:
+    with _stats_lock:
+        for name in _stats:
+            _stats[name] = 0
+
+
+def clear() -> None:
+    _cache.clear()
+
+
+def _count(name: str) -> None:
+    with _stats_lock:
+        _stats[name] += 1
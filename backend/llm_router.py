@@ -0,0 +1,126 @@
+import os
+import time
+import threading
+
+# Weight of the newest observation in the moving averages
+LATENCY_ALPHA = float(os.getenv("LLM_ROUTER_LATENCY_ALPHA", "0.3"))
+ERROR_ALPHA = float(os.getenv("LLM_ROUTER_ERROR_ALPHA", "0.3"))
+# Backends above this error rate are only tried after every healthy one
+MAX_ERROR_RATE = float(os.getenv("LLM_ROUTER_MAX_ERROR_RATE", "0.5"))
+# An idle backend's error rate halves every this many seconds, so one that
+# stopped getting traffic after failing is eventually tried again
+ERROR_HALF_LIFE = float(os.getenv("LLM_ROUTER_ERROR_HALF_LIFE", "60"))
+# Assumed latency of a backend that hasn't answered yet
+PRIOR_LATENCY = float(os.getenv("LLM_ROUTER_PRIOR_LATENCY", "10"))
+
+
+class Backend:
+    """
+    One provider/model pair the router can send a prompt to.
+
+    generate(prompt_text) returns the full response text; stream, if the
+    provider supports it, is a generator function yielding text pieces.
+    """
+
+    def __init__(self, name: str, provider: str, model: str, generate, stream=None):
+        self.name = name
+        self.provider = provider
+        self.model = model
+        self.generate = generate
+        self.stream = stream
+
+    def __repr__(self):
+        return f"Backend({self.name!r})"
+
+
+class _Stats:
+    __slots__ = ("latency", "error_rate", "updated_at", "calls", "failures")
+
+    def __init__(self):
+        self.latency = None
+        self.error_rate = 0.0
+        self.updated_at = 0.0
+        self.calls = 0
+        self.failures = 0
+
+
+class LLMRouter:
+    """
+    Orders backends by observed performance.
+
+    Every call's outcome is fed to record(): an exponentially weighted
+    moving average of latency, and one of the error rate (1 per failure,
+    0 per success). rank() puts healthy backends first, fastest first with
+    errors as a penalty; unhealthy ones stay at the end as a last resort.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}  # backend name -> _Stats
+
+    def record(self, name: str, latency: float, ok: bool) -> None:
+        now = time.time()
+        with self._lock:
+            stats = self._stats.setdefault(name, _Stats())
+            error_rate = self._decayed_error_rate(stats, now)
+            stats.error_rate = error_rate + ERROR_ALPHA * ((0.0 if ok else 1.0) - error_rate)
+            # A failure's duration is still latency the caller paid for
+            if stats.latency is None:
+                stats.latency = latency
+            else:
+                stats.latency += LATENCY_ALPHA * (latency - stats.latency)
+            stats.updated_at = now
+            stats.calls += 1
+            if not ok:
+                stats.failures += 1
+
+    def rank(self, backends: list) -> list:
+        """backends reordered best first; ties keep the given (configured) order."""
+        now = time.time()
+        with self._lock:
+            keys = {}
+            for position, backend in enumerate(backends):
+                stats = self._stats.get(backend.name)
+                error_rate = self._decayed_error_rate(stats, now) if stats else 0.0
+                latency = stats.latency if stats and stats.latency is not None else PRIOR_LATENCY
+                keys[backend.name] = (error_rate > MAX_ERROR_RATE, latency * (1 + 4 * error_rate), position)
+        return sorted(backends, key=lambda backend: keys[backend.name])
+
+    def snapshot(self, backends: list = None) -> list:
+        """Per-backend stats in rank order, for status and debug endpoints."""
+        now = time.time()
+        with self._lock:
+            names = [b.name for b in backends] if backends is not None else list(self._stats)
+            rows = []
+            for name in names:
+                stats = self._stats.get(name) or _Stats()
+                error_rate = self._decayed_error_rate(stats, now)
+                rows.append({
+                    "name": name,
+                    "latency_ewma": round(stats.latency, 3) if stats.latency is not None else None,
+                    "error_rate": round(error_rate, 3),
+                    "healthy": error_rate <= MAX_ERROR_RATE,
+                    "calls": stats.calls,
+                    "failures": stats.failures,
+                })
+        if backends is not None:
+            order = {b.name: i for i, b in enumerate(self.rank(backends))}
+            rows.sort(key=lambda row: order[row["name"]])
+        return rows
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    @staticmethod
+    def _decayed_error_rate(stats, now: float) -> float:
+        if not stats.error_rate or ERROR_HALF_LIFE <= 0:
+            return stats.error_rate
+        return stats.error_rate * 0.5 ** ((now - stats.updated_at) / ERROR_HALF_LIFE)
+
+
+_router = LLMRouter()
+
+
+def get_router() -> LLMRouter:
+    return _router
@@ -0,0 +1,169 @@
+import re
+import json
+
+FENCE_START_RE = re.compile(r"^```(?:json)?\s*")
+FENCE_END_RE = re.compile(r"\s*```$")
+
+
+class QuizStreamParser:
+    """
+    Incremental, tolerant scanner over quiz JSON produced by the model.
+
+    feed() takes each new piece of model output and returns the question
+    objects of the top-level "quiz" array that became complete with it, so
+    a question can be sent on before the rest of the response is generated.
+    Markdown fences or prose around the JSON are skipped, since only brace,
+    bracket and string structure is tracked.
+
+    finish() then turns everything fed so far into quiz data. Output that
+    was cut off (e.g. at maxOutputTokens) still yields every question that
+    was completed before the cut, flagged as partial. Only objects shaped
+    like a question (see is_question) count as questions.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._last_string = None
+        self._key = None  # Key of the member being read in the root object
+        self._quiz_depth = None  # Depth inside the quiz array, once found
+        self._quiz_closed = False
+        self._item_start = None
+        self._member_start = None  # Start of the array/object value of the current root key
+        self.questions = []
+        self.members = {}  # Root keys whose array/object value is complete
+
+    def feed(self, chunk: str) -> list:
+        self.text += chunk
+        completed = []
+        text = self.text
+        for i in range(self._pos, len(text)):
+            c = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    self._last_string = text[self._string_start + 1:i]
+                continue
+
+            if c == '"':
+                self._in_string = True
+                self._string_start = i
+            elif c == ":":
+                if self._depth == 1:
+                    self._key = self._last_string
+            elif c == ",":
+                if self._depth == 1:
+                    self._key = None
+            elif c in "{[":
+                self._depth += 1
+                if self._depth == 2 and self._key is not None:
+                    self._member_start = i
+                if c == "[" and self._depth == 2 and self._key == "quiz" and self._quiz_depth is None:
+                    self._quiz_depth = self._depth
+                elif c == "{" and self._in_quiz() and self._depth == self._quiz_depth + 1:
+                    self._item_start = i
+            elif c in "}]":
+                if c == "}" and self._item_start is not None and self._depth == self._quiz_depth + 1:
+                    question = self._load(text[self._item_start:i + 1])
+                    self._item_start = None
+                    if is_question(question):
+                        self.questions.append(question)
+                        completed.append(question)
+                elif c == "]" and self._in_quiz() and self._depth == self._quiz_depth:
+                    self._quiz_closed = True
+                if self._depth == 2 and self._member_start is not None:
+                    value = self._load(text[self._member_start:i + 1], dict_only=False)
+                    if value is not None:
+                        self.members[self._key] = value
+                    self._member_start = None
+                self._depth = max(0, self._depth - 1)
+        self._pos = len(text)
+        return completed
+
+    def finish(self):
+        """
+        Return (quiz_data, partial) for the text fed so far. partial is
+        False when the whole output parsed as JSON, True when only the
+        completed questions (and related_topics, if complete) were recovered.
+        Raises ValueError when not a single question could be recovered, so
+        valid JSON without one (an error object, an empty quiz) fails too.
+        """
+        quiz_data = parse_whole(self.text)
+        if usable_quiz(quiz_data):
+            return quiz_data, False
+        if not self.questions:
+            if quiz_data is not None:
+                raise ValueError(f"Response contained no usable quiz: {self.text.strip()[:200]}...")
+            raise ValueError(f"Failed to find JSON object in response: {self.text.strip()[:200]}...")
+        related_topics = self.members.get("related_topics")
+        return {
+            "quiz": list(self.questions),
+            "related_topics": related_topics if isinstance(related_topics, list) else [],
+        }, True
+
+    def _in_quiz(self) -> bool:
+        return self._quiz_depth is not None and not self._quiz_closed
+
+    @staticmethod
+    def _load(fragment: str, dict_only: bool = True):
+        try:
+            value = json.loads(fragment)
+        except json.JSONDecodeError:
+            return None
+        return value if isinstance(value, dict) or not dict_only else None
+
+
+def is_question(value) -> bool:
+    """Whether value has what a quiz question needs: question text, an options list and an answer."""
+    return isinstance(value, dict) and bool(value.get("question")) \
+        and isinstance(value.get("options"), list) and bool(value.get("answer"))
+
+
+def usable_quiz(quiz_data) -> bool:
+    """Whether quiz_data holds a non-empty "quiz" list made only of questions."""
+    if not isinstance(quiz_data, dict) or not isinstance(quiz_data.get("quiz"), list) or not quiz_data["quiz"]:
+        return False
+    return all(is_question(q) for q in quiz_data["quiz"])
+
+
+def parse_whole(text: str):
+    """
+    Parse complete model output as one JSON object, allowing markdown fences
+    and text around it. Returns the dict, or None if it doesn't parse.
+    """
+    content = text.strip()
+    if content.startswith("```"):
+        content = FENCE_START_RE.sub("", content)
+        content = FENCE_END_RE.sub("", content)
+    try:
+        value = json.loads(content)
+    except json.JSONDecodeError:
+        # Outermost braces, in case the model wrapped the JSON in prose
+        start_idx = content.find('{')
+        end_idx = content.rfind('}')
+        if start_idx == -1 or end_idx <= start_idx:
+            return None
+        try:
+            value = json.loads(content[start_idx:end_idx + 1])
+        except json.JSONDecodeError:
+            return None
+    return value if isinstance(value, dict) else None
+
+
+def parse_quiz_output(text: str, chunk_size: int = 4096):
+    """
+    Parse a complete (non-streamed) model response the tolerant way, feeding
+    it through QuizStreamParser in chunks. Returns (quiz_data, partial).
+    """
+    parser = QuizStreamParser()
+    for start in range(0, len(text), chunk_size):
+        parser.feed(text[start:start + chunk_size])
+    return parser.finish()
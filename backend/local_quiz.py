@@ -0,0 +1,151 @@
+import os
+import re
+import random
+
+# Reported as the "model" of quizzes built here
+MODEL_NAME = "local"
+QUESTION_COUNT = int(os.getenv("LOCAL_QUIZ_QUESTIONS", "5"))
+MIN_SENTENCE_CHARS = 40
+MAX_SENTENCE_CHARS = 300
+BLANK = "_____"
+
+SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+(?=[A-Z\"'(])")
+CITATION_RE = re.compile(r"\[\d+\]")
+YEAR_RE = re.compile(r"\b(1[0-9]\d\d|20\d\d)\b")
+
+# key_entities kind -> noun used in the question. entities.py calls any
+# two capitalized words a person ("Maida Vale"), so only organizations,
+# recognised by their last word, are named for what they are
+ENTITY_KINDS = (("people", "name"), ("organizations", "organization"), ("locations", "name"))
+# A capitalized pair starting with one of these is a sentence opening
+# ("At Bletchley", "When Turing"), not a name
+LEADING_WORDS = frozenset([
+    "A", "About", "After", "Although", "An", "As", "At", "Because", "Before", "By", "During",
+    "Following", "For", "From", "He", "Her", "His", "If", "In", "It", "On", "She", "Since",
+    "The", "Their", "They", "This", "Through", "To", "Under", "Until", "When", "While", "With",
+])
+
+
+def article_sentences(full_text: str) -> list:
+    """(section heading or None, sentence) for every usable sentence, in article order."""
+    result = []
+    heading = None
+    for line in full_text.split("\n"):
+        if line.startswith("## "):
+            heading = line[3:].strip()
+            continue
+        line = CITATION_RE.sub("", line).strip()
+        for sentence in SENTENCE_SPLIT_RE.split(line):
+            sentence = sentence.strip()
+            if MIN_SENTENCE_CHARS <= len(sentence) <= MAX_SENTENCE_CHARS:
+                result.append((heading, sentence))
+    return result
+
+
+def entity_names(entities, kind) -> list:
+    """key_entities[kind] without pairs that are not names: sentence openings and pairs spanning a comma."""
+    return [name for name in entities.get(kind) or []
+            if "," not in name and name.split(" ", 1)[0] not in LEADING_WORDS]
+
+
+def _entity_question(sentence, entities, kind, noun, title):
+    for name in entity_names(entities, kind):
+        if name in sentence and name.lower() != title.lower():
+            same_kind = [e for e in entity_names(entities, kind) if e != name and e not in sentence]
+            other_kinds = [e for k, _ in ENTITY_KINDS if k != kind for e in entity_names(entities, k)
+                           if e != name and e not in sentence]
+            return {
+                "answer": name,
+                "blanked": sentence.replace(name, BLANK, 1),
+                "noun": noun,
+                "distractors": same_kind + other_kinds,
+            }
+    return None
+
+
+def _year_question(sentence, years):
+    match = YEAR_RE.search(sentence)
+    if not match:
+        return None
+    year = int(match.group(1))
+    # Other years from the article first, then nearby ones
+    nearby = [year + d for d in (-10, 5, -3, 12, 2, -7)]
+    distractors = [str(y) for y in sorted(years, key=lambda y: abs(y - year)) if y != year]
+    distractors += [str(y) for y in nearby if str(y) not in distractors]
+    return {
+        "answer": match.group(1),
+        "blanked": sentence[:match.start()] + BLANK + sentence[match.end():],
+        "noun": "year",
+        "distractors": distractors[:3],
+    }
+
+
+def generate_local_quiz(scraped_data: dict, count: int = None, seed=None) -> dict:
+    """
+    Build a multiple-choice quiz from the article without any model: each
+    question blanks out an entity from key_entities (or a year) in one of
+    the article's sentences, with other entities of the same kind (or
+    other years) as the wrong options.
+
+    Returns {"quiz", "related_topics"} in the LLM output schema. The same
+    article and seed always give the same quiz; the seed defaults to the
+    title. Questions are spread over the article's sections.
+    """
+    count = QUESTION_COUNT if count is None else count
+    title = scraped_data.get("title") or ""
+    entities = scraped_data.get("key_entities") or {}
+    rng = random.Random(title if seed is None else seed)
+
+    sentences = article_sentences(scraped_data.get("full_text") or "")
+    years = {int(y) for _, sentence in sentences for y in YEAR_RE.findall(sentence)}
+
+    candidates = []  # (section, position, sentence, question parts)
+    used_answers = set()
+    for position, (section, sentence) in enumerate(sentences):
+        parts = None
+        for kind, noun in ENTITY_KINDS:
+            parts = _entity_question(sentence, entities, kind, noun, title)
+            if parts and parts["answer"] not in used_answers:
+                break
+            parts = None
+        if parts is None:
+            parts = _year_question(sentence, years)
+        if parts is None or parts["answer"] in used_answers:
+            continue
+        distractors = list(dict.fromkeys(d for d in parts["distractors"] if d != parts["answer"]))
+        if len(distractors) < 3:
+            continue
+        parts["distractors"] = distractors
+        used_answers.add(parts["answer"])
+        candidates.append((section, position, sentence, parts))
+
+    # Round-robin over sections so the quiz covers the whole article
+    by_section = {}
+    for candidate in candidates:
+        by_section.setdefault(candidate[0], []).append(candidate)
+    picked = []
+    while len(picked) < count and any(by_section.values()):
+        for section in list(by_section):
+            if by_section[section] and len(picked) < count:
+                picked.append(by_section[section].pop(0))
+    picked.sort(key=lambda candidate: candidate[1])
+
+    quiz = []
+    for section, position, sentence, parts in picked:
+        options = [parts["answer"]] + rng.sample(parts["distractors"][:6], 3)
+        rng.shuffle(options)
+        third = position * 3 // max(1, len(sentences))
+        difficulty = ("easy", "medium", "hard")[min(2, third + (parts["noun"] == "year"))]
+        where = f"The \"{section}\" section" if section else "The article"
+        quiz.append({
+            "question": f"Which {parts['noun']} completes this statement from the article? \"{parts['blanked']}\"",
+            "options": options,
+            "answer": parts["answer"],
+            "difficulty": difficulty,
+            "explanation": f"{where} says: \"{sentence}\"",
+        })
+
+    asked = {parts["answer"] for _, _, _, parts in picked}
+    related = [name for kind, _ in ENTITY_KINDS[::-1] for name in entity_names(entities, kind)
+               if name.lower() != title.lower() and name not in asked]
+    return {"quiz": quiz, "related_topics": related[:3]}
@@ -1,9 +1,13 @@
 import os
+import time
 import logging
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Response, Header
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
+import json
 from typing import List, Optional, Dict, Any
 
 # Import local modules
@@ -19,20 +23,14 @@ if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
 try:
-    from backend import models, schemas, scraper, llm, database
+    from backend import models, schemas, scraper, llm, database, http_client, async_scraper, llm_cache, jobs, scrape_cache, singleflight, quiz_history, quiz_pipeline
 except ImportError:
     # Fallback if running directly from backend dir
-    import models, schemas, scraper, llm, database
+    import models, schemas, scraper, llm, database, http_client, async_scraper, llm_cache, jobs, scrape_cache, singleflight, quiz_history, quiz_pipeline
 
 # Create tables if they don't exist (for serverless environments like Vercel)
 # Moved to startup event to ensure models are loaded first
 
-# Import create_tables function
-try:
-    from create_tables import create_tables
-except ImportError:
-    from backend.create_tables import create_tables
-
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -54,11 +52,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 # Database dependency
 def get_db():
-    # Ensure tables exist (lazy check for serverless SQLite)
+    # Ensure tables exist: a flag check once the schema has been verified,
+    # create_all again only if an ephemeral SQLite file lost its tables
     database.init_db()
     
     if database.SessionLocal:
@@ -74,9 +74,23 @@ def get_db():
 # Create tables on startup (essential for Vercel/SQLite)
 @app.on_event("startup")
 async def startup_event():
-    # Ensure tables exist
-    create_tables()
-    logger.info("Database tables created (if not existed).")
+    # Ensure tables exist; get_db() only checks the readiness flag after this
+    start = time.perf_counter()
+    database.init_db()
+    logger.info(f"Database schema ready={database.schema_ready()} after {(time.perf_counter() - start) * 1000:.1f} ms")
+    # Open the shared keep-alive HTTP pool used for Wikipedia and LLM calls
+    http_client.get_session()
+    # Background workers for POST /api/jobs; picks up jobs left over from
+    # the previous run
+    jobs.start_workers()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    jobs.stop_workers()
+    http_client.close_session()
+    if http_client.HTTPX_AVAILABLE:
+        await http_client.close_async_client()
+    logger.info("Shared HTTP session closed.")
 
 @app.get("/")
 def read_root():
@@ -108,55 +122,70 @@ def debug_info():
         "tables": tables,
         "vercel_env": os.environ.get("VERCEL", "Not set"),
         "tmp_files": os.listdir("/tmp") if os.path.exists("/tmp") else "No /tmp",
-        "cwd": os.getcwd()
+        "cwd": os.getcwd(),
+        "llm_cache": llm_cache.stats(),
+        "llm_backends": llm.llm_router.get_router().snapshot(llm.configured_backends()),
+        "quiz_requests_in_flight": len(quiz_requests.in_flight()),
+        "schema_ready": database.schema_ready()
     }
 
-@app.post("/api/quiz", response_model=schemas.QuizResponse)
-def generate_quiz(request: schemas.QuizRequest, db: Session = Depends(get_db)):
-    # Ensure tables exist
-    # Ensure tables exist - REMOVED redundant check
+@app.get("/api/metrics")
+def metrics_summary():
+    """LLM call and quiz generation metrics: counters, histograms and the latest calls."""
+    return llm.metrics.summary()
+
+@app.get("/api/llm/status")
+def llm_status():
+    """Circuit breaker state and router stats per LLM backend."""
+    return llm.backend_status()
 
+def save_quiz_in_new_session(url: str, quiz_data: dict):
+    """quiz_pipeline.save_quiz() for work that outlives the request: opens and closes its own session."""
+    db_session = get_db()
+    db = next(db_session)
+    try:
+        return quiz_pipeline.save_quiz(db, url, quiz_data) if db else None
+    finally:
+        db_session.close()
+
+def generate_in_new_session(url: str, scraped_data: dict, fresh: bool) -> dict:
+    """quiz_pipeline.generate_and_save() with a session of its own."""
+    db_session = get_db()
+    db = next(db_session)
+    try:
+        return quiz_pipeline.generate_and_save(db, url, scraped_data, fresh)
+    finally:
+        db_session.close()
+
+# Concurrent POST /api/quiz requests for the same article share one
+# scrape/generate/save run and all get its result (and quiz row)
+quiz_requests = singleflight.AsyncGroup()
+
+async def run_quiz_pipeline(url: str, fresh: bool) -> dict:
+    # 1. Scrape Wikipedia
+    logger.info("Scraping Wikipedia...")
+    scraped_data = await async_scraper.scrape_wikipedia_async(url)
+    logger.info(f"Scraping successful. Title: {scraped_data.get('title')}")
+
+    # 2. Generate the quiz and save it (if a database is available). The
+    # run is shared by every caller and can outlive the one that started
+    # it, so it opens its own session rather than borrowing that caller's
+    # request-scoped one
+    logger.info("Generating quiz with LLM...")
+    return await run_in_threadpool(generate_in_new_session, url, scraped_data, fresh)
 
+@app.post("/api/quiz", response_model=schemas.QuizResponse)
+async def generate_quiz(request: schemas.QuizRequest):
+    # Async so that scraping and the LLM round-trip don't pin a threadpool
+    # worker; the blocking LLM and DB calls are handed to the threadpool.
     logger.info(f"Received quiz request for URL: {request.url}")
 
     try:
-        # 1. Scrape Wikipedia
-        logger.info("Scraping Wikipedia...")
-        scraped_data = scraper.scrape_wikipedia(request.url)
-        logger.info(f"Scraping successful. Title: {scraped_data.get('title')}")
-        
-        # 2. Generate Quiz using LLM
-        logger.info("Generating quiz with LLM...")
-        quiz_data = llm.generate_quiz_data(scraped_data)
-        logger.info("Quiz generation successful")
-        
-        # 3. Save to database (if available)
-        db_quiz = None
-        if db:
-            try:
-                db_quiz = models.Quiz(
-                    url=request.url,
-                    title=quiz_data.get("title"),
-                    summary=quiz_data.get("summary"),
-                    data=quiz_data
-                )
-                db.add(db_quiz)
-                db.commit()
-                db.refresh(db_quiz)
-                logger.info(f"Saved quiz to database with ID: {db_quiz.id}")
-            except Exception as e:
-                logger.error(f"Failed to save to database: {e}")
-                # Continue even if DB save fails - do not raise HTTPException
-                db_quiz = None
-        
-        return {
-            "id": db_quiz.id if db_quiz else None,
-            "url": request.url,
-            "title": quiz_data.get("title"),
-            "summary": quiz_data.get("summary"),
-            "data": quiz_data,
-            "created_at": db_quiz.created_at if db_quiz else None
-        }
+        key = (scrape_cache.normalize_url(request.url), request.fresh)
+        response, shared = await quiz_requests.do(key, run_quiz_pipeline, request.url, request.fresh)
+        if shared:
+            logger.info(f"Joined in-flight quiz generation for {key[0]}")
+        return response
 
     except ValueError as ve:
         logger.error(f"ValueError: {ve}")
@@ -165,36 +194,195 @@ def generate_quiz(request: schemas.QuizRequest, db: Session = Depends(get_db)):
         logger.error(f"Unexpected error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/quizzes", response_model=List[schemas.QuizResponse])
-def get_recent_quizzes(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
-    # Ensure tables exist
-    # Ensure tables exist - REMOVED redundant check
+@app.post("/api/jobs", status_code=202)
+def create_job(request: schemas.QuizRequest, db: Session = Depends(get_db)):
+    """
+    Queue a quiz generation and return at once. Poll GET /api/jobs/{id}
+    until status is "done" (result holds the POST /api/quiz body) or
+    "failed" (error says why).
+    """
+    if not db:
+        raise HTTPException(status_code=503, detail="Database not available")
+    try:
+        job = jobs.enqueue(db, request.url, request.fresh)
+    except ValueError as ve:
+        raise HTTPException(status_code=503, detail=str(ve))
+    return jobs.job_to_dict(job)
+
+@app.get("/api/jobs/{job_id}")
+def get_job(job_id: str, db: Session = Depends(get_db)):
+    job = jobs.get_job(db, job_id) if db else None
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return jobs.job_to_dict(job)
+
+@app.post("/api/quiz/draft")
+async def generate_quiz_draft(request: schemas.QuizRequest):
+    """
+    A quiz built locally from the article (local_quiz.py): no LLM call and
+    nothing saved, so it can be shown at once while POST /api/quiz runs.
+    """
+    logger.info(f"Received draft quiz request for URL: {request.url}")
+    try:
+        scraped_data = await async_scraper.scrape_wikipedia_async(request.url)
+    except ValueError as ve:
+        logger.error(f"ValueError: {ve}")
+        raise HTTPException(status_code=400, detail=str(ve))
 
-    logger.info(f"get_recent_quizzes called with skip={skip}, limit={limit}")
+    quiz_data = llm.generate_local_quiz_data(scraped_data)
+    return {
+        "url": request.url,
+        "title": quiz_data.get("title"),
+        "summary": quiz_data.get("summary"),
+        "data": quiz_data,
+    }
+
+# Most URLs accepted by one POST /api/quiz/batch
+MAX_BATCH_URLS = int(os.getenv("QUIZ_BATCH_MAX_URLS", "20"))
+
+@app.post("/api/quiz/batch")
+async def generate_quiz_batch(request: schemas.BatchQuizRequest, db: Session = Depends(get_db)):
+    """
+    Generate and save quizzes for several articles, packing them into as
+    few LLM requests as possible. Returns one entry per URL, in order: the
+    same fields as POST /api/quiz, or {"url", "error"} for an article that
+    couldn't be scraped or generated.
+    """
+    urls = list(dict.fromkeys(u.strip() for u in request.urls if u and u.strip()))
+    if not urls:
+        raise HTTPException(status_code=400, detail="At least one URL is required")
+    if len(urls) > MAX_BATCH_URLS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_URLS} URLs per batch")
+    logger.info(f"Received batch quiz request for {len(urls)} URLs")
+
+    scraped = {r["url"]: r for r in await run_in_threadpool(lambda: list(scraper.scrape_many(urls)))}
+    ready = [url for url in urls if scraped[url]["data"]]
+    try:
+        quiz_results = await run_in_threadpool(
+            llm.generate_quiz_batch, [scraped[url]["data"] for url in ready], not request.fresh
+        ) if ready else []
+    except ValueError as ve:
+        logger.error(f"ValueError: {ve}")
+        raise HTTPException(status_code=400, detail=str(ve))
+    generated = dict(zip(ready, quiz_results))
+
+    entries = []
+    for url in urls:
+        quiz_data = generated.get(url)
+        if quiz_data is None or "error" in quiz_data:
+            error = quiz_data["error"] if quiz_data else scraped[url]["error"]
+            entries.append({"url": url, "error": error})
+            continue
+        db_quiz = await run_in_threadpool(quiz_pipeline.save_quiz, db, url, quiz_data) if db else None
+        entries.append(quiz_pipeline.quiz_response(url, quiz_data, db_quiz))
+    return entries
+
+@app.post("/api/quiz/stream")
+async def generate_quiz_stream(request: schemas.QuizRequest):
+    """
+    Same as POST /api/quiz, but the response is NDJSON, one event per line:
+      {"type": "article", "title", "summary", "sections", "key_entities"}
+      {"type": "draft", "data": {...}}                       (only with "draft": true; local quiz, see /api/quiz/draft)
+      {"type": "question", "index": 0, "question": {...}}   (one per question, as generated)
+      {"type": "done", "id", "url", "title", "summary", "data", "created_at"}
+      {"type": "error", "detail": "..."}                    (instead of "done")
+    Scraping errors are still returned as a plain 400 before streaming starts.
+    """
+    logger.info(f"Received streaming quiz request for URL: {request.url}")
+    try:
+        scraped_data = await async_scraper.scrape_wikipedia_async(request.url)
+    except ValueError as ve:
+        logger.error(f"ValueError: {ve}")
+        raise HTTPException(status_code=400, detail=str(ve))
+
+    def events():
+        # Runs in the threadpool (StreamingResponse iterates sync generators there)
+        yield json.dumps({
+            "type": "article",
+            "title": scraped_data.get("title"),
+            "summary": scraped_data.get("summary"),
+            "sections": scraped_data.get("sections"),
+            "key_entities": scraped_data.get("key_entities"),
+        }) + "\n"
+        if request.draft:
+            yield json.dumps({"type": "draft", "data": llm.generate_local_quiz_data(scraped_data)}) + "\n"
+        try:
+            index = 0
+            for kind, payload in llm.stream_quiz_data(scraped_data, not request.fresh):
+                if kind == "question":
+                    yield json.dumps({"type": "question", "index": index, "question": payload}) + "\n"
+                    index += 1
+                    continue
+
+                # The stream outlives the request's dependencies, so the
+                # session is opened here rather than injected
+                db_quiz = save_quiz_in_new_session(request.url, payload)
+                yield json.dumps({"type": "done", **quiz_pipeline.quiz_response(request.url, payload, db_quiz)}) + "\n"
+        except Exception as e:
+            logger.error(f"Streaming quiz generation failed: {e}")
+            yield json.dumps({"type": "error", "detail": str(e)}) + "\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="application/x-ndjson",
+        # Ask proxies (nginx and friends) not to buffer the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/api/autocomplete")
+def autocomplete(q: str, limit: int = 10):
+    # Answered from the in-process topic index where possible, so typing
+    # ahead costs at most one opensearch call per new prefix
+    if not q.strip():
+        return []
+    limit = max(1, min(limit, 20))
+    return scraper.autocomplete_topics(q, limit)
+
+@app.get("/api/quizzes")
+def get_recent_quizzes(response: Response, skip: int = 0, limit: int = 10, cursor: Optional[str] = None,
+                       view: str = "full", db: Session = Depends(get_db)):
+    """
+    Quiz history, newest first. view=list returns only id, url, title,
+    summary, created_at and score (see schemas.QuizListItem); fetch
+    /api/quiz/{id} for the questions. When there are more quizzes, the
+    X-Next-Cursor header holds the cursor for the next page.
+    """
+    logger.info(f"get_recent_quizzes called with cursor={cursor}, skip={skip}, limit={limit}, view={view}")
     if not db:
         logger.info("No database connection")
         return []
     try:
-        quizzes = db.query(models.Quiz).order_by(models.Quiz.created_at.desc()).offset(skip).limit(limit).all()
-        logger.info(f"Found {len(quizzes)} quizzes")
-        return quizzes
+        items, next_cursor = quiz_history.list_quizzes(db, limit, cursor, view, skip)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
     except Exception as e:
         logger.error(f"Error querying quizzes: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    logger.info(f"Found {len(items)} quizzes")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
 
 @app.get("/api/quiz/{quiz_id}", response_model=schemas.QuizResponse)
-def get_quiz(quiz_id: int, db: Session = Depends(get_db)):
-    # Ensure tables exist
-    # Ensure tables exist - REMOVED redundant check
-
-
+def get_quiz(quiz_id: int, response: Response, if_none_match: Optional[str] = Header(None),
+             db: Session = Depends(get_db)):
     if not db:
         raise HTTPException(status_code=503, detail="Database not available")
 
+    # Revalidation only needs the row's version and token, not the quiz data
+    row = db.query(models.Quiz.version, models.Quiz.etag_token).filter(models.Quiz.id == quiz_id).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    etag = quiz_history.quiz_etag(quiz_id, row.version, row.etag_token)
+    if quiz_history.etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": quiz_history.QUIZ_CACHE_CONTROL})
+
     quiz = db.query(models.Quiz).filter(models.Quiz.id == quiz_id).first()
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
-    return quiz
+    response.headers["ETag"] = quiz_history.quiz_etag(quiz.id, quiz.version, quiz.etag_token)
+    response.headers["Cache-Control"] = quiz_history.QUIZ_CACHE_CONTROL
+    return quiz_history.quiz_to_dict(quiz)
 
 @app.delete("/api/quiz/{quiz_id}")
 def delete_quiz(quiz_id: int, db: Session = Depends(get_db)):
@@ -229,15 +417,22 @@ def save_quiz_results(quiz_id: int, request: Dict[str, Any], db: Session = Depen
 
     # Update quiz data with user answers
     user_answers = request.get("user_answers", {})
-    if quiz.data:
-        quiz.data["user_answers"] = user_answers
+    quiz_data = json.loads(quiz.data) if isinstance(quiz.data, str) else quiz.data
+    if quiz_data:
+        quiz_data["user_answers"] = user_answers
     else:
-        quiz.data = {"user_answers": user_answers}
+        quiz_data = {"user_answers": user_answers}
+
+    quiz.data = json.dumps(quiz_data)
+    quiz.user_answers = json.dumps(user_answers)
+    quiz.score = quiz_history.score_answers(quiz_data, user_answers)
+    # Changes the quiz's ETag, so cached copies are refetched
+    quiz.version = (quiz.version or 1) + 1
 
     db.commit()
     db.refresh(quiz)
     logger.info(f"Saved results for quiz ID: {quiz_id}")
-    return {"message": "Results saved successfully", "quiz": quiz}
+    return {"message": "Results saved successfully", "quiz": quiz_history.quiz_to_dict(quiz)}
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,168 @@
+import os
+import re
+import datetime
+from urllib.parse import urlsplit, unquote
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+try:
+    from . import http_client
+except ImportError:
+    import http_client
+
+# Override to point at a different wiki or at fake_mediawiki_server.py
+MEDIAWIKI_API_URL = os.getenv("MEDIAWIKI_API_URL")
+
+# Wikimedia asks API clients to identify themselves
+API_HEADERS = {
+    "User-Agent": "AIWikiQuizGenerator/1.0 (https://github.com/moresandip/AI-Wiki-Quiz-Generators)"
+}
+
+# Same shape as the HTML scraper: intro + first MAX_CONTENT_SECTIONS top-level sections
+MAX_CONTENT_SECTIONS = int(os.getenv("MAX_CONTENT_SECTIONS", "3"))
+
+HEADING_RE = re.compile(r"^(={2,6})\s*(.+?)\s*\1\s*$")
+
+
+def log_to_file(message):
+    try:
+        with open("debug_log.txt", "a", encoding="utf-8") as f:
+            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            f.write(f"[{timestamp}] [MEDIAWIKI] {message}\n")
+    except Exception:
+        pass
+
+
+def api_url_for(url: str) -> str:
+    """api.php endpoint of the wiki that hosts url."""
+    if MEDIAWIKI_API_URL:
+        return MEDIAWIKI_API_URL
+    parts = urlsplit(url)
+    host = parts.netloc.lower().replace(".m.wikipedia.org", ".wikipedia.org")
+    return f"https://{host}/w/api.php"
+
+
+def title_from_url(url: str) -> str:
+    """Article title from a /wiki/<Title> URL."""
+    path = urlsplit(url).path
+    if "/wiki/" not in path:
+        raise ValueError(f"Not a Wikipedia article URL: {url}")
+    title = unquote(path.split("/wiki/", 1)[1]).replace("_", " ").strip()
+    if not title:
+        raise ValueError(f"Not a Wikipedia article URL: {url}")
+    return title
+
+
+def fetch_extracts(titles, api_url: str) -> dict:
+    """
+    Fetch full plain-text extracts for titles. Returns {requested title: page}
+    where page is the API page object (title, extract, ...) or None if the
+    page does not exist. TextExtracts returns only one full extract per
+    request, so titles are fetched one per request, in parallel.
+    """
+    titles = list(dict.fromkeys(titles))
+    if len(titles) == 1:
+        return {titles[0]: _query_extract(titles[0], api_url)}
+    with ThreadPoolExecutor(max_workers=min(8, len(titles))) as executor:
+        return dict(zip(titles, executor.map(lambda title: _query_extract(title, api_url), titles)))
+
+
+def _query_extract(title: str, api_url: str):
+    params = {
+        "action": "query",
+        "prop": "extracts",
+        "explaintext": 1,
+        "exsectionformat": "wiki",
+        "redirects": 1,
+        "titles": title,
+        "format": "json",
+        "formatversion": 2,
+    }
+
+    try:
+        response = http_client.get_session().get(
+            api_url, params=params, headers=API_HEADERS, timeout=http_client.default_timeout()
+        )
+        response.raise_for_status()
+        data = response.json()
+    except requests.exceptions.RequestException as e:
+        raise ValueError(f"MediaWiki API request failed for {title}: {str(e)}")
+    except ValueError:
+        raise ValueError(f"MediaWiki API returned invalid JSON for {title}")
+
+    if "error" in data:
+        raise ValueError(f"MediaWiki API error: {data['error'].get('info', data['error'])}")
+
+    query = data.get("query", {})
+    # Follow the requested title through normalization and redirects
+    renames = {}
+    for item in query.get("normalized", []) + query.get("redirects", []):
+        renames[item["from"]] = item["to"]
+    resolved = title
+    while resolved in renames and renames[resolved] != resolved:
+        resolved = renames[resolved]
+
+    page = {page["title"]: page for page in query.get("pages", [])}.get(resolved)
+    return None if page is None or page.get("missing") or page.get("invalid") else page
+
+
+def fields_from_extract(title: str, extract: str, max_sections: int = MAX_CONTENT_SECTIONS) -> dict:
+    """
+    Build title/summary/sections/full_text from a plain-text extract with
+    "== Heading ==" section markers (exsectionformat=wiki). full_text has the
+    same layout as the HTML scraper: intro paragraphs, then "## Section" blocks.
+    """
+    intro = []
+    body = ""
+    sections = []
+    h2_count = 0
+
+    for raw_line in extract.splitlines():
+        line = raw_line.strip()
+        if not line:
+            continue
+        heading = HEADING_RE.match(line)
+        if heading:
+            level = len(heading.group(1))
+            name = heading.group(2)
+            sections.append(name)
+            if level == 2:
+                h2_count += 1
+                if h2_count <= max_sections:
+                    body += f"\n## {name}\n"
+            elif h2_count and h2_count <= max_sections:
+                body += name + "\n"
+            continue
+        if h2_count == 0:
+            intro.append(line)
+        elif h2_count <= max_sections:
+            body += line + "\n"
+
+    content_text = "".join(p + "\n\n" for p in intro) + body
+    return {
+        "title": title,
+        "summary": intro[0] if intro else "",
+        "sections": sections,
+        "full_text": content_text
+    }
+
+
+def fetch_article_fields(urls) -> dict:
+    """
+    Fetch article fields for several article URLs through the API.
+    Returns {url: fields dict, or None if the page does not exist}.
+    """
+    by_api = {}
+    for url in urls:
+        by_api.setdefault(api_url_for(url), []).append(url)
+
+    results = {}
+    for api_url, api_urls in by_api.items():
+        titles = {url: title_from_url(url) for url in api_urls}
+        log_to_file(f"Fetching {len(titles)} extract(s) from {api_url}")
+        pages = fetch_extracts(titles.values(), api_url)
+        for url, title in titles.items():
+            page = pages.get(title)
+            results[url] = fields_from_extract(page["title"], page.get("extract") or "") if page else None
+    return results
@@ -0,0 +1,196 @@
+import os
+import time
+import bisect
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+
+# Upper bounds of the histogram buckets, per kind of value
+SECONDS_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120)
+TOKEN_BUCKETS = (50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+COUNT_BUCKETS = (0, 1, 2, 3, 4, 5, 6, 8, 10, 15, 20)
+# Metric name suffix -> buckets; anything else uses SECONDS_BUCKETS
+BUCKETS_BY_SUFFIX = {"_seconds": SECONDS_BUCKETS, "_tokens": TOKEN_BUCKETS, "_chars": tuple(b * 4 for b in TOKEN_BUCKETS)}
+# Per-call records kept for /api/metrics
+RECENT_CALLS = int(os.getenv("METRICS_RECENT_CALLS", "50"))
+
+
+class Histogram:
+    """Bucketed distribution with count, sum, min and max; quantiles are estimated from the buckets."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # the last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q: float):
+        """Linear interpolation inside the bucket holding the q-th value."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.buckets[i - 1] if i > 0 else min(self.min, self.buckets[0])
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                lower, upper = max(lower, self.min), min(upper, self.max)
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.max
+
+    def summary(self) -> dict:
+        cumulative, buckets = 0, {}
+        for bound, bucket_count in zip(list(self.buckets) + ["+Inf"], self.counts):
+            cumulative += bucket_count
+            buckets[str(bound)] = cumulative
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 4),
+            "mean": round(self.sum / self.count, 4) if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "p50": _round(self.quantile(0.5)),
+            "p95": _round(self.quantile(0.95)),
+            "p99": _round(self.quantile(0.99)),
+            "buckets": buckets,
+        }
+
+
+def _round(value):
+    return round(value, 4) if value is not None else None
+
+
+def _label_key(labels: dict) -> str:
+    return ",".join(f"{k}={labels[k]}" for k in sorted(labels))
+
+
+class Registry:
+    """Counters and histograms by name and labels, plus the most recent LLM call records."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}  # name -> {label key -> value}
+        self._histograms = {}  # name -> {label key -> Histogram}
+        self._recent = deque(maxlen=RECENT_CALLS)
+        self._started = time.time()
+
+    def increment(self, name: str, amount: float = 1, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = Histogram(_buckets_for(name))
+            series[key].observe(value)
+
+    def record_call(self, record: dict) -> None:
+        with self._lock:
+            self._recent.append(record)
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                "uptime_seconds": round(time.time() - self._started, 1),
+                "counters": {name: dict(series) for name, series in self._counters.items()},
+                "histograms": {
+                    name: {key: histogram.summary() for key, histogram in series.items()}
+                    for name, series in self._histograms.items()
+                },
+                "recent_calls": list(self._recent),
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self._recent.clear()
+            self._started = time.time()
+
+
+def _buckets_for(name: str):
+    for suffix, buckets in BUCKETS_BY_SUFFIX.items():
+        if name.endswith(suffix):
+            return buckets
+    return COUNT_BUCKETS if name.endswith(("_count", "_attempts", "_questions")) else SECONDS_BUCKETS
+
+
+_registry = Registry()
+
+
+def get_registry() -> Registry:
+    return _registry
+
+
+def increment(name: str, amount: float = 1, **labels) -> None:
+    _registry.increment(name, amount, **labels)
+
+
+def observe(name: str, value: float, **labels) -> None:
+    _registry.observe(name, value, **labels)
+
+
+def summary() -> dict:
+    return _registry.summary()
+
+
+def reset() -> None:
+    _registry.reset()
+
+
+# Token usage reported by the provider for the call in progress. Provider
+# adapters call note_usage(); whoever timed the call reads it back.
+_usage = contextvars.ContextVar("llm_usage", default=None)
+
+
+@contextmanager
+def usage_scope():
+    usage = {}
+    token = _usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _usage.reset(token)
+
+
+def note_usage(prompt_tokens=None, response_tokens=None) -> None:
+    usage = _usage.get()
+    if usage is None:
+        return
+    if prompt_tokens is not None:
+        usage["prompt_tokens"] = prompt_tokens
+    if response_tokens is not None:
+        usage["response_tokens"] = response_tokens
+
+
+def collect_usage(pieces, usage: dict):
+    """
+    Iterate a streaming adapter with usage as its usage scope for every
+    step, so note_usage() reaches usage even when each step of the stream
+    runs in a different thread or context.
+    """
+    pieces = iter(pieces)
+    while True:
+        token = _usage.set(usage)
+        try:
+            piece = next(pieces)
+        except StopIteration:
+            return
+        finally:
+            _usage.reset(token)
+        yield piece
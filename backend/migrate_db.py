@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 """
-Database migration script to add missing columns to the quizzes table.
-This script handles adding the user_answers column that was missing from the database schema.
+Database migration script to add missing columns and indexes to existing tables
+(user_answers, score, the created_at/id history index, ...), then fill in the
+score of quizzes whose results were saved before the score column existed.
 """
 
 import os
@@ -13,78 +14,44 @@ backend_dir = Path(__file__).parent
 sys.path.insert(0, str(backend_dir))
 
 try:
-    from backend.database import SQL_AVAILABLE, engine, SessionLocal
+    from backend import database
     from backend.models import Quiz
+    from backend.quiz_history import score_answers
 except ImportError:
-    try:
-        from database import SQL_AVAILABLE, engine, SessionLocal
-        from models import Quiz
-    except ImportError:
-        # Fallback
-        from .database import SQL_AVAILABLE, engine, SessionLocal
-        from .models import Quiz
+    import database
+    from models import Quiz
+    from quiz_history import score_answers
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def backfill_scores(session) -> int:
+    """Set score on quizzes that have saved answers but no score yet."""
+    quizzes = session.query(Quiz).filter(Quiz.user_answers.isnot(None), Quiz.score.is_(None)).all()
+    for quiz in quizzes:
+        quiz.score = score_answers(quiz.data, quiz.user_answers)
+    session.commit()
+    return len(quizzes)
+
 def migrate_database():
-    """Add missing columns to the quizzes table"""
-    if not SQL_AVAILABLE:
+    """Add missing columns and indexes, then backfill scores"""
+    if not database.SQL_AVAILABLE or not database.engine:
         logger.info("SQL not available, skipping migration")
         return
 
     try:
-        # Check if user_answers column exists
-        from sqlalchemy import inspect
-        inspector = inspect(engine)
-
-        # Get existing columns
-        existing_columns = [col['name'] for col in inspector.get_columns('quizzes')]
-
-        if 'user_answers' not in existing_columns:
-            logger.info("Adding user_answers column to quizzes table...")
-
-            # For SQLite, we need to recreate the table
-            if "sqlite" in str(engine.url):
-                # SQLite doesn't support ALTER TABLE ADD COLUMN with constraints easily
-                # We'll use a different approach - recreate the table
-                logger.info("SQLite detected, recreating table with new schema...")
-
-                # Create a backup table
-                with engine.connect() as conn:
-                    conn.execute("CREATE TABLE quizzes_backup AS SELECT * FROM quizzes")
-                    conn.execute("DROP TABLE quizzes")
-                    conn.commit()
-
-                # Recreate the table with the new schema
-                Quiz.__table__.create(engine)
-
-                # Restore data
-                conn.execute("""
-                    INSERT INTO quizzes (id, url, title, summary, data, created_at)
-                    SELECT id, url, title, summary, data, created_at FROM quizzes_backup
-                """)
-                conn.execute("DROP TABLE quizzes_backup")
-                conn.commit()
-
-                logger.info("Migration completed successfully!")
-            else:
-                # For other databases, use ALTER TABLE
-                from sqlalchemy import text
-                with engine.connect() as conn:
-                    # Determine JSON column type
-                    if "postgresql" in str(engine.url):
-                        json_type = "JSONB"
-                    else:
-                        json_type = "TEXT"
-
-                    conn.execute(text(f"ALTER TABLE quizzes ADD COLUMN user_answers {json_type}"))
-                    conn.commit()
-                    logger.info("Added user_answers column successfully!")
-
+        added = database.upgrade_schema(database.engine)
+        if added:
+            logger.info(f"Added columns: {', '.join(added)}")
         else:
-            logger.info("user_answers column already exists, no migration needed")
+            logger.info("All columns already exist, no columns added")
+
+        session = database.SessionLocal()
+        try:
+            logger.info(f"Backfilled score for {backfill_scores(session)} quizzes")
+        finally:
+            session.close()
 
     except Exception as e:
         logger.error(f"Migration failed: {e}")
@@ -4,10 +4,11 @@ except ImportError:
     from database import Base, SQL_AVAILABLE, DATABASE_URL
 
 if SQL_AVAILABLE:
-    from sqlalchemy import Column, Integer, String, Text, DateTime
+    from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Float, Index
     from sqlalchemy.types import TypeDecorator
-    from sqlalchemy.sql import func
+    from sqlalchemy.sql import func, text
     import json
+    import uuid
 
     class JSONEncodedDict(TypeDecorator):
         """Represents an immutable structure as a json-encoded string."""
@@ -28,7 +29,11 @@ if SQL_AVAILABLE:
 
     class Quiz(Base):
         __tablename__ = "quizzes"
-        __table_args__ = {'extend_existing': True}
+        __table_args__ = (
+            # Keyset pagination of the history list (newest first)
+            Index("ix_quizzes_created_at_id", "created_at", "id"),
+            {'extend_existing': True},
+        )
 
         id = Column(Integer, primary_key=True, index=True)
         url = Column(String, unique=False, index=True, nullable=False)
@@ -37,8 +42,39 @@ if SQL_AVAILABLE:
         # Stores the full JSON response (quiz questions, related topics, entities, etc.)
         data = Column(Text, nullable=False)
         user_answers = Column(Text, nullable=True)  # Store user answers as JSON
+        # Correct answers in user_answers, set when results are saved, so
+        # the history list can show it without loading data
+        score = Column(Integer, nullable=True)
+        # Bumped whenever the quiz changes (save-results); the ETag of
+        # GET /api/quiz/{id} is derived from it
+        version = Column(Integer, nullable=False, default=1, server_default=text("1"))
         created_at = Column(DateTime(timezone=True), server_default=func.now())
+        # Random per row and part of the ETag too: SQLite hands a deleted
+        # newest row's id to the next quiz, so (id, version) can repeat
+        etag_token = Column(String(32), nullable=True, default=lambda: uuid.uuid4().hex)
+
+    class Job(Base):
+        """A queued quiz generation, run by the worker pool in jobs.py."""
+        __tablename__ = "jobs"
+        __table_args__ = {'extend_existing': True}
+
+        id = Column(String(32), primary_key=True)  # uuid4 hex
+        url = Column(String, nullable=False)
+        fresh = Column(Boolean, nullable=False, default=False)
+        status = Column(String(16), nullable=False, index=True)  # queued, running, done, failed
+        attempts = Column(Integer, nullable=False, default=0)
+        # Epoch seconds after which a running job counts as abandoned and is requeued
+        lease_expires_at = Column(Float, nullable=True)
+        error = Column(Text, nullable=True)
+        quiz_id = Column(Integer, nullable=True)
+        result = Column(JSONType, nullable=True)  # Same body POST /api/quiz returns
+        created_at = Column(DateTime(timezone=True), server_default=func.now())
+        started_at = Column(DateTime(timezone=True), nullable=True)
+        finished_at = Column(DateTime(timezone=True), nullable=True)
 else:
-    # Dummy class to prevent import errors if SQL is not available
+    # Dummy classes to prevent import errors if SQL is not available
     class Quiz:
         pass
+
+    class Job:
+        pass
@@ -0,0 +1,137 @@
+import os
+import json
+import base64
+import datetime
+
+from sqlalchemy import func, literal, or_, select
+
+try:
+    from . import models
+except ImportError:
+    import models
+
+# Largest page GET /api/quizzes returns
+MAX_PAGE_SIZE = 50
+# view=list returns only these, so the history screen never loads question data
+LIST_FIELDS = ("id", "url", "title", "summary", "created_at", "score")
+# Sent with GET /api/quiz/{id}. Caches may keep the response but must
+# revalidate it (If-None-Match, answered with 304) before each reuse, so a
+# save-results is visible at once.
+QUIZ_CACHE_CONTROL = os.getenv("QUIZ_CACHE_CONTROL", "public, max-age=0, must-revalidate")
+# Part of every ETag; bump it when quiz_to_dict's output changes shape so
+# cached copies from the old code are not revalidated
+REPRESENTATION_VERSION = 1
+
+
+def encode_cursor(created_at, quiz_id: int) -> str:
+    stamp = created_at.isoformat() if created_at else ""
+    return base64.urlsafe_b64encode(f"{stamp}|{quiz_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """Return (created_at, id) from a cursor made by encode_cursor(). Raises ValueError if malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        stamp, quiz_id = raw.rsplit("|", 1)
+        return (datetime.datetime.fromisoformat(stamp) if stamp else None), int(quiz_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def _loads(value):
+    return json.loads(value) if isinstance(value, str) and value else value
+
+
+def score_answers(quiz_data, user_answers) -> int:
+    """Number of questions whose saved answer (keyed by question index) is the right one."""
+    questions = (_loads(quiz_data) or {}).get("quiz") or []
+    user_answers = _loads(user_answers) or {}
+    return sum(
+        1 for index, question in enumerate(questions)
+        if user_answers.get(str(index), user_answers.get(index)) == question.get("answer")
+    )
+
+
+def quiz_etag(quiz_id: int, version, token=None) -> str:
+    """
+    Strong ETag of GET /api/quiz/{quiz_id} at the given row version. token
+    is the row's etag_token, so a quiz that reuses a deleted one's id never
+    matches what was cached for the old one.
+    """
+    return f'"quiz-{quiz_id}-{token or "0"}-v{version or 1}-r{REPRESENTATION_VERSION}"'
+
+
+def etag_matches(if_none_match, etag: str) -> bool:
+    """Whether an If-None-Match header value matches etag (weak comparison, as RFC 9110 specifies for it)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def quiz_to_dict(quiz) -> dict:
+    """Full quiz as the API returns it, with the stored JSON decoded."""
+    return {
+        "id": quiz.id,
+        "url": quiz.url,
+        "title": quiz.title,
+        "summary": quiz.summary,
+        "data": _loads(quiz.data),
+        "user_answers": _loads(quiz.user_answers),
+        "score": quiz.score,
+        "created_at": quiz.created_at.isoformat() if quiz.created_at else None,
+    }
+
+
+def list_quizzes(db, limit: int = 10, cursor: str = None, view: str = "full", skip: int = 0):
+    """
+    One page of quiz history, newest first. Returns (items, next_cursor);
+    next_cursor is None on the last page.
+
+    Pages after the first are found by seeking past the cursor's
+    (created_at, id) on ix_quizzes_created_at_id rather than by OFFSET, so
+    a deep page costs the same as the first. skip is the old offset
+    paging, still honoured when no cursor is given.
+    """
+    if view not in ("full", "list"):
+        raise ValueError("view must be 'full' or 'list'")
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    Quiz = models.Quiz
+
+    if view == "list":
+        query = db.query(*(getattr(Quiz, field) for field in LIST_FIELDS))
+    else:
+        query = db.query(Quiz)
+
+    if cursor:
+        created_at, quiz_id = decode_cursor(cursor)
+        # Compare against the anchor row's stored created_at where it still
+        # exists, so the comparison never depends on how a driver formats
+        # a bound datetime (SQLite keeps them as text)
+        stored = select(Quiz.created_at).where(Quiz.id == quiz_id).scalar_subquery()
+        anchor = func.coalesce(stored, literal(created_at, Quiz.created_at.type))
+        # (created_at, id) < (anchor, quiz_id), spelled so that the bound
+        # on created_at alone is a range seek on the index
+        query = query.filter(
+            Quiz.created_at <= anchor,
+            or_(Quiz.created_at < anchor, Quiz.id < quiz_id),
+        )
+
+    query = query.order_by(Quiz.created_at.desc(), Quiz.id.desc())
+    if skip and not cursor:
+        query = query.offset(skip)
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    if view == "list":
+        items = [dict(zip(LIST_FIELDS, row)) for row in rows]
+        for item in items:
+            item["created_at"] = item["created_at"].isoformat() if item["created_at"] else None
+    else:
+        items = [quiz_to_dict(quiz) for quiz in rows]
+    return items, next_cursor
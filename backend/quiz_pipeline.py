@@ -0,0 +1,66 @@
+import json
+import datetime
+
+try:
+    from . import models, scraper, llm
+except ImportError:
+    import models
+    import scraper
+    import llm
+
+
+def log_to_file(message):
+    try:
+        with open("debug_log.txt", "a", encoding="utf-8") as f:
+            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            f.write(f"[{timestamp}] [QUIZ] {message}\n")
+    except Exception:
+        pass
+
+
+def save_quiz(db, url: str, quiz_data: dict):
+    """Persist a generated quiz. Returns the row, or None if saving failed."""
+    try:
+        db_quiz = models.Quiz(
+            url=url,
+            title=quiz_data.get("title"),
+            summary=quiz_data.get("summary"),
+            data=json.dumps(quiz_data)
+        )
+        db.add(db_quiz)
+        db.commit()
+        db.refresh(db_quiz)
+        log_to_file(f"Saved quiz to database with ID: {db_quiz.id}")
+        return db_quiz
+    except Exception as e:
+        # The quiz is still returned to the caller, just without an id
+        db.rollback()
+        log_to_file(f"Failed to save to database: {e}")
+        return None
+
+
+def quiz_response(url: str, quiz_data: dict, db_quiz=None) -> dict:
+    """The body POST /api/quiz returns for a generated (and maybe saved) quiz."""
+    return {
+        "id": db_quiz.id if db_quiz else None,
+        "url": url,
+        "title": quiz_data.get("title"),
+        "summary": quiz_data.get("summary"),
+        "data": quiz_data,
+        "created_at": db_quiz.created_at.isoformat() if db_quiz and db_quiz.created_at else None,
+    }
+
+
+def generate_and_save(db, url: str, scraped_data: dict, fresh: bool = False) -> dict:
+    """Generate a quiz for a scraped article, save it if db is given, and return quiz_response()."""
+    quiz_data = llm.generate_quiz_data(scraped_data, use_cache=not fresh)
+    log_to_file(f"Quiz generated for {url}")
+    db_quiz = save_quiz(db, url, quiz_data) if db else None
+    return quiz_response(url, quiz_data, db_quiz)
+
+
+def run_quiz_pipeline(db, url: str, fresh: bool = False) -> dict:
+    """Scrape, generate and save: all of POST /api/quiz, blocking."""
+    scraped_data = scraper.scrape_wikipedia(url)
+    log_to_file(f"Scraping successful. Title: {scraped_data.get('title')}")
+    return generate_and_save(db, url, scraped_data, fresh)
@@ -4,6 +4,12 @@ from datetime import datetime
 
 class QuizRequest(BaseModel):
     url: str
+    fresh: bool = False  # Skip the LLM response cache and generate a new quiz
+    draft: bool = False  # /api/quiz/stream: send a local draft quiz before the LLM questions
+
+class BatchQuizRequest(BaseModel):
+    urls: List[str]
+    fresh: bool = False
 
 class SaveResultsRequest(BaseModel):
     user_answers: Dict[str, Any]
@@ -15,8 +21,18 @@ class QuizResponse(BaseModel):
     summary: Optional[str] = None
     data: Dict[str, Any]  # The structured quiz data
     user_answers: Optional[Dict[str, Any]] = None  # User answers as JSON
+    score: Optional[int] = None  # Correct answers, once results are saved
     created_at: datetime
 
     model_config = {
         "from_attributes": True
     }
+
+class QuizListItem(BaseModel):
+    """GET /api/quizzes?view=list: one history entry without the questions."""
+    id: int
+    url: str
+    title: Optional[str] = None
+    summary: Optional[str] = None
+    score: Optional[int] = None
+    created_at: Optional[datetime] = None
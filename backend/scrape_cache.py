@@ -0,0 +1,91 @@
+import os
+import time
+from urllib.parse import urlsplit, urlunsplit, unquote, quote, parse_qsl, urlencode
+
+try:
+    from .disk_cache import DiskCache, default_cache_dir
+except ImportError:
+    from disk_cache import DiskCache, default_cache_dir
+
+# Cache settings (override via environment)
+SCRAPE_CACHE_ENABLED = os.getenv("SCRAPE_CACHE_ENABLED", "1") != "0"
+SCRAPE_CACHE_DIR = os.getenv("SCRAPE_CACHE_DIR") or default_cache_dir("scrape")
+SCRAPE_CACHE_MAX_BYTES = int(os.getenv("SCRAPE_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+# Entries younger than this are served without contacting Wikipedia at all;
+# older entries are revalidated with a conditional GET.
+SCRAPE_CACHE_FRESH_SECONDS = int(os.getenv("SCRAPE_CACHE_FRESH_SECONDS", "600"))
+
+_cache = DiskCache(SCRAPE_CACHE_DIR, max_bytes=SCRAPE_CACHE_MAX_BYTES)
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize a Wikipedia article URL so that equivalent spellings share one
+    cache entry: lowercase host, desktop domain instead of mobile, no fragment,
+    underscores instead of spaces, consistent percent-encoding and sorted query.
+    """
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or "https").lower()
+    if scheme == "http":
+        scheme = "https"
+    host = parts.netloc.lower()
+    if ".m.wikipedia.org" in host:
+        host = host.replace(".m.wikipedia.org", ".wikipedia.org")
+
+    path = unquote(parts.path).replace(" ", "_")
+    if len(path) > 1:
+        path = path.rstrip("/")
+    path = quote(path, safe="/:_-.,()'!~*")
+
+    query = urlencode(sorted(parse_qsl(parts.query)))
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+def cache_key(url: str, variant: str = None) -> str:
+    """Cache key for url; variant separates results of different scrape modes."""
+    key = normalize_url(url)
+    return f"{key}|{variant}" if variant else key
+
+
+def get_entry(url: str, variant: str = None):
+    """
+    Return the cached entry for url as a dict with keys data, etag,
+    last_modified and fetched_at, or None if not cached.
+    """
+    if not SCRAPE_CACHE_ENABLED:
+        return None
+    return _cache.get(cache_key(url, variant))
+
+
+def is_fresh(entry) -> bool:
+    return time.time() - entry.get("fetched_at", 0) < SCRAPE_CACHE_FRESH_SECONDS
+
+
+def conditional_headers(entry) -> dict:
+    """Build If-None-Match / If-Modified-Since headers from a cached entry."""
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def store(url: str, data: dict, etag: str = None, last_modified: str = None, variant: str = None) -> None:
+    if not SCRAPE_CACHE_ENABLED:
+        return
+    _cache.set(cache_key(url, variant), {
+        "data": data,
+        "etag": etag,
+        "last_modified": last_modified,
+        "fetched_at": time.time(),
+    })
+
+
+def mark_revalidated(url: str, entry, variant: str = None) -> None:
+    """Refresh fetched_at after a 304 so the entry counts as fresh again."""
+    store(url, entry["data"], entry.get("etag"), entry.get("last_modified"), variant=variant)
+
+
+def clear() -> None:
+    _cache.clear()
@@ -1,10 +1,37 @@
+import os
 import requests
-from bs4 import BeautifulSoup
-import re
 import time
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+
+try:
+    from . import scrape_cache, http_client, article_parser, article_stream, mediawiki, article_store, entities, topic_index
+except ImportError:
+    import scrape_cache
+    import http_client
+    import article_parser
+    import article_stream
+    import mediawiki
+    import article_store
+    import entities
+    import topic_index
+
+# How article content is fetched:
+#   "html"   - download the full page and parse it (default)
+#   "stream" - read the page incrementally and stop after the intro + first sections
+#   "api"    - fetch a plain-text extract through the MediaWiki API (no HTML at all)
+#   "dump"   - look the article up in a local store built by dump_ingest.py (no network)
+SCRAPE_MODE = os.getenv("SCRAPE_MODE", "html").lower()
+SCRAPE_MODES = ("html", "stream", "api", "dump")
+ARTICLE_STORE_PATH = os.getenv("ARTICLE_STORE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "article_store"))
+# Results requested per opensearch call; the extra titles seed the topic index
+TOPIC_SEARCH_LIMIT = int(os.getenv("TOPIC_SEARCH_LIMIT", "10"))
+
+REQUEST_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
 
 def log_to_file(message):
     try:
@@ -13,118 +40,96 @@ def log_to_file(message):
             f.write(f"[{timestamp}] [SCRAPER] {message}\n")
     except Exception:
         pass
-def create_session_with_retries():
-    """Create a requests session with retry strategy"""
-    session = requests.Session()
-    retry_strategy = Retry(
-        total=3,  # Total number of retries
-        backoff_factor=1,  # Wait 1, 2, 4 seconds between retries
-        status_forcelist=[429, 500, 502, 503, 504],  # HTTP status codes to retry
-        allowed_methods=["GET"]  # Only retry GET requests
-    )
-    adapter = HTTPAdapter(max_retries=retry_strategy)
-    session.mount("http://", adapter)
-    session.mount("https://", adapter)
-    return session
-
-def scrape_wikipedia(url: str) -> dict:
+def parse_article_html(content) -> dict:
+    """
+    Parse rendered Wikipedia article HTML into the scraper output dict
+    (title, summary, sections, key_entities, full_text).
+    """
+    return build_scrape_result(article_parser.extract_article(content))
+
+def build_scrape_result(fields: dict) -> dict:
+    """Add key_entities to extracted article fields to form the scraper output dict."""
+    text = fields["full_text"]
+
+    # Key entities, ranked and deterministic so prompts (and caches keyed on them) are stable
+    key_entities = entities.extract_key_entities(text)
+
+    result = {
+        "title": fields["title"],
+        "summary": fields["summary"],
+        "sections": fields["sections"],
+        "key_entities": key_entities,
+        "full_text": text  # For LLM processing
+    }
+
+    return result
+
+def scrape_wikipedia(url: str, mode: str = None) -> dict:
     """
     Scrape a Wikipedia article and extract title, summary, sections, and key entities.
     Includes retry logic and better error handling for network issues.
+    mode overrides SCRAPE_MODE ("html", "stream", "api" or "dump").
     """
     max_retries = 3
     retry_delay = 2  # seconds
+    mode = (mode or SCRAPE_MODE).lower()
+    if mode not in SCRAPE_MODES:
+        raise ValueError(f"Unknown scrape mode: {mode}")
+    cache_variant = None if mode == "html" else mode
     
-    log_to_file(f"Scraping URL: {url}")
-    
+    log_to_file(f"Scraping URL: {url} (mode={mode})")
+
+    if mode == "dump":
+        # Already local and precomputed; the scrape cache would only add a copy
+        return scrape_wikipedia_dump(url)
+
+    # Serve repeat articles from the on-disk cache when possible
+    cached = scrape_cache.get_entry(url, variant=cache_variant)
+    if cached and scrape_cache.is_fresh(cached):
+        log_to_file(f"Cache hit (fresh): {url}")
+        return cached["data"]
+
+    if mode == "api":
+        return scrape_wikipedia_api(url)
+
     for attempt in range(max_retries):
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
+            headers = dict(REQUEST_HEADERS)
+            if cached:
+                # Revalidate the stale entry instead of re-downloading it
+                headers.update(scrape_cache.conditional_headers(cached))
             
-            # Create session with retry strategy
-            session = create_session_with_retries()
+            # Shared keep-alive session (retries transient HTTP errors itself)
+            session = http_client.get_session()
             
             # Make request with timeout
             response = session.get(
                 url, 
                 headers=headers,
-                timeout=(10, 30)  # (connect timeout, read timeout) in seconds
+                timeout=http_client.default_timeout(),
+                stream=(mode == "stream")
             )
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            # Extract title
-            title = soup.find('h1', {'id': 'firstHeading'}).get_text(strip=True) if soup.find('h1', {'id': 'firstHeading'}) else "Unknown Title"
-
-            # Extract summary (first paragraph)
-            summary_paragraph = soup.find('p', class_=lambda x: x != 'mw-empty-elt')
-            summary = summary_paragraph.get_text(strip=True) if summary_paragraph else ""
-
-            # Extract sections (headings)
-            sections = []
-            for heading in soup.find_all(['h2', 'h3'], {'class': 'mw-headline'}):
-                sections.append(heading.get_text(strip=True))
+            if response.status_code == 304 and cached:
+                log_to_file(f"Cache hit (revalidated): {url}")
+                response.close()
+                scrape_cache.mark_revalidated(url, cached, variant=cache_variant)
+                return cached["data"]
 
-            # Extract content from introduction and first few sections only for speed
-            content_text = ""
-            
-            # 1. Get introduction (paragraphs before first h2)
-            intro_div = soup.find('div', {'id': 'mw-content-text'})
-            if intro_div:
-                parser_output = intro_div.find('div', {'class': 'mw-parser-output'})
-                if parser_output:
-                    # Get direct paragraphs until first h2
-                    for element in parser_output.children:
-                        if element.name == 'h2':
-                            break
-                        if element.name == 'p':
-                            content_text += element.get_text(strip=True) + "\n\n"
-                    
-                    # 2. Get next 2 main sections
-                    sections_count = 0
-                    current_section = ""
-                    for element in parser_output.find_all(['h2', 'p', 'h3']):
-                        if element.name == 'h2':
-                            sections_count += 1
-                            if sections_count > 3: # Limit to Intro + 3 sections
-                                break
-                            current_section = element.get_text(strip=True)
-                            content_text += f"\n## {current_section}\n"
-                        elif element.name in ['p', 'h3']:
-                            content_text += element.get_text(strip=True) + "\n"
-
-            # Fallback if sophisticated parsing fails
-            if not content_text:
-                content_text = soup.get_text()[:6000]
-
-            text = content_text
-            
-            # Simple Key Entities (from limited text now)
-            people = re.findall(r'\b[A-Z][a-z]+ [A-Z][a-z]+\b', text)  # Simple name pattern
-            organizations = re.findall(r'\b[A-Z][a-z]+ (University|College|Institute|Company|Corporation|Foundation)\b', text)
-            locations = re.findall(r'\b[A-Z][a-z]+, [A-Z][a-z]+\b', text)  # City, Country
-
-            # Remove duplicates and limit
-            people = list(set(people))[:10]
-            organizations = list(set(organizations))[:10]
-            locations = list(set(locations))[:10]
-
-            result = {
-                "title": title,
-                "summary": summary,
-                "sections": sections,
-                "key_entities": {
-                    "people": people,
-                    "organizations": organizations,
-                    "locations": locations
-                },
-                "full_text": text  # For LLM processing
-            }
-            
-            # Close session
-            session.close()
+            if not response.ok:
+                response.close()
+            response.raise_for_status()
+            if mode == "stream":
+                # Stops reading (and drops the connection) once enough content is seen
+                result = build_scrape_result(article_stream.extract_streaming(response))
+            else:
+                result = parse_article_html(response.content)
+            scrape_cache.store(
+                url,
+                result,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+                variant=cache_variant
+            )
             return result
             
         except requests.exceptions.Timeout:
@@ -182,29 +187,132 @@ def scrape_wikipedia(url: str) -> dict:
     # If we get here, all retries failed
     raise ValueError(f"Failed to scrape {url} after {max_retries} attempts. Please check your internet connection.")
 
+def scrape_wikipedia_api(url: str) -> dict:
+    """
+    Build the scraper output from the MediaWiki API's plain-text extract
+    instead of the rendered page. Moves far fewer bytes and skips HTML parsing.
+    """
+    fields = mediawiki.fetch_article_fields([url]).get(url)
+    if fields is None:
+        raise ValueError(f"Wikipedia page not found: {url}\nPlease check the URL and try again.")
+    result = build_scrape_result(fields)
+    # api.php has no validators to revalidate against; the entry is simply refetched when stale
+    scrape_cache.store(url, result, variant="api")
+    return result
+
+def scrape_wikipedia_dump(url: str) -> dict:
+    """Serve the scraper output from the offline article store (see dump_ingest.py)."""
+    try:
+        store = article_store.get_store(ARTICLE_STORE_PATH)
+    except OSError as e:
+        raise ValueError(f"Offline article store not available at {ARTICLE_STORE_PATH}: {str(e)}")
+    result = store.get_by_url(url)
+    if result is None:
+        raise ValueError(f"Wikipedia page not found in offline store: {url}")
+    return result
+
+def scrape_many(urls, concurrency: int = 8, per_host: int = 4, mode: str = None):
+    """
+    Scrape many articles in parallel and yield results as they complete.
+
+    At most `concurrency` pages are fetched at once, and at most `per_host`
+    of them from any single host. Yields one dict per URL:
+    {"url": ..., "data": <scrape result or None>, "error": <message or None>}.
+    A failing URL never stops the batch.
+    """
+    urls = [u.strip() for u in urls if u and u.strip()]
+    host_limits = {}
+    host_lock = threading.Lock()
+
+    def host_semaphore(url):
+        host = urlsplit(url).netloc.lower()
+        with host_lock:
+            if host not in host_limits:
+                host_limits[host] = threading.BoundedSemaphore(per_host)
+            return host_limits[host]
+
+    def scrape_one(url):
+        with host_semaphore(url):
+            return scrape_wikipedia(url, mode=mode)
+
+    log_to_file(f"Bulk scrape of {len(urls)} URLs (concurrency={concurrency}, per_host={per_host})")
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        futures = {executor.submit(scrape_one, url): url for url in urls}
+        try:
+            for future in as_completed(futures):
+                url = futures[future]
+                try:
+                    yield {"url": url, "data": future.result(), "error": None}
+                except Exception as e:
+                    yield {"url": url, "data": None, "error": str(e)}
+        finally:
+            # Consumer stopped early: don't start the remaining URLs
+            for future in futures:
+                future.cancel()
+
 def search_wikipedia(topic: str) -> str:
     """
     Search Wikipedia for a topic and return the URL of the top result.
+    Repeat topics and titles already seen in earlier results are answered
+    from the in-process topic index without a network call.
     """
+    index = topic_index.get_index()
+    cached = index.lookup(topic)
+    if cached:
+        log_to_file(f"Topic cache hit: {topic}")
+        return cached[0][1]
+    known_url = index.title_url(topic)
+    if known_url:
+        log_to_file(f"Topic index hit: {topic}")
+        return known_url
+
     try:
-        search_url = "https://en.wikipedia.org/w/api.php"
-        params = {
-            "action": "opensearch",
-            "search": topic,
-            "limit": 1,
-            "namespace": 0,
-            "format": "json"
-        }
-        
-        response = requests.get(search_url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        
-        # data format: [search_term, [titles], [descriptions], [urls]]
-        if data and len(data) > 3 and data[3]:
-            return data[3][0]
+        results = _opensearch(topic, TOPIC_SEARCH_LIMIT)
+        if results:
+            index.remember(topic, results, exhaustive=len(results) < TOPIC_SEARCH_LIMIT)
+            return results[0][1]
         
         raise ValueError(f"No Wikipedia article found for topic: {topic}")
         
     except Exception as e:
         raise ValueError(f"Failed to search for topic '{topic}': {str(e)}")
+
+def autocomplete_topics(prefix: str, limit: int = 10) -> list:
+    """
+    Article titles starting with prefix, as [{"title", "url"}, ...].
+    Served from the topic index when it already holds enough matches, or
+    when an earlier search for this or a shorter prefix returned every match;
+    otherwise one opensearch call seeds it.
+    """
+    index = topic_index.get_index()
+    matches = index.complete(prefix, limit)
+    if len(matches) < limit and not index.covers(prefix):
+        try:
+            search_limit = max(limit, TOPIC_SEARCH_LIMIT)
+            results = _opensearch(prefix, search_limit)
+            index.remember(prefix, results, exhaustive=len(results) < search_limit)
+            matches = index.complete(prefix, limit)
+        except Exception as e:
+            # Autocomplete is best effort: fall back to what the index has
+            log_to_file(f"Autocomplete search failed for '{prefix}': {e}")
+    return [{"title": title, "url": url} for title, url in matches]
+
+def _opensearch(topic: str, limit: int) -> list:
+    """opensearch results for topic as [(title, url), ...], best match first."""
+    search_url = mediawiki.MEDIAWIKI_API_URL or "https://en.wikipedia.org/w/api.php"
+    params = {
+        "action": "opensearch",
+        "search": topic,
+        "limit": limit,
+        "namespace": 0,
+        "format": "json"
+    }
+    
+    response = http_client.get_session().get(search_url, params=params, timeout=http_client.default_timeout())
+    response.raise_for_status()
+    data = response.json()
+    
+    # data format: [search_term, [titles], [descriptions], [urls]]
+    if data and len(data) > 3 and data[3]:
+        return list(zip(data[1], data[3]))
+    return []
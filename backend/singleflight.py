@@ -0,0 +1,90 @@
+import asyncio
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class Group:
+    """
+    Collapse concurrent calls with the same key into one: the first caller
+    runs fn, callers arriving while it runs wait and get the same result
+    (or the same exception). Once the call finishes, the next caller with
+    that key starts a new one; nothing is cached.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> _Call
+
+    def do(self, key, fn, *args, **kwargs):
+        """Return (result, shared); shared is True if another caller ran fn."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self) -> dict:
+        """Key -> number of callers waiting on it besides the one running it."""
+        with self._lock:
+            return {key: call.waiters for key, call in self._calls.items()}
+
+
+class AsyncGroup:
+    """
+    Group for coroutines on one event loop. The shared work runs as its own
+    task, so a caller that disconnects (and is cancelled) does not cancel
+    it for the others.
+    """
+
+    def __init__(self):
+        self._tasks = {}  # key -> (task, [waiters])
+
+    async def do(self, key, coro_fn, *args, **kwargs):
+        """Return (result, shared); shared is True if another caller started the work."""
+        entry = self._tasks.get(key)
+        shared = entry is not None
+        if shared:
+            entry[1][0] += 1
+        else:
+            task = asyncio.ensure_future(coro_fn(*args, **kwargs))
+            entry = self._tasks[key] = (task, [0])
+            task.add_done_callback(lambda _: self._forget(key, task))
+        return await asyncio.shield(entry[0]), shared
+
+    def _forget(self, key, task) -> None:
+        entry = self._tasks.get(key)
+        if entry is not None and entry[0] is task:
+            del self._tasks[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved even if every caller went away
+            task.exception()
+
+    def in_flight(self) -> dict:
+        return {key: entry[1][0] for key, entry in self._tasks.items()}
@@ -0,0 +1,73 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import scraper
+from article_store import ArticleStore
+from dump_ingest import build_store, wikitext_to_text
+
+DUMP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'sample_data', 'dump', 'sample-pages-articles.xml')
+
+
+def build_sample_store():
+    output_dir = tempfile.mkdtemp()
+    counts = build_store(DUMP_PATH, output_dir)
+    return output_dir, counts
+
+
+def test_wikitext_to_text():
+    text = wikitext_to_text(
+        "{{Infobox|a={{nested}}}}'''Bold''' [[Target|label]] and [[Plain]].<ref>cite</ref>\n"
+        "==History==\n* item [http://x.org site]"
+    )
+    assert text == "Bold label and Plain.\n== History ==\nitem site"
+
+
+def test_ingest_and_lookup():
+    output_dir, counts = build_sample_store()
+    assert counts == {"articles": 2, "redirects": 1}
+
+    store = ArticleStore(output_dir)
+    try:
+        turing = store.get_by_url("https://en.wikipedia.org/wiki/Alan_Turing")
+        assert turing["title"] == "Alan Turing"
+        assert turing["summary"].startswith("Alan Mathison Turing (23 June 1912")
+        assert turing["sections"] == ["Early life and education", "Family", "Career and research", "Personal life", "Legacy"]
+        assert "## Personal life" in turing["full_text"]
+        assert "Infobox" not in turing["full_text"] and "wikitable" not in turing["full_text"]
+        assert "Gordon Welchman" in turing["key_entities"]["people"]
+
+        # Same dict shape as the live scraper
+        assert set(turing) == {"title", "summary", "sections", "key_entities", "full_text"}
+        assert set(turing["key_entities"]) == {"people", "organizations", "locations"}
+
+        assert store.get("turing") == turing  # redirect, first letter case-insensitive
+        assert store.get("Talk:Alan Turing") is None
+        assert store.get("Nonexistent") is None
+    finally:
+        store.close()
+
+
+def test_scrape_dump_mode():
+    output_dir, _ = build_sample_store()
+    original = scraper.ARTICLE_STORE_PATH
+    scraper.ARTICLE_STORE_PATH = output_dir
+    try:
+        result = scraper.scrape_wikipedia("https://en.wikipedia.org/wiki/Zeta_Island", mode="dump")
+        assert result["title"] == "Zeta Island"
+        try:
+            scraper.scrape_wikipedia("https://en.wikipedia.org/wiki/Missing", mode="dump")
+            assert False, "expected ValueError"
+        except ValueError as e:
+            assert "not found" in str(e)
+    finally:
+        scraper.ARTICLE_STORE_PATH = original
+
+
+if __name__ == "__main__":
+    test_wikitext_to_text()
+    test_ingest_and_lookup()
+    test_scrape_dump_mode()
+    print("Article store tests passed!")
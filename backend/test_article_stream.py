@@ -0,0 +1,112 @@
+import os
+import sys
+import glob
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import article_parser
+import article_stream
+from scraper import scrape_wikipedia
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'sample_data', 'pages')
+
+# A "featured article" sized page: the saved Turing page plus ~2 MB of extra sections
+with open(os.path.join(PAGES_DIR, 'alan_turing_modern.html'), 'rb') as f:
+    BASE_PAGE = f.read()
+FILLER = b"".join(
+    b'<div class="mw-heading mw-heading2"><h2>Extra %d</h2></div><p>' % i + b"Filler text. " * 400 + b"</p>\n"
+    for i in range(400)
+)
+BIG_PAGE = BASE_PAGE.replace(b"</div></div>\n</div>\n</main>", FILLER + b"</div></div>\n</div>\n</main>")
+
+
+class BigPageHandler(BaseHTTPRequestHandler):
+    bytes_sent = 0
+    finished = threading.Event()
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=UTF-8")
+        self.send_header("Content-Length", str(len(BIG_PAGE)))
+        self.end_headers()
+        try:
+            for i in range(0, len(BIG_PAGE), 8192):
+                self.wfile.write(BIG_PAGE[i:i + 8192])
+                self.wfile.flush()
+                BigPageHandler.bytes_sent += 8192
+                time.sleep(0.001)  # Trickle like a real network, so an early close is visible
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client stopped reading early, which is the point
+        finally:
+            BigPageHandler.finished.set()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_streaming_matches_full_parse_fields():
+    for path in sorted(glob.glob(os.path.join(PAGES_DIR, '*.html'))):
+        with open(path, encoding='utf-8') as f:
+            html = f.read()
+        full = article_parser.extract_article(html, engine="bs4")
+        # Feed in tiny chunks to exercise text nodes split across feeds
+        streamed = article_stream.extract_streaming_text(html[i:i + 7] for i in range(0, len(html), 7))
+        assert streamed["title"] == full["title"]
+        assert streamed["summary"] == full["summary"]
+        assert streamed["sections"] == full["sections"]
+        for line in streamed["full_text"].splitlines():
+            assert line in full["full_text"]
+
+
+def test_sections_are_truncated_at_the_cutoff():
+    body = "".join(f'<h2 class="mw-headline">S{i}</h2><p>Text {i}.</p>' for i in range(6))
+    html = ('<html><body><h1 id="firstHeading">Page</h1><div id="mw-content-text">'
+            f'<div class="mw-parser-output"><p>Intro.</p>{body}</div></div></body></html>')
+    full = article_parser.extract_article(html, engine="bs4")
+    assert full["sections"] == [f"S{i}" for i in range(6)]
+    for max_sections in (1, 3, 5):
+        streamed = article_stream.extract_streaming_text([html], max_sections=max_sections)
+        assert streamed["sections"] == full["sections"][:max_sections]
+        assert f"## S{max_sections - 1}" in streamed["full_text"]
+        assert f"S{max_sections}" not in streamed["full_text"]
+    # With room for every section the two paths agree exactly
+    assert article_stream.extract_streaming_text([html], max_sections=6)["sections"] == full["sections"]
+
+
+def test_streaming_stops_after_requested_sections():
+    html = BIG_PAGE.decode("utf-8")
+    fields = article_stream.extract_streaming_text([html], max_sections=3)
+    assert "## Personal life" in fields["full_text"]
+    assert "Legacy" not in fields["full_text"]
+    assert "Filler text" not in fields["full_text"]
+
+
+def test_scrape_stream_mode_reads_only_the_beginning():
+    import scrape_cache
+    original = scrape_cache.SCRAPE_CACHE_ENABLED
+    scrape_cache.SCRAPE_CACHE_ENABLED = False
+    server = HTTPServer(("127.0.0.1", 0), BigPageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        url = f"http://127.0.0.1:{server.server_port}/wiki/Alan_Turing"
+        result = scrape_wikipedia(url, mode="stream")
+        assert result["title"] == "Alan Turing"
+        assert "## Career and research" in result["full_text"]
+        assert "Filler text" not in result["full_text"]
+        # Socket buffers let the server run ahead a little, but nowhere near the full page
+        BigPageHandler.finished.wait(timeout=10)
+        assert BigPageHandler.bytes_sent < len(BIG_PAGE) / 2
+    finally:
+        scrape_cache.SCRAPE_CACHE_ENABLED = original
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_streaming_matches_full_parse_fields()
+    test_sections_are_truncated_at_the_cutoff()
+    test_streaming_stops_after_requested_sections()
+    test_scrape_stream_mode_reads_only_the_beginning()
+    print("Streaming extraction tests passed!")
@@ -0,0 +1,104 @@
+import os
+import sys
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import scrape_cache
+import http_client
+from scraper import scrape_wikipedia
+from async_scraper import scrape_wikipedia_async
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'sample_data', 'pages')
+
+with open(os.path.join(PAGES_DIR, 'alan_turing_modern.html'), 'rb') as f:
+    PAGE = f.read()
+
+
+class WikiHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.endswith("/Missing"):
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=UTF-8")
+        self.send_header("Content-Length", str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def run_with_server(coro_factory):
+    original = scrape_cache.SCRAPE_CACHE_ENABLED
+    scrape_cache.SCRAPE_CACHE_ENABLED = False
+    server = ThreadingHTTPServer(("127.0.0.1", 0), WikiHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}/wiki"
+
+    async def main():
+        try:
+            return await coro_factory(base)
+        finally:
+            await http_client.close_async_client()
+
+    try:
+        return asyncio.run(main()), base
+    finally:
+        scrape_cache.SCRAPE_CACHE_ENABLED = original
+        server.shutdown()
+
+
+def test_async_matches_sync_output():
+    async def scrape(base):
+        return await asyncio.gather(*[
+            scrape_wikipedia_async(f"{base}/Alan_Turing_{i}") for i in range(20)
+        ])
+
+    results, base = run_with_server(scrape)
+    assert len(results) == 20
+    assert all(r == results[0] for r in results)
+    assert results[0]["title"] == "Alan Turing"
+
+    original = scrape_cache.SCRAPE_CACHE_ENABLED
+    scrape_cache.SCRAPE_CACHE_ENABLED = False
+    try:
+        server = ThreadingHTTPServer(("127.0.0.1", 0), WikiHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        sync_result = scrape_wikipedia(f"http://127.0.0.1:{server.server_port}/wiki/Alan_Turing")
+        server.shutdown()
+    finally:
+        scrape_cache.SCRAPE_CACHE_ENABLED = original
+    assert results[0] == sync_result
+
+
+def test_async_stream_mode():
+    async def scrape(base):
+        return await scrape_wikipedia_async(f"{base}/Alan_Turing", mode="stream")
+
+    result, _ = run_with_server(scrape)
+    assert "## Personal life" in result["full_text"]
+    assert "Legacy" not in result["full_text"]
+
+
+def test_async_not_found():
+    async def scrape(base):
+        try:
+            await scrape_wikipedia_async(f"{base}/Missing")
+        except ValueError as e:
+            return str(e)
+        return None
+
+    message, _ = run_with_server(scrape)
+    assert message.startswith("Wikipedia page not found")
+
+
+if __name__ == "__main__":
+    test_async_matches_sync_output()
+    test_async_stream_mode()
+    test_async_not_found()
+    print("Async scraper tests passed!")
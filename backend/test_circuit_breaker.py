@@ -0,0 +1,153 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import llm
+import circuit_breaker
+from circuit_breaker import CircuitBreaker, CircuitOpenError, CLOSED, OPEN, HALF_OPEN
+
+
+def trip(breaker):
+    for _ in range(circuit_breaker.MIN_CALLS):
+        assert breaker.acquire()
+        breaker.record(False)
+
+
+def expire_cooldown(breaker):
+    breaker._opened_at -= breaker._cooldown
+
+
+def test_opens_on_failure_rate():
+    breaker = CircuitBreaker("m")
+    for _ in range(circuit_breaker.MIN_CALLS - 1):
+        breaker.acquire()
+        breaker.record(False)
+    assert breaker.status()["state"] == CLOSED  # too few calls to judge yet
+    breaker.acquire()
+    breaker.record(False)
+    assert breaker.status()["state"] == OPEN
+    assert not breaker.available()
+    assert not breaker.acquire()
+    assert breaker.status()["rejected"] == 1
+
+
+def test_occasional_failures_keep_circuit_closed():
+    breaker = CircuitBreaker("m")
+    for i in range(circuit_breaker.WINDOW * 2):
+        breaker.acquire()
+        breaker.record(i % 4 != 0)
+    assert breaker.status()["state"] == CLOSED
+
+
+def test_half_open_probe_closes_on_success():
+    breaker = CircuitBreaker("m")
+    trip(breaker)
+    expire_cooldown(breaker)
+    assert breaker.status()["state"] == HALF_OPEN
+    assert breaker.acquire()
+    # Only HALF_OPEN_PROBES calls at a time while probing
+    assert not breaker.acquire()
+    breaker.record(True)
+    assert breaker.status()["state"] == CLOSED
+    assert breaker.acquire()
+
+
+def test_failed_probe_reopens_with_longer_cooldown():
+    breaker = CircuitBreaker("m")
+    trip(breaker)
+    expire_cooldown(breaker)
+    assert breaker.acquire()
+    breaker.record(False)
+    assert breaker.status()["state"] == OPEN
+    assert breaker._cooldown == min(circuit_breaker.MAX_COOLDOWN, circuit_breaker.COOLDOWN * 2)
+
+
+def test_released_probe_frees_the_slot():
+    breaker = CircuitBreaker("m")
+    trip(breaker)
+    expire_cooldown(breaker)
+    assert breaker.acquire()
+    breaker.release()
+    assert breaker.acquire()
+
+
+def with_fake_gemini(fn, hedged):
+    """Run fn(calls) with call_llm going to the Gemini models of a fake request_gemini."""
+    calls = []
+
+    def fake_request(api_key, model_name, prompt_text, generation_config=None):
+        calls.append(model_name)
+        return '{"quiz": [{"question": "Q", "options": ["A", "B"], "answer": "A"}], "related_topics": []}'
+
+    saved = llm.request_gemini, llm.LLM_HEDGE_ENABLED, llm.LLM_PROVIDERS
+    original_key = os.environ.get("GOOGLE_API_KEY")
+    llm.request_gemini, llm.LLM_HEDGE_ENABLED, llm.LLM_PROVIDERS = fake_request, hedged, ["gemini"]
+    os.environ["GOOGLE_API_KEY"] = "test-key"
+    circuit_breaker.reset()
+    llm.llm_router.get_router().reset()
+    try:
+        return fn(calls)
+    finally:
+        llm.request_gemini, llm.LLM_HEDGE_ENABLED, llm.LLM_PROVIDERS = saved
+        if original_key is None:
+            os.environ.pop("GOOGLE_API_KEY", None)
+        else:
+            os.environ["GOOGLE_API_KEY"] = original_key
+        circuit_breaker.reset()
+        llm.llm_router.get_router().reset()
+
+
+def test_call_llm_skips_open_backend_without_a_request():
+    def run(calls):
+        trip(circuit_breaker.get_breaker(llm.GEMINI_MODELS[0]))
+        _, name = llm.call_llm("prompt", validate=llm.parse_quiz_response)
+        assert name == llm.GEMINI_MODELS[1]
+        assert calls == [llm.GEMINI_MODELS[1]]
+
+    for hedged in (True, False):
+        with_fake_gemini(run, hedged)
+
+
+def test_all_circuits_open_fails_fast():
+    def run(calls):
+        for model_name in llm.GEMINI_MODELS:
+            trip(circuit_breaker.get_breaker(model_name))
+        try:
+            llm.call_llm("prompt")
+        except CircuitOpenError:
+            assert calls == []
+            return
+        raise AssertionError("expected CircuitOpenError")
+
+    for hedged in (True, False):
+        with_fake_gemini(run, hedged)
+
+
+def test_backend_status_reports_circuits():
+    original = llm.LLM_PROVIDERS
+    llm.LLM_PROVIDERS = ["stub"]
+    circuit_breaker.reset()
+    try:
+        trip(circuit_breaker.get_breaker("stub"))
+        status = llm.backend_status()
+    finally:
+        llm.LLM_PROVIDERS = original
+        circuit_breaker.reset()
+    assert status["providers"] == ["stub"]
+    [row] = status["backends"]
+    assert row["name"] == "stub" and row["provider"] == "stub"
+    assert row["circuit"]["state"] == OPEN
+    assert row["circuit"]["retry_in"] > 0
+
+
+if __name__ == "__main__":
+    test_opens_on_failure_rate()
+    test_occasional_failures_keep_circuit_closed()
+    test_half_open_probe_closes_on_success()
+    test_failed_probe_reopens_with_longer_cooldown()
+    test_released_probe_frees_the_slot()
+    test_call_llm_skips_open_backend_without_a_request()
+    test_all_circuits_open_fails_fast()
+    test_backend_status_reports_circuits()
+    print("Circuit breaker tests passed!")
@@ -0,0 +1,82 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import context_packer
+from context_packer import pack_context, split_chunks, estimate_tokens
+
+
+def long_article():
+    filler = "The weather that year was unremarkable and the harvest was average across the region. "
+    sections = [
+        ("Early life", "Turing attended Sherborne School, where his talent for mathematics was noted. "),
+        ("Gardening", filler * 4),
+        ("Codebreaking", "At Bletchley Park Turing designed the bombe to break Enigma messages. "),
+        ("Local history", filler * 4),
+        ("Computing", "Turing proposed the Automatic Computing Engine and wrote on machine intelligence. "),
+        ("Archive notes", filler * 4),
+    ]
+    intro = "Alan Turing was an English mathematician and computer scientist."
+    body = "\n".join(f"\n## {heading}\n" + "\n".join([text] * 3) for heading, text in sections)
+    return {
+        "title": "Alan Turing",
+        "summary": intro,
+        "sections": [heading for heading, _ in sections],
+        "key_entities": {"people": ["Alan Turing"], "organizations": ["Bletchley Park"], "locations": []},
+        "full_text": intro + "\n" + body,
+    }
+
+
+def test_short_text_is_unchanged():
+    data = {"title": "Stub", "summary": "A stub.", "key_entities": {}, "full_text": "A stub.\n\n## One\nBody."}
+    assert pack_context(data, budget=1000) == data["full_text"]
+
+
+def test_packed_text_fits_budget():
+    data = long_article()
+    for budget in (50, 120, 300):
+        assert estimate_tokens(pack_context(data, budget=budget)) <= budget
+
+
+def test_relevant_sections_beat_filler():
+    data = long_article()
+    packed = pack_context(data, budget=150)
+    assert "bombe" in packed
+    assert "Automatic Computing Engine" in packed
+    assert "harvest" not in packed
+    # A plain prefix cut of the same size never reaches the later sections
+    assert "Automatic Computing Engine" not in data["full_text"][:150 * 4]
+
+
+def test_order_and_headings_are_kept():
+    packed = pack_context(long_article(), budget=150)
+    assert packed.index("## Early life") < packed.index("## Codebreaking") < packed.index("## Computing")
+    assert packed.count("## Codebreaking") == 1
+
+
+def test_duplicates_are_dropped():
+    data = long_article()
+    packed = pack_context(data, budget=300)
+    # Repeated paragraphs and the intro (a copy of the summary, which the
+    # prompt already has) are left out
+    assert packed.count("designed the bombe") == 1
+    assert packed.count("The weather that year") <= 4  # one copy of the filler paragraph
+    assert "English mathematician and computer scientist" not in packed
+
+
+def test_split_chunks_respects_chunk_size():
+    data = long_article()
+    for chunk in split_chunks(data["full_text"]):
+        paragraphs = chunk["text"].split("\n")
+        assert len(paragraphs) == 1 or estimate_tokens(" ".join(paragraphs)) <= context_packer.MAX_CHUNK_TOKENS
+
+
+if __name__ == "__main__":
+    test_short_text_is_unchanged()
+    test_packed_text_fits_budget()
+    test_relevant_sections_beat_filler()
+    test_order_and_headings_are_kept()
+    test_duplicates_are_dropped()
+    test_split_chunks_respects_chunk_size()
+    print("Context packer tests passed!")
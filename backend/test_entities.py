@@ -0,0 +1,87 @@
+import os
+import re
+import sys
+import glob
+import json
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import entities
+
+RECORDINGS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'sample_data', 'mediawiki')
+
+
+def legacy_key_entities(text):
+    """The three-regex extractor entities.py replaced, kept for the benchmark."""
+    people = re.findall(r'\b[A-Z][a-z]+ [A-Z][a-z]+\b', text)
+    organizations = re.findall(r'\b[A-Z][a-z]+ (University|College|Institute|Company|Corporation|Foundation)\b', text)
+    locations = re.findall(r'\b[A-Z][a-z]+, [A-Z][a-z]+\b', text)
+    return {
+        "people": list(set(people))[:10],
+        "organizations": list(set(organizations))[:10],
+        "locations": list(set(locations))[:10],
+    }
+
+
+def load_corpus():
+    texts = []
+    for path in sorted(glob.glob(os.path.join(RECORDINGS_DIR, '*.json'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            for page in json.load(f)["query"]["pages"]:
+                texts.append(page.get("extract", ""))
+    return "\n".join(texts)
+
+
+def test_categories():
+    text = (
+        "Alan Turing studied at Princeton University. He was born in London, England. "
+        "Alan Turing later joined Manchester University and met Max Newman in Bletchley, England."
+    )
+    result = entities.extract_key_entities(text)
+    assert result["people"] == ["Alan Turing", "Max Newman"]
+    # Full organization names, not just the suffix word
+    assert result["organizations"] == ["Princeton University", "Manchester University"]
+    assert result["locations"] == ["London, England", "Bletchley, England"]
+
+
+def test_frequency_ranking_and_limit():
+    names = [f"Pers{chr(97 + i)} Name" for i in range(12)]
+    text = " . ".join(names) + " . " + " . ".join([names[11]] * 3 + [names[5]] * 2)
+    people = entities.extract_key_entities(text)["people"]
+    assert len(people) == entities.MAX_ENTITIES
+    assert people[0] == names[11]
+    assert people[1] == names[5]
+    # Ties keep first-occurrence order
+    assert people[2:] == [n for n in names if n not in (names[11], names[5])][:8]
+
+
+def test_deterministic_on_corpus():
+    text = load_corpus()
+    first = entities.extract_key_entities(text)
+    assert first == entities.extract_key_entities(text)
+    assert first["people"]
+    assert all(entity in text for entity in sum(first.values(), []))
+
+
+def benchmark(target_bytes=5_000_000, repeat=3):
+    """Throughput of the legacy and single-pass extractors over a large text."""
+    text = load_corpus()
+    text = text * max(1, target_bytes // max(1, len(text)))
+    size_mb = len(text.encode("utf-8")) / 1_000_000
+    for name, extract in (("legacy", legacy_key_entities), ("single-pass", entities.extract_key_entities)):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            extract(text)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        print(f"{name}: {size_mb / best:.1f} MB/s ({best * 1000:.1f} ms for {size_mb:.1f} MB)")
+
+
+if __name__ == "__main__":
+    test_categories()
+    test_frequency_ranking_and_limit()
+    test_deterministic_on_corpus()
+    print("Entity extraction tests passed!")
+    benchmark()
@@ -0,0 +1,214 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import hedging
+import llm
+
+
+def delayed(value, seconds, started=None, name=None):
+    def fn():
+        if started is not None:
+            started.append(name)
+        time.sleep(seconds)
+        return value
+    return fn
+
+
+def failing(message, started=None, name=None):
+    def fn():
+        if started is not None:
+            started.append(name)
+        raise Exception(message)
+    return fn
+
+
+def test_fast_primary_does_not_hedge():
+    started = []
+    result, name = hedging.run_hedged(
+        [("a", delayed("A", 0.01, started, "a")), ("b", delayed("B", 0.01, started, "b"))],
+        delay_for=lambda name: 1.0,
+    )
+    assert (result, name) == ("A", "a")
+    assert started == ["a"]
+
+
+def test_slow_primary_is_hedged_and_faster_backup_wins():
+    started = []
+    begin = time.perf_counter()
+    result, name = hedging.run_hedged(
+        [("a", delayed("A", 1.0, started, "a")), ("b", delayed("B", 0.05, started, "b"))],
+        delay_for=lambda name: 0.1,
+    )
+    elapsed = time.perf_counter() - begin
+    assert (result, name) == ("B", "b")
+    assert started == ["a", "b"]
+    assert elapsed < 0.5
+
+
+def test_failure_starts_next_candidate_immediately():
+    begin = time.perf_counter()
+    result, name = hedging.run_hedged(
+        [("a", failing("boom")), ("b", delayed("B", 0.01))],
+        delay_for=lambda name: 5.0,
+    )
+    assert (result, name) == ("B", "b")
+    assert time.perf_counter() - begin < 1.0
+
+
+def test_invalid_result_is_rejected():
+    def validate(value):
+        if value != "good":
+            raise ValueError("bad answer")
+
+    result, name = hedging.run_hedged(
+        [("a", delayed("garbage", 0.01)), ("b", delayed("good", 0.05))],
+        validate=validate,
+        delay_for=lambda name: 5.0,
+    )
+    assert (result, name) == ("good", "b")
+
+
+def test_all_failing_raises_last_error():
+    try:
+        hedging.run_hedged([("a", failing("first")), ("b", failing("second"))], delay_for=lambda name: 0.1)
+    except Exception as e:
+        assert "second" in str(e) or "first" in str(e)
+    else:
+        raise AssertionError("expected an exception")
+
+
+def test_unstarted_candidates_are_cancelled():
+    started = []
+    hedging.run_hedged(
+        [("a", delayed("A", 0.01, started, "a")), ("b", delayed("B", 0.01, started, "b")),
+         ("c", delayed("C", 0.01, started, "c"))],
+        delay_for=lambda name: 1.0,
+    )
+    time.sleep(0.1)
+    assert started == ["a"]
+
+
+def test_busy_pool_does_not_start_extra_hedges():
+    import threading
+    started = []
+    lock = threading.Lock()
+
+    def call(name):
+        def fn():
+            with lock:
+                started.append(name)
+            time.sleep(0.3)
+            return name
+        return fn
+
+    saved = hedging.MAX_WORKERS, hedging._executor
+    hedging.MAX_WORKERS, hedging._executor = 2, None
+    results = []
+    try:
+        requests = [
+            threading.Thread(target=lambda i=i: results.append(hedging.run_hedged(
+                [(f"primary-{i}", call(f"primary-{i}")), (f"backup-{i}", call(f"backup-{i}"))],
+                delay_for=lambda name: 0.1,
+            )))
+            for i in range(4)
+        ]
+        for thread in requests:
+            thread.start()
+        for thread in requests:
+            thread.join()
+    finally:
+        hedging._executor.shutdown(wait=True)
+        hedging.MAX_WORKERS, hedging._executor = saved
+    # Queued calls and a full pool never count as slow: one call per request
+    assert sorted(started) == [f"primary-{i}" for i in range(4)]
+    assert sorted(name for _, name in results) == sorted(started)
+
+
+def test_delay_follows_recorded_percentile():
+    hedging.reset_latencies()
+    assert hedging.hedge_delay("model") == hedging.HEDGE_DEFAULT_DELAY
+    for ms in range(1, 101):
+        hedging.record_latency("model", ms / 10)
+    # 95th percentile of 0.1s .. 10.0s
+    assert abs(hedging.hedge_delay("model") - 9.5) < 1e-9
+    hedging.reset_latencies()
+
+
+QUIZ_TEXT = '{"quiz": [{"question": "Q", "options": ["A", "B"], "answer": "A"}], "related_topics": []}'
+
+
+def with_gemini_backends(fn, fake_request, hedged):
+    saved = llm.request_gemini, llm.LLM_HEDGE_ENABLED, llm.LLM_PROVIDERS
+    original_key = os.environ.get("GOOGLE_API_KEY")
+    llm.request_gemini, llm.LLM_HEDGE_ENABLED, llm.LLM_PROVIDERS = fake_request, hedged, ["gemini"]
+    os.environ["GOOGLE_API_KEY"] = "test-key"
+    llm.llm_router.get_router().reset()
+    llm.circuit_breaker.reset()
+    try:
+        return fn()
+    finally:
+        llm.request_gemini, llm.LLM_HEDGE_ENABLED, llm.LLM_PROVIDERS = saved
+        if original_key is None:
+            os.environ.pop("GOOGLE_API_KEY", None)
+        else:
+            os.environ["GOOGLE_API_KEY"] = original_key
+        llm.llm_router.get_router().reset()
+        llm.circuit_breaker.reset()
+
+
+def test_call_llm_reports_winning_backend():
+    calls = []
+
+    def fake_request(api_key, model_name, prompt_text, generation_config=None):
+        calls.append(model_name)
+        if model_name == llm.GEMINI_MODELS[0]:
+            raise Exception("API Error 503: overloaded")
+        return QUIZ_TEXT
+
+    for hedged in (True, False):
+        calls.clear()
+        text, name = with_gemini_backends(
+            lambda: llm.call_llm("prompt", validate=llm.parse_quiz_response), fake_request, hedged)
+        assert name == llm.GEMINI_MODELS[1] and text == QUIZ_TEXT
+        assert calls == llm.GEMINI_MODELS[:2]
+
+
+def test_hedged_call_llm_takes_the_faster_backend():
+    calls = []
+
+    def fake_request(api_key, model_name, prompt_text, generation_config=None):
+        calls.append(model_name)
+        time.sleep(1.0 if model_name == llm.GEMINI_MODELS[0] else 0.05)
+        return QUIZ_TEXT
+
+    original_delay = hedging.HEDGE_DEFAULT_DELAY
+    hedging.HEDGE_DEFAULT_DELAY = 0.1
+    hedging.reset_latencies()
+    try:
+        begin = time.perf_counter()
+        text, name = with_gemini_backends(
+            lambda: llm.call_llm("prompt", validate=llm.parse_quiz_response), fake_request, hedged=True)
+        elapsed = time.perf_counter() - begin
+    finally:
+        hedging.HEDGE_DEFAULT_DELAY = original_delay
+        hedging.reset_latencies()
+    assert name == llm.GEMINI_MODELS[1] and text == QUIZ_TEXT
+    assert calls == llm.GEMINI_MODELS[:2]
+    assert elapsed < 0.6
+
+
+if __name__ == "__main__":
+    test_fast_primary_does_not_hedge()
+    test_slow_primary_is_hedged_and_faster_backup_wins()
+    test_failure_starts_next_candidate_immediately()
+    test_invalid_result_is_rejected()
+    test_all_failing_raises_last_error()
+    test_unstarted_candidates_are_cancelled()
+    test_busy_pool_does_not_start_extra_hedges()
+    test_delay_follows_recorded_percentile()
+    test_call_llm_reports_winning_backend()
+    test_hedged_call_llm_takes_the_faster_backend()
+    print("Hedging tests passed!")
@@ -0,0 +1,255 @@
+import os
+import sys
+import time
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import jobs
+import models
+from database import Base
+
+
+def temp_sessions(directory):
+    engine = create_engine(f"sqlite:///{os.path.join(directory, 'jobs.db')}",
+                           connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def wait_for(Session, job_id, statuses=(jobs.DONE, jobs.FAILED), timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        db = Session()
+        try:
+            job = jobs.get_job(db, job_id)
+            if job.status in statuses:
+                return jobs.job_to_dict(job)
+        finally:
+            db.close()
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def enqueue(Session, url, fresh=False):
+    db = Session()
+    try:
+        return jobs.enqueue(db, url, fresh).id
+    finally:
+        db.close()
+
+
+def fake_handler(db, job):
+    return {"id": 7, "url": job.url, "title": "Title", "data": {"quiz": []}}
+
+
+def test_enqueue_returns_before_work_and_worker_completes_job():
+    with tempfile.TemporaryDirectory() as directory:
+        Session = temp_sessions(directory)
+        job_id = enqueue(Session, "https://en.wikipedia.org/wiki/Alan_Turing")
+        db = Session()
+        assert jobs.job_to_dict(jobs.get_job(db, job_id))["status"] == jobs.QUEUED
+        db.close()
+
+        pool = jobs.JobWorkerPool(workers=1, handler=fake_handler, session_factory=Session)
+        pool.start()
+        try:
+            job = wait_for(Session, job_id)
+        finally:
+            pool.stop()
+    assert job["status"] == jobs.DONE and job["attempts"] == 1
+    assert job["quiz_id"] == 7 and job["result"]["title"] == "Title"
+    assert job["started_at"] and job["finished_at"]
+
+
+def test_transient_errors_retry_and_value_errors_fail():
+    calls = []
+
+    def flaky(db, job):
+        calls.append(job.url)
+        if job.url == "bad":
+            raise ValueError("Wikipedia page not found")
+        if calls.count(job.url) < 2:
+            raise ConnectionError("timeout")
+        return {"id": 1}
+
+    with tempfile.TemporaryDirectory() as directory:
+        Session = temp_sessions(directory)
+        good, bad = enqueue(Session, "good"), enqueue(Session, "bad")
+        pool = jobs.JobWorkerPool(workers=1, handler=flaky, session_factory=Session)
+        for _ in range(5):
+            pool.run_once()
+        good_job, bad_job = wait_for(Session, good), wait_for(Session, bad)
+    assert good_job["status"] == jobs.DONE and good_job["attempts"] == 2 and good_job["error"] is None
+    assert bad_job["status"] == jobs.FAILED and bad_job["attempts"] == 1
+    assert "not found" in bad_job["error"]
+
+
+def test_attempts_are_capped():
+    def always_down(db, job):
+        raise ConnectionError("down")
+
+    with tempfile.TemporaryDirectory() as directory:
+        Session = temp_sessions(directory)
+        job_id = enqueue(Session, "x")
+        pool = jobs.JobWorkerPool(workers=1, handler=always_down, session_factory=Session)
+        while pool.run_once():
+            pass
+        job = wait_for(Session, job_id)
+    assert job["status"] == jobs.FAILED and job["attempts"] == jobs.JOB_MAX_ATTEMPTS
+
+
+def test_jobs_survive_a_restart():
+    with tempfile.TemporaryDirectory() as directory:
+        Session = temp_sessions(directory)
+        lost, live = enqueue(Session, "lost"), enqueue(Session, "live")
+        # A previous process claimed both and died: one lease has run out,
+        # the other still belongs to a (presumably) running worker
+        db = Session()
+        for job_id, expires in ((lost, time.time() - 1), (live, time.time() + 60)):
+            job = jobs.get_job(db, job_id)
+            job.status, job.attempts, job.lease_expires_at = jobs.RUNNING, 1, expires
+        db.commit()
+        db.close()
+
+        pool = jobs.JobWorkerPool(workers=1, handler=fake_handler, session_factory=Session)
+        pool.start()
+        try:
+            recovered = wait_for(Session, lost)
+        finally:
+            pool.stop()
+        db = Session()
+        still_running = jobs.get_job(db, live).status
+        db.close()
+    assert recovered["status"] == jobs.DONE and recovered["attempts"] == 2
+    assert still_running == jobs.RUNNING
+
+
+def test_each_job_runs_once_with_many_workers():
+    seen = []
+    lock = threading.Lock()
+
+    def record(db, job):
+        with lock:
+            seen.append(job.id)
+        time.sleep(0.01)
+        return {"id": None}
+
+    with tempfile.TemporaryDirectory() as directory:
+        Session = temp_sessions(directory)
+        job_ids = [enqueue(Session, f"url-{i}") for i in range(20)]
+        pool = jobs.JobWorkerPool(workers=4, handler=record, session_factory=Session)
+        pool.start()
+        try:
+            for job_id in job_ids:
+                wait_for(Session, job_id)
+        finally:
+            pool.stop()
+    assert sorted(seen) == sorted(job_ids)
+
+
+def test_lease_is_renewed_while_the_job_runs():
+    calls = []
+
+    def slow(db, job):
+        calls.append(job.id)
+        time.sleep(0.5)
+        return {"id": 1}
+
+    saved = jobs.JOB_LEASE_SECONDS, jobs.JOB_HEARTBEAT_SECONDS, jobs.JOB_POLL_INTERVAL
+    # The idle worker looks at the queue every 20 ms, well within the run
+    jobs.JOB_LEASE_SECONDS, jobs.JOB_HEARTBEAT_SECONDS, jobs.JOB_POLL_INTERVAL = 0.2, 0.05, 0.02
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            Session = temp_sessions(directory)
+            job_id = enqueue(Session, "slow")
+            pool = jobs.JobWorkerPool(workers=2, handler=slow, session_factory=Session)
+            pool.start()
+            try:
+                job = wait_for(Session, job_id)
+            finally:
+                pool.stop()
+    finally:
+        jobs.JOB_LEASE_SECONDS, jobs.JOB_HEARTBEAT_SECONDS, jobs.JOB_POLL_INTERVAL = saved
+    assert calls == [job_id]
+    assert job["status"] == jobs.DONE and job["attempts"] == 1
+
+
+def test_a_worker_that_lost_its_lease_cannot_finish_the_job():
+    def outlived(db, job):
+        # The lease runs out mid-run and another worker claims the job
+        other = Session()
+        try:
+            stale = jobs.get_job(other, job.id)
+            stale.lease_expires_at = time.time() - 1
+            other.commit()
+            jobs.requeue_expired(other)
+            assert jobs.claim_next(other).attempts == 2
+        finally:
+            other.close()
+        return {"id": 1}
+
+    with tempfile.TemporaryDirectory() as directory:
+        Session = temp_sessions(directory)
+        job_id = enqueue(Session, "outlived")
+        jobs.JobWorkerPool(workers=1, handler=outlived, session_factory=Session).run_once()
+        db = Session()
+        job = jobs.job_to_dict(jobs.get_job(db, job_id))
+        db.close()
+    assert job["status"] == jobs.RUNNING and job["attempts"] == 2
+    assert job["result"] is None and job["finished_at"] is None
+
+
+def test_stale_requeue_does_not_undo_a_new_claim():
+    with tempfile.TemporaryDirectory() as directory:
+        Session = temp_sessions(directory)
+        job_id = enqueue(Session, "contended")
+        db = Session()
+        job = jobs.claim_next(db)
+        job.lease_expires_at = time.time() - 1
+        db.commit()
+        # Worker A requeues the expired attempt and worker B claims it again;
+        # worker C read the expired attempt 1 before either of them
+        stale_read = time.time()
+        assert jobs.requeue_expired(db) == 1
+        assert jobs.claim_next(db).attempts == 2
+        applied = jobs.requeue_job(db, job_id, 1, stale_read)
+        job = jobs.job_to_dict(jobs.get_job(db, job_id))
+        db.close()
+    assert applied is False
+    assert job["status"] == jobs.RUNNING and job["attempts"] == 2
+
+
+def test_full_queue_is_refused():
+    original = jobs.JOB_MAX_QUEUED
+    jobs.JOB_MAX_QUEUED = 2
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            Session = temp_sessions(directory)
+            enqueue(Session, "a")
+            enqueue(Session, "b")
+            try:
+                enqueue(Session, "c")
+            except ValueError as e:
+                assert "full" in str(e)
+            else:
+                raise AssertionError("expected ValueError")
+    finally:
+        jobs.JOB_MAX_QUEUED = original
+
+
+if __name__ == "__main__":
+    test_enqueue_returns_before_work_and_worker_completes_job()
+    test_transient_errors_retry_and_value_errors_fail()
+    test_attempts_are_capped()
+    test_jobs_survive_a_restart()
+    test_each_job_runs_once_with_many_workers()
+    test_lease_is_renewed_while_the_job_runs()
+    test_a_worker_that_lost_its_lease_cannot_finish_the_job()
+    test_stale_requeue_does_not_undo_a_new_claim()
+    test_full_queue_is_refused()
+    print("Job queue tests passed!")
@@ -0,0 +1,143 @@
+import os
+import sys
+import json
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import llm
+import llm_cache
+import llm_batch
+from disk_cache import DiskCache
+from fake_llm_server import load_response_text
+
+SAMPLE = json.loads(load_response_text())
+
+
+def article(title):
+    return {
+        "title": title,
+        "summary": f"{title} is a topic.",
+        "sections": ["History"],
+        "key_entities": {"people": [], "organizations": [], "locations": []},
+        "full_text": f"{title} is a topic.\n\n## History\n{title} has a long history.",
+    }
+
+
+def quiz_for(title):
+    return {"quiz": [dict(q, question=f"{title}: {q['question']}") for q in SAMPLE["quiz"]],
+            "related_topics": [title]}
+
+
+def test_plan_batches_respects_budget_and_size():
+    articles = [(f"k{i}", "x" * 400) for i in range(7)]  # ~100 tokens each
+    overhead = llm_batch.context_packer.estimate_tokens(llm_batch.BATCH_PROMPT_TEMPLATE)
+    batches = llm_batch.plan_batches(articles, max_articles=3, budget=overhead + 250)
+    assert [len(b) for b in batches] == [2, 2, 2, 1]
+    assert [k for b in batches for k, _ in b] == [k for k, _ in articles]
+    assert [len(b) for b in llm_batch.plan_batches(articles, max_articles=3, budget=10 ** 6)] == [3, 3, 1]
+    # An article bigger than the budget still gets a batch of its own
+    assert llm_batch.plan_batches([("big", "x" * 10 ** 5)], budget=100) == [[("big", "x" * 10 ** 5)]]
+
+
+def test_split_batch_output_keeps_good_entries():
+    keys = ["article_1", "article_2", "article_3"]
+    text = json.dumps({"article_1": quiz_for("A"), "article_2": {"quiz": []}, "article_3": quiz_for("C")})
+    parsed = llm_batch.split_batch_output("```json\n" + text + "\n```", keys)
+    assert set(parsed) == {"article_1", "article_3"}
+    assert parsed["article_3"] == quiz_for("C")
+
+    # Cut off inside the last entry: the earlier ones survive
+    truncated = text[:text.index('"article_3"') + 40]
+    assert set(llm_batch.split_batch_output(truncated, keys)) == {"article_1"}
+
+
+def with_fake_llm(fn, respond):
+    calls = []
+
+    def fake_call_llm(prompt_text, validate=None, backends=None):
+        calls.append(prompt_text)
+        text = respond(prompt_text)
+        if validate:
+            validate(text)
+        return text, "stub"
+
+    original_call, original_cache, original_providers = llm.call_llm, llm_cache._cache, llm.LLM_PROVIDERS
+    with tempfile.TemporaryDirectory() as directory:
+        llm.call_llm = fake_call_llm
+        llm.LLM_PROVIDERS = ["stub"]
+        llm_cache._cache = DiskCache(directory)
+        try:
+            return fn(calls)
+        finally:
+            llm.call_llm, llm_cache._cache, llm.LLM_PROVIDERS = original_call, original_cache, original_providers
+
+
+def respond_skipping(missing_title):
+    """Batch answers leave out missing_title; single prompts get their quiz."""
+    def respond(prompt_text):
+        if "=== Article key:" not in prompt_text:
+            title = prompt_text.split("Article Title: ")[1].split("\n")[0]
+            return json.dumps(quiz_for(title))
+        entries = {}
+        for block in prompt_text.split("=== Article key: ")[1:]:
+            key = block.split(" ===")[0]
+            title = block.split("Article Title: ")[1].split("\n")[0]
+            if title != missing_title:
+                entries[key] = quiz_for(title)
+        return json.dumps(entries)
+    return respond
+
+
+def test_batch_uses_one_request_and_retries_only_failed_articles():
+    titles = ["Alpha", "Beta", "Gamma"]
+
+    def run(calls):
+        results = llm.generate_quiz_batch([article(t) for t in titles])
+        return results, list(calls)
+
+    results, calls = with_fake_llm(run, respond_skipping("Beta"))
+    assert len(calls) == 2
+    assert "=== Article key:" in calls[0] and calls[0].count("You are an expert quiz generator") == 1
+    assert "=== Article key:" not in calls[1] and "Article Title: Beta" in calls[1]
+    assert [r["title"] for r in results] == titles
+    assert [r["quiz"] for r in results] == [quiz_for(t)["quiz"] for t in titles]
+
+
+def test_batch_results_are_cached_per_article():
+    titles = ["Alpha", "Beta"]
+
+    def run(calls):
+        llm.generate_quiz_batch([article(t) for t in titles])
+        first = len(calls)
+        # A later single-article request is served from the cache
+        single = llm.generate_quiz_data(article("Alpha"))
+        again = llm.generate_quiz_batch([article(t) for t in titles])
+        return first, len(calls), single, again
+
+    first, total, single, again = with_fake_llm(run, respond_skipping(None))
+    assert first == 1 and total == 1
+    assert single["quiz"] == quiz_for("Alpha")["quiz"]
+    assert [r["title"] for r in again] == titles
+
+
+def test_failed_article_reports_error():
+    def respond(prompt_text):
+        if "=== Article key:" in prompt_text:
+            return "not json"
+        if "Article Title: Beta" in prompt_text:
+            raise Exception("API Error 503")
+        return json.dumps(quiz_for("Alpha"))
+
+    results = with_fake_llm(lambda calls: llm.generate_quiz_batch([article("Alpha"), article("Beta")]), respond)
+    assert results[0]["quiz"] == quiz_for("Alpha")["quiz"]
+    assert results[1]["title"] == "Beta" and "503" in results[1]["error"]
+
+
+if __name__ == "__main__":
+    test_plan_batches_respects_budget_and_size()
+    test_split_batch_output_keeps_good_entries()
+    test_batch_uses_one_request_and_retries_only_failed_articles()
+    test_batch_results_are_cached_per_article()
+    test_failed_article_reports_error()
+    print("Batch generation tests passed!")
@@ -0,0 +1,125 @@
+import os
+import sys
+import json
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import llm
+import llm_cache
+from disk_cache import DiskCache
+
+SCRAPED = {
+    "title": "Alan Turing",
+    "summary": "Alan Mathison Turing was an English mathematician.",
+    "sections": ["Early life", "Career"],
+    "key_entities": {"people": ["Alan Turing"], "organizations": [], "locations": []},
+    "full_text": "Alan Mathison Turing was an English mathematician and computer scientist.",
+}
+
+RESPONSE = json.dumps({
+    "quiz": [{
+        "question": "What was Turing's nationality?",
+        "options": ["English", "French", "German", "American"],
+        "answer": "English",
+        "difficulty": "easy",
+        "explanation": "The article says he was English.",
+    }],
+    "related_topics": ["Computability"],
+})
+
+
+def with_isolated_cache(fn, ttl=None):
+    """Run fn against an empty on-disk cache and a counting fake Gemini call."""
+    calls = []
+
+    def fake_call_llm(prompt_text, validate=None, backends=None):
+        calls.append(prompt_text)
+        return RESPONSE, "gemini-1.5-flash"
+
+    original_cache, original_call = llm_cache._cache, llm.call_llm
+    original_key = os.environ.get("GOOGLE_API_KEY")
+    with tempfile.TemporaryDirectory() as directory:
+        llm_cache._cache = DiskCache(directory, ttl=ttl if ttl is not None else llm_cache.LLM_CACHE_TTL)
+        llm.call_llm = fake_call_llm
+        os.environ["GOOGLE_API_KEY"] = "test-key"
+        llm_cache.reset_stats()
+        try:
+            return fn(calls)
+        finally:
+            llm_cache._cache, llm.call_llm = original_cache, original_call
+            if original_key is None:
+                os.environ.pop("GOOGLE_API_KEY", None)
+            else:
+                os.environ["GOOGLE_API_KEY"] = original_key
+
+
+def test_key_covers_prompt_model_and_config():
+    base = llm_cache.cache_key("prompt", "gemini-1.5-flash", {"temperature": 0.7})
+    assert base == llm_cache.cache_key("prompt", "gemini-1.5-flash", {"temperature": 0.7})
+    assert base != llm_cache.cache_key("prompt!", "gemini-1.5-flash", {"temperature": 0.7})
+    assert base != llm_cache.cache_key("prompt", "gemini-1.5-pro", {"temperature": 0.7})
+    assert base != llm_cache.cache_key("prompt", "gemini-1.5-flash", {"temperature": 0.2})
+
+
+def test_repeat_prompt_is_served_from_cache():
+    def run(calls):
+        first = llm.generate_quiz_data(SCRAPED)
+        second = llm.generate_quiz_data(SCRAPED)
+        return first, second, len(calls), llm_cache.stats()
+
+    first, second, call_count, stats = with_isolated_cache(run)
+    assert first == second
+    assert first["quiz"][0]["answer"] == "English"
+    assert first["model"] == "gemini-1.5-flash"
+    assert call_count == 1
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["stores"] == 1
+
+
+def test_fresh_request_bypasses_cache():
+    def run(calls):
+        llm.generate_quiz_data(SCRAPED)
+        llm.generate_quiz_data(SCRAPED, use_cache=False)
+        llm.generate_quiz_data(SCRAPED)
+        return len(calls), llm_cache.stats()
+
+    call_count, stats = with_isolated_cache(run)
+    assert call_count == 2
+    # The bypassing call neither counts as a lookup nor blocks the refresh
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["stores"] == 2
+
+
+def test_expired_entries_are_regenerated():
+    def run(calls):
+        llm.generate_quiz_data(SCRAPED)
+        llm.generate_quiz_data(SCRAPED)
+        return len(calls)
+
+    assert with_isolated_cache(run, ttl=-1) == 2
+
+
+def test_unparseable_responses_are_not_cached():
+    def run(calls):
+        def broken_call_llm(prompt_text, validate=None, backends=None):
+            calls.append(prompt_text)
+            return "not json at all", "gemini-1.5-flash"
+        llm.call_llm = broken_call_llm
+        for _ in range(2):
+            try:
+                llm.generate_quiz_data(SCRAPED)
+            except ValueError:
+                pass
+        return len(calls), llm_cache.stats()
+
+    call_count, stats = with_isolated_cache(run)
+    assert call_count == 2
+    assert stats["stores"] == 0
+
+
+if __name__ == "__main__":
+    test_key_covers_prompt_model_and_config()
+    test_repeat_prompt_is_served_from_cache()
+    test_fresh_request_bypasses_cache()
+    test_expired_entries_are_regenerated()
+    test_unparseable_responses_are_not_cached()
+    print("LLM cache tests passed!")
@@ -0,0 +1,154 @@
+import os
+import sys
+import json
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import llm
+import llm_router
+import circuit_breaker
+from llm_router import Backend, LLMRouter
+from fake_llm_server import FakeLLMHandler, start_server, load_response_text
+
+EXPECTED = json.loads(load_response_text())
+
+
+def backends(*names):
+    return [Backend(name, "test", name, generate=lambda prompt: "") for name in names]
+
+
+def test_unknown_backends_keep_configured_order():
+    router = LLMRouter()
+    assert [b.name for b in router.rank(backends("a", "b", "c"))] == ["a", "b", "c"]
+
+
+def test_faster_backend_moves_ahead():
+    router = LLMRouter()
+    for _ in range(5):
+        router.record("a", 2.0, ok=True)
+        router.record("b", 0.5, ok=True)
+    assert [b.name for b in router.rank(backends("a", "b"))] == ["b", "a"]
+
+
+def test_failing_backend_drops_behind_healthy_ones():
+    router = LLMRouter()
+    router.record("slow", 3.0, ok=True)
+    for _ in range(4):
+        router.record("fast", 0.2, ok=False)
+    assert [b.name for b in router.rank(backends("fast", "slow"))] == ["slow", "fast"]
+    row = {r["name"]: r for r in router.snapshot(backends("fast", "slow"))}["fast"]
+    assert row["healthy"] is False and row["failures"] == 4
+
+
+def test_error_rate_decays_while_idle():
+    router = LLMRouter()
+    for _ in range(4):
+        router.record("a", 0.2, ok=False)
+    router.record("b", 3.0, ok=True)
+    assert router.rank(backends("a", "b"))[0].name == "b"
+
+    # Pretend the failures happened ten half-lives ago
+    router._stats["a"].updated_at -= 10 * llm_router.ERROR_HALF_LIFE
+    assert router.rank(backends("a", "b"))[0].name == "a"
+
+
+def test_call_llm_shifts_traffic_away_from_failing_backend():
+    calls = []
+
+    def make(name, fails):
+        def generate(prompt):
+            calls.append(name)
+            time.sleep(0.01)
+            if fails:
+                raise Exception("503 overloaded")
+            return "ok"
+        return Backend(name, "test", name, generate=generate)
+
+    candidates = [make("flaky", True), make("steady", False)]
+    original_hedge = llm.LLM_HEDGE_ENABLED
+    llm.LLM_HEDGE_ENABLED = False
+    llm_router.get_router().reset()
+    try:
+        for _ in range(4):
+            assert llm.call_llm("prompt", backends=candidates) == ("ok", "steady")
+    finally:
+        llm.LLM_HEDGE_ENABLED = original_hedge
+        llm_router.get_router().reset()
+
+    # The first call tries the flaky backend first; later ones go straight to steady
+    assert calls[:2] == ["flaky", "steady"]
+    assert calls[2:] == ["steady"] * 3
+
+
+def with_providers(fn, providers, failing_models=()):
+    server, api_base = start_server(chunk_delay=0)
+    FakeLLMHandler.failing_models = set(failing_models)
+    FakeLLMHandler.request_log = []
+    saved = (llm.LLM_PROVIDERS, llm.GEMINI_API_BASE, llm.OPENROUTER_API_BASE, llm.LLM_HEDGE_ENABLED)
+    saved_env = {k: os.environ.get(k) for k in ("GOOGLE_API_KEY", "OPENROUTER_API_KEY")}
+    llm.LLM_PROVIDERS = providers
+    llm.GEMINI_API_BASE = api_base
+    llm.OPENROUTER_API_BASE = api_base.replace("/v1beta", "/api/v1")
+    llm.LLM_HEDGE_ENABLED = False
+    os.environ["GOOGLE_API_KEY"] = "fake-key"
+    os.environ["OPENROUTER_API_KEY"] = "fake-key"
+    llm_router.get_router().reset()
+    circuit_breaker.reset()
+    try:
+        return fn()
+    finally:
+        server.shutdown()
+        FakeLLMHandler.failing_models = set()
+        llm.LLM_PROVIDERS, llm.GEMINI_API_BASE, llm.OPENROUTER_API_BASE, llm.LLM_HEDGE_ENABLED = saved
+        for key, value in saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        llm_router.get_router().reset()
+        circuit_breaker.reset()
+
+
+def test_falls_back_from_gemini_to_openrouter():
+    def run():
+        text, name = llm.call_llm("prompt")
+        return json.loads(text), name
+
+    quiz_data, name = with_providers(run, ["gemini", "openrouter"], failing_models=llm.GEMINI_MODELS)
+    assert name == f"openrouter/{llm.OPENROUTER_MODELS[0]}"
+    assert quiz_data == EXPECTED
+    assert FakeLLMHandler.request_log[-1] == (llm.OPENROUTER_MODELS[0], "chat.completions")
+
+
+def test_openrouter_stream():
+    def run():
+        backend = llm.configured_backends()[0]
+        return "".join(backend.stream("prompt"))
+
+    text = with_providers(run, ["openrouter"])
+    assert json.loads(text) == EXPECTED
+
+
+def test_stub_backend_needs_no_key():
+    saved = llm.LLM_PROVIDERS
+    llm.LLM_PROVIDERS = ["stub"]
+    try:
+        text, name = llm.call_llm("prompt")
+    finally:
+        llm.LLM_PROVIDERS = saved
+        llm_router.get_router().reset()
+    assert name == "stub"
+    assert json.loads(text)["quiz"]
+
+
+if __name__ == "__main__":
+    test_unknown_backends_keep_configured_order()
+    test_faster_backend_moves_ahead()
+    test_failing_backend_drops_behind_healthy_ones()
+    test_error_rate_decays_while_idle()
+    test_call_llm_shifts_traffic_away_from_failing_backend()
+    test_falls_back_from_gemini_to_openrouter()
+    test_openrouter_stream()
+    test_stub_backend_needs_no_key()
+    print("LLM router tests passed!")
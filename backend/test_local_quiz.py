@@ -0,0 +1,150 @@
+import os
+import sys
+import json
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import llm
+import local_quiz
+from scraper import parse_article_html
+
+PAGE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'sample_data', 'pages', 'alan_turing_modern.html')
+
+
+def scraped_article():
+    with open(PAGE_PATH, 'r', encoding='utf-8') as f:
+        return parse_article_html(f.read())
+
+
+def test_questions_follow_quiz_schema():
+    quiz_data = local_quiz.generate_local_quiz(scraped_article())
+    assert len(quiz_data["quiz"]) == local_quiz.QUESTION_COUNT
+    for question in quiz_data["quiz"]:
+        assert len(question["options"]) == 4 == len(set(question["options"]))
+        assert question["answer"] in question["options"]
+        assert question["difficulty"] in ("easy", "medium", "hard")
+        assert local_quiz.BLANK in question["question"]
+        assert question["answer"] not in question["question"]
+        assert question["answer"] in question["explanation"]
+    answers = [q["answer"] for q in quiz_data["quiz"]]
+    assert len(set(answers)) == len(answers)
+    assert quiz_data["related_topics"] and not set(quiz_data["related_topics"]) & set(answers)
+
+
+def test_same_article_gives_same_quiz():
+    data = scraped_article()
+    assert local_quiz.generate_local_quiz(data) == local_quiz.generate_local_quiz(data)
+    assert local_quiz.generate_local_quiz(data, seed=1) == local_quiz.generate_local_quiz(data, seed=1)
+
+
+def test_year_questions_use_article_years():
+    data = {
+        "title": "Example",
+        "summary": "",
+        "sections": [],
+        "key_entities": {},
+        "full_text": "The bridge over the river was opened to traffic in 1932. "
+                     "It was widened by the city engineers in 1958. "
+                     "The old tolls were abolished after a long campaign in 1971.",
+    }
+    quiz_data = local_quiz.generate_local_quiz(data)
+    assert [q["answer"] for q in quiz_data["quiz"]] == ["1932", "1958", "1971"]
+    assert {"1958", "1971"} <= set(quiz_data["quiz"][0]["options"])
+
+
+def test_unreliable_entities_are_not_typed_or_used():
+    data = {
+        "title": "Alan Turing",
+        "summary": "",
+        "sections": [],
+        "key_entities": {
+            "people": ["Maida Vale", "At Bletchley", "Max Newman", "Joan Clarke", "Robin Gandy"],
+            "organizations": ["Princeton University"],
+            "locations": ["Park, Turing", "London, England"],
+        },
+        "full_text": "Turing was born in Maida Vale, a district of west London, in the summer of 1912. "
+                     "At Bletchley he worked on breaking the naval codes with his colleagues.",
+    }
+    quiz_data = local_quiz.generate_local_quiz(data)
+    questions = [q for q in quiz_data["quiz"] if q["answer"] == "Maida Vale"]
+    assert questions and questions[0]["question"].startswith("Which name completes")
+    options = {option for q in quiz_data["quiz"] for option in q["options"]}
+    for bad in ("At Bletchley", "Park, Turing", "London, England"):
+        assert bad not in options and bad not in quiz_data["related_topics"]
+    assert "person" not in json.dumps(quiz_data)
+
+
+def test_generation_is_fast():
+    data = scraped_article()
+    start = time.perf_counter()
+    for _ in range(20):
+        local_quiz.generate_local_quiz(data)
+    assert (time.perf_counter() - start) / 20 < 0.05
+
+
+def with_settings(fn, providers, fallback=True):
+    original = llm.LLM_PROVIDERS, llm.LOCAL_QUIZ_FALLBACK
+    llm.LLM_PROVIDERS, llm.LOCAL_QUIZ_FALLBACK = providers, fallback
+    try:
+        return fn()
+    finally:
+        llm.LLM_PROVIDERS, llm.LOCAL_QUIZ_FALLBACK = original
+
+
+def test_no_backend_falls_back_to_local_quiz():
+    data = scraped_article()
+    result = with_settings(lambda: llm.generate_quiz_data(data), providers=[])
+    assert result["fallback"] is True
+    assert result["model"] == local_quiz.MODEL_NAME
+    assert result["title"] == data["title"] and result["quiz"]
+
+    events = with_settings(lambda: list(llm.stream_quiz_data(data)), providers=[])
+    assert [kind for kind, _ in events] == ["question"] * len(result["quiz"]) + ["done"]
+    assert events[-1][1] == result
+
+    try:
+        with_settings(lambda: llm.generate_quiz_data(data), providers=[], fallback=False)
+    except ValueError as e:
+        assert "No API key" in str(e)
+    else:
+        raise AssertionError("expected ValueError without fallback")
+
+
+def test_batch_without_backend_falls_back_per_article():
+    data = scraped_article()
+    empty = {"title": "Empty", "summary": "", "sections": [], "key_entities": {}, "full_text": ""}
+    results = with_settings(lambda: llm.generate_quiz_batch([data, empty]), providers=[])
+    assert results[0]["fallback"] is True and results[0]["model"] == local_quiz.MODEL_NAME
+    assert results[0]["quiz"] == local_quiz.generate_local_quiz(data)["quiz"]
+    # Nothing to build a quiz from: an error entry, not a failed batch
+    assert results[1]["title"] == "Empty" and "No API key" in results[1]["error"]
+
+    results = with_settings(lambda: llm.generate_quiz_batch([data]), providers=[], fallback=False)
+    assert "No API key" in results[0]["error"]
+
+
+def test_failed_backends_fall_back_to_local_quiz():
+    def failing_call_llm(prompt_text, validate=None, backends=None):
+        raise Exception("All LLM backends failed. Last error: API Error 503")
+
+    original_call, original_lookup = llm.call_llm, llm.llm_cache.lookup
+    llm.call_llm = failing_call_llm
+    llm.llm_cache.lookup = lambda *args: None
+    try:
+        result = with_settings(lambda: llm.generate_quiz_data(scraped_article()), providers=["stub"])
+    finally:
+        llm.call_llm, llm.llm_cache.lookup = original_call, original_lookup
+    assert result["fallback"] is True and result["model"] == local_quiz.MODEL_NAME
+
+
+if __name__ == "__main__":
+    test_questions_follow_quiz_schema()
+    test_same_article_gives_same_quiz()
+    test_year_questions_use_article_years()
+    test_unreliable_entities_are_not_typed_or_used()
+    test_generation_is_fast()
+    test_no_backend_falls_back_to_local_quiz()
+    test_batch_without_backend_falls_back_per_article()
+    test_failed_backends_fall_back_to_local_quiz()
+    print("Local quiz tests passed!")
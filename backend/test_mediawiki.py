@@ -0,0 +1,78 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import mediawiki
+import scrape_cache
+import scraper
+from fake_mediawiki_server import start_server, FakeMediaWikiHandler
+
+
+def with_fake_api(fn):
+    server, api_url = start_server()
+    original_url = mediawiki.MEDIAWIKI_API_URL
+    original_cache = scrape_cache.SCRAPE_CACHE_ENABLED
+    mediawiki.MEDIAWIKI_API_URL = api_url
+    scrape_cache.SCRAPE_CACHE_ENABLED = False
+    FakeMediaWikiHandler.request_log = []
+    try:
+        return fn()
+    finally:
+        mediawiki.MEDIAWIKI_API_URL = original_url
+        scrape_cache.SCRAPE_CACHE_ENABLED = original_cache
+        server.shutdown()
+
+
+def test_fields_from_extract_layout():
+    fields = mediawiki.fields_from_extract(
+        "Example",
+        "First paragraph.\nSecond paragraph.\n\n\n== One ==\nBody one.\n\n\n=== Sub ===\nBody sub.\n\n\n"
+        "== Two ==\nBody two.\n\n\n== Three ==\n\n\n== Four ==\nHidden."
+    )
+    assert fields["summary"] == "First paragraph."
+    assert fields["sections"] == ["One", "Sub", "Two", "Three", "Four"]
+    assert fields["full_text"] == (
+        "First paragraph.\n\nSecond paragraph.\n\n"
+        "\n## One\nBody one.\nSub\nBody sub.\n\n## Two\nBody two.\n\n## Three\n"
+    )
+
+
+def test_api_mode_scrape():
+    result = with_fake_api(lambda: scraper.scrape_wikipedia(
+        "https://en.wikipedia.org/wiki/Alan_Turing", mode="api"))
+    assert result["title"] == "Alan Turing"
+    assert result["summary"].startswith("Alan Mathison Turing")
+    assert "## Personal life" in result["full_text"]
+    assert "Legacy" in result["sections"] and "## Legacy" not in result["full_text"]
+    assert set(result["key_entities"]) == {"people", "organizations", "locations"}
+
+
+def test_api_mode_missing_page():
+    def run():
+        try:
+            scraper.scrape_wikipedia("https://en.wikipedia.org/wiki/No_Such_Page", mode="api")
+        except ValueError as e:
+            return str(e)
+    assert with_fake_api(run).startswith("Wikipedia page not found")
+
+
+def test_full_extracts_one_title_per_request():
+    def run():
+        urls = [
+            "https://en.wikipedia.org/wiki/Alan_Turing",
+            "https://en.wikipedia.org/wiki/Python_(programming_language)",
+        ]
+        return mediawiki.fetch_article_fields(urls), FakeMediaWikiHandler.request_log
+
+    fields, log = with_fake_api(run)
+    assert sorted(len(titles) for titles in log) == [1, 1]
+    assert fields["https://en.wikipedia.org/wiki/Python_(programming_language)"]["sections"][0] == "History"
+
+
+if __name__ == "__main__":
+    test_fields_from_extract_layout()
+    test_api_mode_scrape()
+    test_api_mode_missing_page()
+    test_full_extracts_one_title_per_request()
+    print("MediaWiki API mode tests passed!")
@@ -0,0 +1,148 @@
+import os
+import sys
+import json
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import llm
+import llm_cache
+import metrics
+from metrics import Histogram, Registry
+from disk_cache import DiskCache
+from fake_llm_server import FakeLLMHandler, start_server, load_response_text
+
+SCRAPED = {
+    "title": "Alan Turing",
+    "summary": "Alan Mathison Turing was an English mathematician.",
+    "sections": ["Early life"],
+    "key_entities": {"people": ["Alan Turing"], "organizations": [], "locations": []},
+    "full_text": "Alan Mathison Turing was an English mathematician and computer scientist.",
+}
+
+
+def test_histogram_quantiles():
+    histogram = Histogram(range(10, 101, 10))
+    for value in range(1, 101):
+        histogram.observe(value)
+    summary = histogram.summary()
+    assert summary["count"] == 100 and summary["sum"] == 5050 and summary["mean"] == 50.5
+    assert abs(summary["p50"] - 50) <= 1 and abs(summary["p95"] - 95) <= 1
+    assert summary["buckets"]["10"] == 10 and summary["buckets"]["+Inf"] == 100
+    assert Histogram([1]).quantile(0.5) is None
+
+
+def test_registry_keeps_series_per_label_set():
+    registry = Registry()
+    registry.increment("calls_total", backend="a", outcome="ok")
+    registry.increment("calls_total", backend="a", outcome="ok")
+    registry.increment("calls_total", backend="b", outcome="error")
+    registry.observe("call_seconds", 0.3, backend="a")
+    summary = registry.summary()
+    assert summary["counters"]["calls_total"] == {"backend=a,outcome=ok": 2, "backend=b,outcome=error": 1}
+    assert summary["histograms"]["call_seconds"]["backend=a"]["count"] == 1
+    registry.reset()
+    assert registry.summary()["counters"] == {}
+
+
+def with_fake_gemini(fn, failing_models=()):
+    server, api_base = start_server(chunk_delay=0)
+    FakeLLMHandler.failing_models = set(failing_models)
+    saved = (llm.GEMINI_API_BASE, llm.LLM_PROVIDERS, llm.LLM_HEDGE_ENABLED, llm_cache._cache)
+    original_key = os.environ.get("GOOGLE_API_KEY")
+    with tempfile.TemporaryDirectory() as directory:
+        llm.GEMINI_API_BASE, llm.LLM_PROVIDERS, llm.LLM_HEDGE_ENABLED = api_base, ["gemini"], False
+        llm_cache._cache = DiskCache(directory)
+        os.environ["GOOGLE_API_KEY"] = "test-key"
+        llm.llm_router.get_router().reset()
+        llm.circuit_breaker.reset()
+        metrics.reset()
+        try:
+            return fn()
+        finally:
+            server.shutdown()
+            FakeLLMHandler.failing_models = set()
+            llm.GEMINI_API_BASE, llm.LLM_PROVIDERS, llm.LLM_HEDGE_ENABLED, llm_cache._cache = saved
+            if original_key is None:
+                os.environ.pop("GOOGLE_API_KEY", None)
+            else:
+                os.environ["GOOGLE_API_KEY"] = original_key
+            llm.llm_router.get_router().reset()
+            llm.circuit_breaker.reset()
+
+
+def test_each_attempt_is_recorded_with_reported_usage():
+    def run():
+        llm.call_llm("prompt " * 50)
+        return metrics.summary()
+
+    summary = with_fake_gemini(run, failing_models=[llm.GEMINI_MODELS[0]])
+    first, second = llm.GEMINI_MODELS[:2]
+    assert summary["counters"]["llm_calls_total"] == {
+        f"backend={first},outcome=error": 1,
+        f"backend={second},outcome=ok": 1,
+    }
+    assert summary["counters"]["llm_retries_total"] == {"": 1}
+    assert summary["histograms"]["llm_request_attempts"][""]["max"] == 2
+
+    failed, answered = summary["recent_calls"]
+    assert failed["outcome"] == "error" and failed["response_tokens"] is None
+    assert answered["outcome"] == "ok" and answered["tokens_estimated"] is False
+    # The fake API reports 4 characters per token of the raw response
+    assert answered["response_tokens"] == len(load_response_text()) // 4
+    assert answered["prompt_chars"] == len("prompt " * 50)
+    assert summary["counters"]["llm_response_tokens_total"] == {f"backend={second}": answered["response_tokens"]}
+
+
+def test_generation_metrics_by_source():
+    def run():
+        llm.generate_quiz_data(SCRAPED)
+        llm.generate_quiz_data(SCRAPED)
+        return metrics.summary()
+
+    summary = with_fake_gemini(run)
+    assert summary["counters"]["quiz_generations_total"] == {
+        "result=complete,source=llm": 1,
+        "result=complete,source=cache": 1,
+    }
+    questions = summary["histograms"]["quiz_questions"]["source=llm"]
+    assert questions["max"] == len(json.loads(load_response_text())["quiz"])
+    assert summary["histograms"]["quiz_generation_seconds"]["source=llm"]["count"] == 1
+
+
+def test_streamed_call_records_usage_and_first_question():
+    def run():
+        list(llm.stream_quiz_data(SCRAPED, use_cache=False))
+        return metrics.summary()
+
+    summary = with_fake_gemini(run)
+    [call] = summary["recent_calls"]
+    assert call["streamed"] is True and call["outcome"] == "ok"
+    assert call["response_tokens"] == len(load_response_text()) // 4
+    backend = llm.GEMINI_MODELS[0]
+    assert summary["histograms"]["quiz_first_question_seconds"][f"backend={backend}"]["count"] == 1
+
+
+def test_streamed_generation_time_covers_every_attempt():
+    def run():
+        list(llm.stream_quiz_data(SCRAPED, use_cache=False))
+        return metrics.summary()
+
+    summary = with_fake_gemini(run, failing_models=[llm.GEMINI_MODELS[0]])
+    failed, answered = summary["recent_calls"]
+    assert failed["outcome"] == "error" and answered["outcome"] == "ok"
+    generation = summary["histograms"]["quiz_generation_seconds"]["source=llm"]
+    assert generation["count"] == 1
+    assert generation["sum"] >= failed["seconds"] + answered["seconds"]
+    first_question = summary["histograms"]["quiz_first_question_seconds"][f"backend={llm.GEMINI_MODELS[1]}"]
+    assert first_question["sum"] >= failed["seconds"]
+
+
+if __name__ == "__main__":
+    test_histogram_quantiles()
+    test_registry_keeps_series_per_label_set()
+    test_each_attempt_is_recorded_with_reported_usage()
+    test_generation_metrics_by_source()
+    test_streamed_call_records_usage_and_first_question()
+    test_streamed_generation_time_covers_every_attempt()
+    print("Metrics tests passed!")
@@ -0,0 +1,98 @@
+import os
+import sys
+import glob
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import article_parser
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'sample_data', 'pages')
+
+
+def load_corpus():
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(PAGES_DIR, '*.html'))):
+        with open(path, 'rb') as f:
+            pages[os.path.basename(path)] = f.read()
+    return pages
+
+
+def test_corpus_present():
+    assert len(load_corpus()) >= 4
+
+
+def test_lxml_matches_beautifulsoup():
+    if not article_parser.LXML_AVAILABLE:
+        print("lxml not installed, skipping parity check")
+        return
+
+    for name, content in load_corpus().items():
+        expected = article_parser.extract_article(content, engine="bs4")
+        for source in (content, content.decode("utf-8")):
+            actual = article_parser.extract_article(source, engine="lxml")
+            for field in ("title", "summary", "sections", "full_text"):
+                assert actual[field] == expected[field], f"{name}: '{field}' differs between engines"
+
+
+def test_expected_fields():
+    pages = load_corpus()
+    for engine in ("bs4", "lxml") if article_parser.LXML_AVAILABLE else ("bs4",):
+        turing = article_parser.extract_article(pages["alan_turing_modern.html"], engine=engine)
+        assert turing["title"] == "Alan Turing"
+        assert turing["summary"].startswith("Alan Mathison TuringOBEFRS")
+        assert "## Personal life" in turing["full_text"]
+        assert "Legacy" not in turing["full_text"]
+        assert "wgBackendResponseTime" not in turing["full_text"]
+
+        python = article_parser.extract_article(pages["python_legacy.html"], engine=engine)
+        # Only h2/h3 elements that carry the mw-headline class themselves count
+        assert python["sections"] == ["Python 2", "Design philosophy and features"]
+
+        fallback = article_parser.extract_article(pages["no_article_layout.html"], engine=engine)
+        assert "Zeta function" in fallback["full_text"]
+
+
+# Malformed markup the engines repair differently: body -> bs4 summary
+MALFORMED = {
+    "<p>first<p>second</p>": "firstsecondSafter",
+    "<p>lead<div>block</div>tail</p>": "leadblocktail",
+    "<p>a<![CDATA[b]]>c</p>": "abc",
+}
+
+
+def malformed_page(body):
+    return ('<html><body><h1 id="firstHeading">T</h1><div id="mw-content-text">'
+            f'<div class="mw-parser-output">{body}<h2>S</h2><p>after</p></div></div></body></html>')
+
+
+def test_default_engine_is_bs4_for_malformed_markup():
+    if not os.getenv("HTML_PARSER"):
+        assert article_parser.get_engine() == "bs4"
+    for body, summary in MALFORMED.items():
+        assert article_parser.extract_article(malformed_page(body), engine="bs4")["summary"] == summary
+        if article_parser.LXML_AVAILABLE:
+            # Known divergence: the reason lxml is opt-in
+            assert article_parser.extract_article(malformed_page(body), engine="lxml")["summary"] != summary
+
+
+def benchmark(repeat=200):
+    """Rough per-page timing of each engine over the saved corpus."""
+    pages = list(load_corpus().values())
+    engines = ["bs4", "lxml"] if article_parser.LXML_AVAILABLE else ["bs4"]
+    for engine in engines:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for content in pages:
+                article_parser.extract_article(content, engine=engine)
+        elapsed = time.perf_counter() - start
+        print(f"{engine}: {elapsed / (repeat * len(pages)) * 1000:.3f} ms/page")
+
+
+if __name__ == "__main__":
+    test_corpus_present()
+    test_lxml_matches_beautifulsoup()
+    test_expected_fields()
+    test_default_engine_is_bs4_for_malformed_markup()
+    print("Parser parity tests passed!")
+    benchmark()
@@ -0,0 +1,130 @@
+import io
+import os
+import sys
+import json
+import tempfile
+
+# api/index.py creates its tables on import, so point it at a scratch
+# database before importing it (and leave the setting as it was after)
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+_directory = tempfile.mkdtemp()
+_saved_url = os.environ.get("DATABASE_URL")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_directory, 'quiz.db')}"
+try:
+    import api.index as index
+finally:
+    if _saved_url is None:
+        os.environ.pop("DATABASE_URL", None)
+    else:
+        os.environ["DATABASE_URL"] = _saved_url
+
+QUIZ_DATA = {"title": "Alan Turing", "quiz": [{"question": "Q1", "options": ["A", "B"], "answer": "A"}]}
+
+
+class FakeRequest(index.handler):
+    """Drives the Vercel handler without a socket."""
+
+    def __init__(self, method, path, headers=None, body=None):
+        self.path = path
+        self.headers = dict(headers or {})
+        self.rfile = io.BytesIO(json.dumps(body).encode() if body is not None else b"")
+        if body is not None:
+            self.headers["Content-Length"] = str(len(self.rfile.getvalue()))
+        self.wfile = io.BytesIO()
+        self.status = None
+        self.sent_headers = {}
+        getattr(self, f"do_{method}")()
+
+    def send_response(self, code, message=None):
+        self.status = code
+
+    def send_header(self, key, value):
+        self.sent_headers[key] = value
+
+    def end_headers(self):
+        pass
+
+    def send_error(self, code, message=None, explain=None):
+        self.status = code
+
+    def json(self):
+        return json.loads(self.wfile.getvalue())
+
+
+def new_quiz():
+    db = index.database.SessionLocal()
+    try:
+        quiz = index.models.Quiz(url="https://en.wikipedia.org/wiki/Alan_Turing", title="Alan Turing",
+                                 data=json.dumps(QUIZ_DATA))
+        db.add(quiz)
+        db.commit()
+        return quiz.id
+    finally:
+        db.close()
+
+
+def test_conditional_get_returns_304_until_results_are_saved():
+    quiz_id = new_quiz()
+    first = FakeRequest("GET", f"/api/quiz/{quiz_id}")
+    etag = first.sent_headers["ETag"]
+    assert first.status == 200 and first.json()["title"] == "Alan Turing"
+    assert "must-revalidate" in first.sent_headers["Cache-Control"]
+
+    again = FakeRequest("GET", f"/api/quiz/{quiz_id}", {"If-None-Match": etag})
+    assert again.status == 304 and again.wfile.getvalue() == b""
+    assert again.sent_headers["ETag"] == etag
+
+    saved = FakeRequest("PUT", f"/api/quiz/{quiz_id}/save-results", body={"user_answers": {"0": "A"}})
+    assert saved.status == 200 and saved.json()["quiz"]["score"] == 1
+
+    changed = FakeRequest("GET", f"/api/quiz/{quiz_id}", {"If-None-Match": etag})
+    assert changed.status == 200 and changed.sent_headers["ETag"] != etag
+    assert changed.json()["user_answers"] == {"0": "A"}
+
+
+def test_recreated_id_does_not_match_the_deleted_quiz():
+    quiz_id = new_quiz()
+    etag = FakeRequest("GET", f"/api/quiz/{quiz_id}").sent_headers["ETag"]
+    assert FakeRequest("DELETE", f"/api/quiz/{quiz_id}").status == 200
+    # SQLite hands the deleted newest row's id to the next quiz
+    assert new_quiz() == quiz_id
+    again = FakeRequest("GET", f"/api/quiz/{quiz_id}", {"If-None-Match": etag})
+    assert again.status == 200 and again.sent_headers["ETag"] != etag
+
+
+def test_fastapi_handler_revalidates_the_same_way():
+    from fastapi.testclient import TestClient
+    import backend.main as main
+
+    client = TestClient(main.app)
+    quiz_id = new_quiz()
+    first = client.get(f"/api/quiz/{quiz_id}")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and first.json()["title"] == "Alan Turing"
+    assert "must-revalidate" in first.headers["Cache-Control"]
+
+    again = client.get(f"/api/quiz/{quiz_id}", headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.content == b"" and again.headers["ETag"] == etag
+
+    assert client.delete(f"/api/quiz/{quiz_id}").status_code == 200
+    assert new_quiz() == quiz_id
+    recreated = client.get(f"/api/quiz/{quiz_id}", headers={"If-None-Match": etag})
+    assert recreated.status_code == 200 and recreated.headers["ETag"] != etag
+    etag = recreated.headers["ETag"]
+
+    assert client.put(f"/api/quiz/{quiz_id}/save-results", json={"user_answers": {"0": "A"}}).status_code == 200
+    changed = client.get(f"/api/quiz/{quiz_id}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+
+
+def test_missing_quiz_is_404():
+    assert FakeRequest("GET", "/api/quiz/999999", {"If-None-Match": "*"}).status == 404
+
+
+if __name__ == "__main__":
+    test_conditional_get_returns_304_until_results_are_saved()
+    test_recreated_id_does_not_match_the_deleted_quiz()
+    test_fastapi_handler_revalidates_the_same_way()
+    test_missing_quiz_is_404()
+    print("Quiz ETag tests passed!")
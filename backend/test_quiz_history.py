@@ -0,0 +1,183 @@
+import os
+import sys
+import json
+import time
+import datetime
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import sessionmaker
+
+import database
+import models
+import quiz_history
+
+QUIZ_DATA = {
+    "title": "Alan Turing",
+    "quiz": [
+        {"question": "Q1", "options": ["A", "B"], "answer": "A"},
+        {"question": "Q2", "options": ["A", "B"], "answer": "B"},
+        {"question": "Q3", "options": ["A", "B"], "answer": "A"},
+    ],
+}
+
+
+def with_history(fn, count=25):
+    """Run fn(session) against a temp database holding count quizzes, several per second."""
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'quiz.db')}")
+        database.Base.metadata.create_all(bind=engine)
+        session = sessionmaker(bind=engine)()
+        start = datetime.datetime(2025, 1, 1, 12, 0, 0)
+        for i in range(count):
+            session.add(models.Quiz(
+                url=f"https://en.wikipedia.org/wiki/Topic_{i}", title=f"Topic {i}",
+                summary="...", data=json.dumps(QUIZ_DATA),
+                created_at=start + datetime.timedelta(seconds=i // 3),
+            ))
+        session.commit()
+        try:
+            return fn(session)
+        finally:
+            session.close()
+            engine.dispose()
+
+
+def all_pages(session, limit, view="full"):
+    pages, cursor = [], None
+    while True:
+        items, cursor = quiz_history.list_quizzes(session, limit=limit, cursor=cursor, view=view)
+        pages.append(items)
+        if cursor is None:
+            return pages
+
+
+def test_cursor_pages_cover_every_quiz_once_in_order():
+    def run(session):
+        expected = [q.id for q in session.query(models.Quiz).order_by(
+            models.Quiz.created_at.desc(), models.Quiz.id.desc())]
+        return expected, all_pages(session, limit=10)
+
+    expected, pages = with_history(run)
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert [item["id"] for page in pages for item in page] == expected
+
+
+def test_exact_page_multiple_has_no_empty_tail():
+    pages = with_history(lambda session: all_pages(session, limit=5), count=10)
+    assert [len(page) for page in pages] == [5, 5]
+
+
+def test_offset_paging_still_works():
+    def run(session):
+        by_cursor = [item["id"] for page in all_pages(session, limit=10) for item in page]
+        by_offset, _ = quiz_history.list_quizzes(session, limit=10, skip=10)
+        return by_cursor[10:20], [item["id"] for item in by_offset]
+
+    by_cursor, by_offset = with_history(run)
+    assert by_offset == by_cursor
+
+
+def test_list_view_leaves_out_questions():
+    pages = with_history(lambda session: all_pages(session, limit=10, view="list"))
+    for item in (item for page in pages for item in page):
+        assert set(item) == set(quiz_history.LIST_FIELDS)
+        assert item["created_at"].startswith("2025-01-01")
+
+
+def test_cursor_survives_deleted_anchor():
+    def run(session):
+        first, cursor = quiz_history.list_quizzes(session, limit=4)
+        session.query(models.Quiz).filter(models.Quiz.id == first[-1]["id"]).delete()
+        session.commit()
+        second, _ = quiz_history.list_quizzes(session, limit=4, cursor=cursor)
+        return [item["id"] for item in first], [item["id"] for item in second]
+
+    first, second = with_history(run)
+    assert second and max(second) < min(first)
+
+
+def test_bad_arguments_raise_value_error():
+    for kwargs in ({"cursor": "not-a-cursor"}, {"view": "compact"}):
+        try:
+            with_history(lambda session: quiz_history.list_quizzes(session, **kwargs), count=1)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"expected ValueError for {kwargs}")
+
+
+def test_score_answers():
+    assert quiz_history.score_answers(QUIZ_DATA, {"0": "A", "1": "A", "2": "A"}) == 2
+    assert quiz_history.score_answers(json.dumps(QUIZ_DATA), json.dumps({"1": "B"})) == 1
+    assert quiz_history.score_answers(None, {"0": "A"}) == 0
+
+
+def test_etag_matching():
+    etag = quiz_history.quiz_etag(7, 2)
+    assert etag.startswith('"') and etag.endswith('"') and etag != quiz_history.quiz_etag(7, 3)
+    assert quiz_history.quiz_etag(7, None) == quiz_history.quiz_etag(7, 1)
+    assert quiz_history.etag_matches(etag, etag)
+    assert quiz_history.etag_matches(f'"other", W/{etag}', etag)
+    assert quiz_history.etag_matches("*", etag)
+    assert not quiz_history.etag_matches(quiz_history.quiz_etag(7, 1), etag)
+    assert quiz_history.quiz_etag(7, 2, "a1") != quiz_history.quiz_etag(7, 2, "b2")
+    assert not quiz_history.etag_matches(None, etag)
+
+
+def test_upgrade_adds_missing_columns_and_index():
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'old.db')}")
+        with engine.begin() as connection:
+            connection.execute(text(
+                "CREATE TABLE quizzes (id INTEGER PRIMARY KEY, url VARCHAR NOT NULL, title VARCHAR, "
+                "summary TEXT, data TEXT NOT NULL, user_answers TEXT, created_at DATETIME)"
+            ))
+            connection.execute(text("INSERT INTO quizzes (url, data) VALUES ('https://x', '{}')"))
+        added = database.upgrade_schema(engine)
+        with engine.connect() as connection:
+            versions = connection.execute(text("SELECT version FROM quizzes")).scalars().all()
+        inspector = inspect(engine)
+        columns = {column["name"] for column in inspector.get_columns("quizzes")}
+        indexes = {index["name"] for index in inspector.get_indexes("quizzes")}
+        again = database.upgrade_schema(engine)
+        engine.dispose()
+    assert added == ["quizzes.score", "quizzes.version", "quizzes.etag_token"]
+    assert {"score", "version", "etag_token"} <= columns
+    assert "ix_quizzes_created_at_id" in indexes
+    assert versions == [1] and again == []
+
+
+def benchmark(count=20000, limit=10):
+    """Time to fetch the last page of history: OFFSET versus the cursor."""
+    def run(session):
+        cursors, cursor = [], None
+        while True:
+            _, cursor = quiz_history.list_quizzes(session, limit=quiz_history.MAX_PAGE_SIZE,
+                                                  cursor=cursor, view="list")
+            if cursor is None:
+                break
+            cursors.append(cursor)
+        for name, kwargs in (("offset", {"skip": count - limit}), ("cursor", {"cursor": cursors[-1]})):
+            start = time.perf_counter()
+            for _ in range(20):
+                quiz_history.list_quizzes(session, limit=limit, view="list", **kwargs)
+            print(f"{name}: {(time.perf_counter() - start) / 20 * 1000:.2f} ms for the last page of {count}")
+
+    with_history(run, count=count)
+
+
+if __name__ == "__main__":
+    test_cursor_pages_cover_every_quiz_once_in_order()
+    test_exact_page_multiple_has_no_empty_tail()
+    test_offset_paging_still_works()
+    test_list_view_leaves_out_questions()
+    test_cursor_survives_deleted_anchor()
+    test_bad_arguments_raise_value_error()
+    test_score_answers()
+    test_etag_matching()
+    test_upgrade_adds_missing_columns_and_index()
+    print("Quiz history tests passed!")
+    benchmark()
@@ -0,0 +1,114 @@
+import os
+import sys
+import json
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import llm
+from llm_stream import QuizStreamParser, parse_quiz_output
+from fake_llm_server import load_response_text
+
+FULL = load_response_text()
+EXPECTED = json.loads(FULL)
+
+
+def test_complete_output_is_not_partial():
+    for text in (FULL, "```json\n" + FULL + "\n```", "Here is your quiz:\n" + FULL + "\nEnjoy!"):
+        quiz_data, partial = parse_quiz_output(text)
+        assert quiz_data == EXPECTED
+        assert partial is False
+
+
+def test_truncated_output_keeps_complete_questions():
+    # Cut the response at every point inside the quiz array and check that
+    # exactly the questions finished before the cut come back
+    parser = QuizStreamParser()
+    completed_at = []
+    for i, c in enumerate(FULL):
+        if parser.feed(c):
+            completed_at.append(i + 1)
+
+    for cut in range(completed_at[0], len(FULL) - 1, 37):
+        quiz_data, partial = parse_quiz_output("```json\n" + FULL[:cut])
+        expected_count = sum(1 for end in completed_at if end <= cut)
+        assert partial is True
+        assert quiz_data["quiz"] == EXPECTED["quiz"][:expected_count]
+
+
+def test_truncation_after_quiz_keeps_related_topics_only_if_complete():
+    text = json.dumps({"quiz": EXPECTED["quiz"], "related_topics": ["A", "B"]})
+    cut_inside_topics = text[:text.index('"B"')]
+    quiz_data, partial = parse_quiz_output(cut_inside_topics)
+    assert partial and quiz_data["quiz"] == EXPECTED["quiz"] and quiz_data["related_topics"] == []
+
+    reordered = json.dumps({"related_topics": ["A", "B"], "quiz": EXPECTED["quiz"]})
+    quiz_data, partial = parse_quiz_output(reordered[:-5])
+    assert partial and quiz_data["related_topics"] == ["A", "B"]
+
+
+def test_nothing_recoverable_raises():
+    for text in ("", "not json at all", '{"quiz": [{"question": "Cut off', "```json\n{"):
+        try:
+            parse_quiz_output(text)
+        except ValueError:
+            continue
+        raise AssertionError(f"expected ValueError for {text!r}")
+
+
+def test_json_without_questions_raises():
+    for text in ('{"error": "quota"}', '{"quiz": []}', '{"quiz": "none"}', '{"quiz": [{"question": "Q"}]}'):
+        try:
+            parse_quiz_output(text)
+        except ValueError as e:
+            assert "no usable quiz" in str(e)
+            continue
+        raise AssertionError(f"expected ValueError for {text!r}")
+
+    # Malformed questions are skipped; the well-formed ones are still recovered
+    good = {"question": "Q", "options": ["A", "B"], "answer": "A"}
+    quiz_data, partial = parse_quiz_output(json.dumps({"quiz": [good, {"question": "Q2"}]}))
+    assert partial and quiz_data["quiz"] == [good]
+
+
+def test_generate_quiz_data_returns_partial_result_uncached():
+    truncated = FULL[:FULL.index('"question"', FULL.index('"question"') + 1) + 20]
+    calls = []
+
+    def fake_call_llm(prompt_text, validate=None, backends=None):
+        calls.append(prompt_text)
+        return truncated, llm.GEMINI_MODELS[0]
+
+    stored = []
+    original_call, original_store = llm.call_llm, llm.llm_cache.store
+    original_lookup = llm.llm_cache.lookup
+    original_key = os.environ.get("GOOGLE_API_KEY")
+    llm.call_llm = fake_call_llm
+    llm.llm_cache.store = lambda *args: stored.append(args)
+    llm.llm_cache.lookup = lambda *args: None
+    os.environ["GOOGLE_API_KEY"] = "test-key"
+    try:
+        result = llm.generate_quiz_data({
+            "title": "Alan Turing", "summary": "", "sections": [],
+            "key_entities": {}, "full_text": "",
+        })
+    finally:
+        llm.call_llm, llm.llm_cache.store = original_call, original_store
+        llm.llm_cache.lookup = original_lookup
+        if original_key is None:
+            os.environ.pop("GOOGLE_API_KEY", None)
+        else:
+            os.environ["GOOGLE_API_KEY"] = original_key
+
+    assert result["partial"] is True
+    assert result["quiz"] == EXPECTED["quiz"][:1]
+    assert stored == []
+
+
+if __name__ == "__main__":
+    test_complete_output_is_not_partial()
+    test_truncated_output_keeps_complete_questions()
+    test_truncation_after_quiz_keeps_related_topics_only_if_complete()
+    test_nothing_recoverable_raises()
+    test_json_without_questions_raises()
+    test_generate_quiz_data_returns_partial_result_uncached()
+    print("Quiz parser tests passed!")
@@ -0,0 +1,165 @@
+import os
+import sys
+import json
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import llm
+import llm_cache
+from disk_cache import DiskCache
+from llm_stream import QuizStreamParser
+from fake_llm_server import start_server, load_response_text, FakeLLMHandler
+
+SCRAPED = {
+    "title": "Alan Turing",
+    "summary": "Alan Mathison Turing was an English mathematician.",
+    "sections": ["Early life", "Career"],
+    "key_entities": {"people": ["Alan Turing"], "organizations": [], "locations": []},
+    "full_text": "Alan Mathison Turing was an English mathematician and computer scientist.",
+}
+
+
+def with_fake_llm(fn, chunk_delay=0.02, failing_models=(), llm=llm, llm_cache=llm_cache):
+    # llm/llm_cache can be swapped for the module objects main.py imported
+    # (backend.llm when the project root is on sys.path)
+    server, api_base = start_server(chunk_delay=chunk_delay)
+    FakeLLMHandler.failing_models = set(failing_models)
+    FakeLLMHandler.request_log = []
+    original_base, original_cache = llm.GEMINI_API_BASE, llm_cache._cache
+    original_providers = llm.LLM_PROVIDERS
+    original_key = os.environ.get("GOOGLE_API_KEY")
+    with tempfile.TemporaryDirectory() as directory:
+        llm.GEMINI_API_BASE = api_base
+        llm.LLM_PROVIDERS = ["gemini"]
+        llm.llm_router.get_router().reset()
+        llm.circuit_breaker.reset()
+        llm_cache._cache = DiskCache(directory)
+        os.environ["GOOGLE_API_KEY"] = "test-key"
+        try:
+            return fn()
+        finally:
+            llm.GEMINI_API_BASE, llm_cache._cache = original_base, original_cache
+            llm.LLM_PROVIDERS = original_providers
+            llm.llm_router.get_router().reset()
+            llm.circuit_breaker.reset()
+            FakeLLMHandler.failing_models = set()
+            if original_key is None:
+                os.environ.pop("GOOGLE_API_KEY", None)
+            else:
+                os.environ["GOOGLE_API_KEY"] = original_key
+            server.shutdown()
+
+
+def test_parser_emits_each_question_once_complete():
+    expected = json.loads(load_response_text())["quiz"]
+    text = "```json\n" + load_response_text() + "\n```"
+    parser = QuizStreamParser()
+    emitted = []
+    positions = []
+    for i, c in enumerate(text):
+        for question in parser.feed(c):
+            emitted.append(question)
+            positions.append(i)
+    assert emitted == expected
+    # Each question is available before the response is over
+    assert positions[0] < len(text) // 2
+
+
+def test_parser_ignores_braces_inside_strings_and_other_arrays():
+    text = json.dumps({
+        "related_topics": [{"not": "a question"}],
+        "quiz": [{"question": "What does \"{[\" look like?", "options": ["}", "]"], "answer": "}"}],
+        "extra": [{"also": "not a question"}],
+    })
+    parser = QuizStreamParser()
+    emitted = []
+    for start in range(0, len(text), 7):
+        emitted.extend(parser.feed(text[start:start + 7]))
+    assert emitted == [{"question": "What does \"{[\" look like?", "options": ["}", "]"], "answer": "}"}]
+
+
+def test_stream_quiz_data_yields_questions_before_done():
+    def run():
+        start = time.perf_counter()
+        events = []
+        for kind, payload in llm.stream_quiz_data(SCRAPED):
+            events.append((kind, payload, time.perf_counter() - start))
+        return events
+
+    events = with_fake_llm(run)
+    expected = json.loads(load_response_text())
+    kinds = [kind for kind, _, _ in events]
+    assert kinds == ["question"] * len(expected["quiz"]) + ["done"]
+    first_question_at = events[0][2]
+    done_at = events[-1][2]
+    assert first_question_at < done_at / 2
+    done = events[-1][1]
+    assert done["quiz"] == expected["quiz"]
+    assert done["related_topics"] == expected["related_topics"]
+    assert done["model"] == llm.GEMINI_MODELS[0]
+
+
+def test_stream_falls_back_when_a_model_fails_before_output():
+    def run():
+        events = list(llm.stream_quiz_data(SCRAPED))
+        return events, list(FakeLLMHandler.request_log)
+
+    events, requests_made = with_fake_llm(run, chunk_delay=0, failing_models=[llm.GEMINI_MODELS[0]])
+    assert events[-1][0] == "done"
+    assert events[-1][1]["model"] == llm.GEMINI_MODELS[1]
+    assert [model for model, _ in requests_made] == llm.GEMINI_MODELS[:2]
+
+
+def test_stream_replays_cached_response():
+    def run():
+        first = list(llm.stream_quiz_data(SCRAPED))
+        second = list(llm.stream_quiz_data(SCRAPED))
+        return first, second, len(FakeLLMHandler.request_log)
+
+    first, second, request_count = with_fake_llm(run, chunk_delay=0)
+    assert first == second
+    assert request_count == 1
+
+
+def test_stream_endpoint_sends_ndjson():
+    from fastapi.testclient import TestClient
+    import main
+
+    async def fake_scrape(url, mode=None):
+        return SCRAPED
+
+    def no_db():
+        yield None
+
+    def run():
+        original_scrape, original_get_db = main.async_scraper.scrape_wikipedia_async, main.get_db
+        main.async_scraper.scrape_wikipedia_async = fake_scrape
+        main.get_db = no_db
+        try:
+            with TestClient(main.app) as client:
+                with client.stream("POST", "/api/quiz/stream",
+                                   json={"url": "https://en.wikipedia.org/wiki/Alan_Turing"}) as response:
+                    assert response.status_code == 200
+                    assert response.headers["content-type"].startswith("application/x-ndjson")
+                    return [json.loads(line) for line in response.iter_lines() if line]
+        finally:
+            main.async_scraper.scrape_wikipedia_async, main.get_db = original_scrape, original_get_db
+
+    events = with_fake_llm(run, chunk_delay=0, llm=main.llm, llm_cache=main.llm_cache)
+    types = [event["type"] for event in events]
+    assert types[0] == "article" and types[-1] == "done"
+    questions = [event for event in events if event["type"] == "question"]
+    assert [q["index"] for q in questions] == list(range(len(questions)))
+    assert events[-1]["data"]["quiz"] == [q["question"] for q in questions]
+
+
+if __name__ == "__main__":
+    test_parser_emits_each_question_once_complete()
+    test_parser_ignores_braces_inside_strings_and_other_arrays()
+    test_stream_quiz_data_yields_questions_before_done()
+    test_stream_falls_back_when_a_model_fails_before_output()
+    test_stream_replays_cached_response()
+    test_stream_endpoint_sends_ndjson()
+    print("Quiz streaming tests passed!")
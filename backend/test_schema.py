@@ -0,0 +1,114 @@
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import OperationalError
+
+import database
+import models
+
+
+def with_temp_engine(fn, watch=True):
+    """Run fn(engine) with database.init_db() pointed at a throwaway SQLite file."""
+    saved = database.engine, database._schema_ready
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'quiz.db')}",
+                               connect_args={"check_same_thread": False})
+        if watch:
+            database.watch_missing_tables(engine)
+        database.engine, database._schema_ready = engine, False
+        try:
+            return fn(engine)
+        finally:
+            database.engine, database._schema_ready = saved
+            engine.dispose()
+
+
+def count_statements(engine):
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+
+def test_schema_is_created_once():
+    def run(engine):
+        statements = count_statements(engine)
+        database.init_db()
+        first = len(statements)
+        for _ in range(100):
+            database.init_db()
+        return first, len(statements), database.schema_ready()
+
+    first, total, ready = with_temp_engine(run)
+    assert first > 0 and total == first
+    assert ready is True
+
+
+def test_missing_table_triggers_rebuild():
+    def run(engine):
+        database.init_db()
+        with engine.begin() as connection:
+            connection.execute(text("DROP TABLE quizzes"))
+        session = database.SessionLocal(bind=engine)
+        try:
+            session.query(models.Quiz).count()
+        except OperationalError as e:
+            assert database.is_missing_table_error(e)
+        else:
+            raise AssertionError("expected the dropped table to be missing")
+        finally:
+            session.close()
+        flagged = database.schema_ready()
+
+        database.init_db()
+        session = database.SessionLocal(bind=engine)
+        try:
+            return flagged, session.query(models.Quiz).count()
+        finally:
+            session.close()
+
+    assert with_temp_engine(run) == (False, 0)
+
+
+def test_other_errors_keep_the_schema_verified():
+    def run(engine):
+        database.init_db()
+        with engine.connect() as connection:
+            try:
+                connection.execute(text("SELECT nonexistent_column FROM quizzes"))
+            except OperationalError:
+                pass
+        return database.schema_ready()
+
+    assert with_temp_engine(run) is True
+
+
+def benchmark(requests=500):
+    """Per-request cost of the schema check: create_all every time versus the readiness flag."""
+    def run(engine):
+        database.init_db()
+        start = time.perf_counter()
+        for _ in range(requests):
+            database.Base.metadata.create_all(bind=engine)
+        before = (time.perf_counter() - start) / requests
+        start = time.perf_counter()
+        for _ in range(requests):
+            database.init_db()
+        after = (time.perf_counter() - start) / requests
+        return before, after
+
+    before, after = with_temp_engine(run, watch=False)
+    print(f"create_all per request: {before * 1e6:.1f} us")
+    print(f"init_db per request:    {after * 1e6:.2f} us ({before / after:.0f}x less)")
+
+
+if __name__ == "__main__":
+    test_schema_is_created_once()
+    test_missing_table_triggers_rebuild()
+    test_other_errors_keep_the_schema_verified()
+    print("Schema tests passed!")
+    benchmark()
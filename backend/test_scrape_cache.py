@@ -0,0 +1,95 @@
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import scrape_cache
+from disk_cache import DiskCache
+from scraper import scrape_wikipedia
+
+PAGE = b"""<html><body>
+<h1 id="firstHeading">Test Article</h1>
+<div id="mw-content-text"><div class="mw-parser-output">
+<p>Test Article is a page served by a local test server.</p>
+<h2>History</h2>
+<p>It was written by Alan Turing in London, England.</p>
+</div></div>
+</body></html>"""
+
+ETAG = '"v1"'
+
+
+class WikiHandler(BaseHTTPRequestHandler):
+    full_responses = 0
+    not_modified = 0
+
+    def do_GET(self):
+        if self.headers.get("If-None-Match") == ETAG:
+            WikiHandler.not_modified += 1
+            self.send_response(304)
+            self.end_headers()
+            return
+        WikiHandler.full_responses += 1
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("ETag", ETAG)
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_normalize_url():
+    assert scrape_cache.normalize_url("http://EN.m.wikipedia.org/wiki/Alan Turing#Life") == \
+        "https://en.wikipedia.org/wiki/Alan_Turing"
+    assert scrape_cache.normalize_url("https://en.wikipedia.org/wiki/Alan%5FTuring/") == \
+        "https://en.wikipedia.org/wiki/Alan_Turing"
+
+
+def test_cache_revalidates_with_etag():
+    scrape_cache._cache = DiskCache(tempfile.mkdtemp(), max_bytes=1024 * 1024)
+    server = HTTPServer(("127.0.0.1", 0), WikiHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/wiki/Test_Article"
+
+    try:
+        first = scrape_wikipedia(url)
+        assert first["title"] == "Test Article"
+        assert WikiHandler.full_responses == 1
+
+        # Fresh entry: no request at all
+        assert scrape_wikipedia(url) == first
+        assert WikiHandler.full_responses == 1
+        assert WikiHandler.not_modified == 0
+
+        # Stale entry: conditional GET answered with 304
+        original_fresh = scrape_cache.SCRAPE_CACHE_FRESH_SECONDS
+        scrape_cache.SCRAPE_CACHE_FRESH_SECONDS = 0
+        try:
+            assert scrape_wikipedia(url) == first
+        finally:
+            scrape_cache.SCRAPE_CACHE_FRESH_SECONDS = original_fresh
+        assert WikiHandler.full_responses == 1
+        assert WikiHandler.not_modified == 1
+    finally:
+        server.shutdown()
+
+
+def test_disk_cache_evicts_least_recently_used():
+    cache = DiskCache(tempfile.mkdtemp(), max_bytes=600)
+    for i in range(10):
+        cache.set(f"key-{i}", {"payload": "x" * 50})
+    assert cache.get("key-9") is not None
+    assert cache.get("key-0") is None
+    assert cache._scan_size() <= 600
+
+
+if __name__ == "__main__":
+    test_normalize_url()
+    test_cache_revalidates_with_etag()
+    test_disk_cache_evicts_least_recently_used()
+    print("Scrape cache tests passed!")
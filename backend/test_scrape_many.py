@@ -0,0 +1,94 @@
+import os
+import sys
+import time
+import json
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import scrape_cache
+import bulk_scrape
+from scraper import scrape_many
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'sample_data', 'pages')
+
+with open(os.path.join(PAGES_DIR, 'short_stub.html'), 'rb') as f:
+    PAGE = f.read()
+
+
+class SlowWikiHandler(BaseHTTPRequestHandler):
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with SlowWikiHandler.lock:
+            SlowWikiHandler.active += 1
+            SlowWikiHandler.peak = max(SlowWikiHandler.peak, SlowWikiHandler.active)
+        try:
+            time.sleep(0.05)
+            if self.path.endswith("/Missing"):
+                self.send_response(404)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=UTF-8")
+            self.send_header("Content-Length", str(len(PAGE)))
+            self.end_headers()
+            self.wfile.write(PAGE)
+        finally:
+            with SlowWikiHandler.lock:
+                SlowWikiHandler.active -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+def with_server(fn):
+    original = scrape_cache.SCRAPE_CACHE_ENABLED
+    scrape_cache.SCRAPE_CACHE_ENABLED = False
+    SlowWikiHandler.peak = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowWikiHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        return fn(f"http://127.0.0.1:{server.server_port}/wiki")
+    finally:
+        scrape_cache.SCRAPE_CACHE_ENABLED = original
+        server.shutdown()
+
+
+def test_scrape_many_reports_each_url():
+    def run(base):
+        urls = [f"{base}/Page_{i}" for i in range(12)] + [f"{base}/Missing"]
+        return urls, list(scrape_many(urls, concurrency=8, per_host=3))
+
+    urls, results = with_server(run)
+    assert sorted(r["url"] for r in results) == sorted(urls)
+    errors = [r for r in results if r["error"]]
+    assert len(errors) == 1 and errors[0]["url"].endswith("/Missing")
+    assert all(r["data"]["title"] == "ZetaIsland" for r in results if not r["error"])
+    # per-host limit holds even though 8 workers are available
+    assert SlowWikiHandler.peak <= 3
+
+
+def test_cli_writes_json_lines():
+    def run(base):
+        url_file = os.path.join(tempfile.mkdtemp(), "urls.txt")
+        out_file = url_file.replace(".txt", ".jsonl")
+        with open(url_file, "w") as f:
+            f.write(f"# curated list\n{base}/A\n\n{base}/B\n")
+        code = bulk_scrape.main([url_file, "--concurrency", "2", "--output", out_file])
+        with open(out_file) as f:
+            return code, [json.loads(line) for line in f]
+
+    code, lines = with_server(run)
+    assert code == 0
+    assert len(lines) == 2 and all(line["error"] is None for line in lines)
+
+
+if __name__ == "__main__":
+    test_scrape_many_reports_each_url()
+    test_cli_writes_json_lines()
+    print("scrape_many tests passed!")
@@ -0,0 +1,117 @@
+import os
+import sys
+import time
+import asyncio
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from singleflight import Group, AsyncGroup
+
+
+def test_concurrent_callers_share_one_call():
+    group = Group()
+    calls = []
+    release = threading.Event()
+
+    def pipeline(url):
+        calls.append(url)
+        release.wait(5)
+        return {"id": len(calls), "url": url}
+
+    results = []
+
+    def request():
+        results.append(group.do("alan_turing", pipeline, "alan_turing"))
+
+    threads = [threading.Thread(target=request) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    deadline = time.time() + 5
+    while group.in_flight().get("alan_turing") != 9 and time.time() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == ["alan_turing"]
+    assert all(result == {"id": 1, "url": "alan_turing"} for result, _ in results)
+    assert sorted(shared for _, shared in results) == [False] + [True] * 9
+    assert group.in_flight() == {}
+    # Finished calls are not cached
+    assert group.do("alan_turing", pipeline, "alan_turing") == ({"id": 2, "url": "alan_turing"}, False)
+
+
+def test_errors_reach_every_waiter():
+    group = Group()
+    started = threading.Event()
+    release = threading.Event()
+    errors = []
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise ValueError("Wikipedia page not found")
+
+    def request():
+        try:
+            group.do("missing", failing)
+        except ValueError as e:
+            errors.append(str(e))
+
+    leader = threading.Thread(target=request)
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=request)
+    follower.start()
+    while not group.in_flight().get("missing"):
+        time.sleep(0.01)
+    release.set()
+    leader.join()
+    follower.join()
+    assert errors == ["Wikipedia page not found"] * 2
+
+
+def test_async_callers_share_one_task():
+    calls = []
+
+    async def pipeline(url):
+        calls.append(url)
+        await asyncio.sleep(0.05)
+        return {"url": url}
+
+    async def main():
+        group = AsyncGroup()
+        results = await asyncio.gather(*[group.do(url, pipeline, url) for url in ["a"] * 5 + ["b"] * 3])
+        return results, group.in_flight()
+
+    results, in_flight = asyncio.run(main())
+    assert sorted(calls) == ["a", "b"]
+    assert [result for result, _ in results] == [{"url": "a"}] * 5 + [{"url": "b"}] * 3
+    assert [shared for _, shared in results] == [False] + [True] * 4 + [False] + [True] * 2
+    assert in_flight == {}
+
+
+def test_cancelled_caller_does_not_cancel_the_others():
+    async def pipeline():
+        await asyncio.sleep(0.05)
+        return "quiz"
+
+    async def main():
+        group = AsyncGroup()
+        leader = asyncio.ensure_future(group.do("key", pipeline))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(group.do("key", pipeline))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(main()) == ("quiz", True)
+
+
+if __name__ == "__main__":
+    test_concurrent_callers_share_one_call()
+    test_errors_reach_every_waiter()
+    test_async_callers_share_one_task()
+    test_cancelled_caller_does_not_cancel_the_others()
+    print("Single-flight tests passed!")
@@ -0,0 +1,100 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import mediawiki
+import scraper
+import topic_index
+from topic_index import TopicIndex
+from fake_mediawiki_server import start_server, FakeMediaWikiHandler
+
+
+def with_fake_api(fn):
+    server, api_url = start_server()
+    original_url = mediawiki.MEDIAWIKI_API_URL
+    mediawiki.MEDIAWIKI_API_URL = api_url
+    FakeMediaWikiHandler.request_log = []
+    topic_index.get_index().clear()
+    try:
+        return fn()
+    finally:
+        mediawiki.MEDIAWIKI_API_URL = original_url
+        topic_index.get_index().clear()
+        server.shutdown()
+
+
+def test_prefix_completion_is_sorted_and_case_insensitive():
+    index = TopicIndex()
+    index.remember("py", [
+        ("Python (programming language)", "https://en.wikipedia.org/wiki/Python_(programming_language)"),
+        ("Pyramid", "https://en.wikipedia.org/wiki/Pyramid"),
+        ("Pythagoras", "https://en.wikipedia.org/wiki/Pythagoras"),
+    ])
+    assert [t for t, _ in index.complete("PYTH")] == ["Pythagoras", "Python (programming language)"]
+    assert [t for t, _ in index.complete("py", limit=2)] == ["Pyramid", "Pythagoras"]
+    assert index.complete("Zeta") == []
+    assert index.title_url("pyramid") == "https://en.wikipedia.org/wiki/Pyramid"
+
+
+def test_search_results_expire():
+    index = TopicIndex(ttl=-1)
+    index.remember("turing", [("Alan Turing", "https://en.wikipedia.org/wiki/Alan_Turing")])
+    assert index.lookup("turing") is None
+    # Titles outlive the search that found them
+    assert index.title_url("Alan Turing") == "https://en.wikipedia.org/wiki/Alan_Turing"
+
+
+def test_index_is_bounded():
+    index = TopicIndex(max_titles=10)
+    for i in range(25):
+        index.remember(f"topic {i}", [(f"Title {i:02d}", f"https://en.wikipedia.org/wiki/Title_{i:02d}")])
+    assert len(index.complete("title", limit=100)) <= 10
+    assert index.title_url("Title 24")
+    assert index.title_url("Title 00") is None
+
+
+def test_search_wikipedia_uses_cache():
+    def run():
+        first = scraper.search_wikipedia("Alan")
+        second = scraper.search_wikipedia("alan")
+        # Exact title of an earlier result: no search needed either
+        third = scraper.search_wikipedia("Alan Turing")
+        return first, second, third, list(FakeMediaWikiHandler.request_log)
+
+    first, second, third, requests_made = with_fake_api(run)
+    assert first == second == third == "https://en.wikipedia.org/wiki/Alan_Turing"
+    assert requests_made == [["opensearch", "Alan"]]
+
+
+def test_autocomplete_seeds_then_serves_locally():
+    def run():
+        first = scraper.autocomplete_topics("Py", limit=5)
+        second = scraper.autocomplete_topics("Pyth", limit=5)
+        return first, second, list(FakeMediaWikiHandler.request_log)
+
+    first, second, requests_made = with_fake_api(run)
+    assert [r["title"] for r in first] == ["Python (programming language)"]
+    assert second == first
+    # "Py" returned fewer titles than asked for, so it was every match and
+    # "Pyth" is answered from the index
+    assert requests_made == [["opensearch", "Py"]]
+
+
+def test_covers_only_exhaustive_prefixes():
+    index = TopicIndex()
+    index.remember("al", [("Alan Turing", "https://en.wikipedia.org/wiki/Alan_Turing")], exhaustive=True)
+    index.remember("py", [("Pyramid", "https://en.wikipedia.org/wiki/Pyramid")], exhaustive=False)
+    assert index.covers("Alan T")
+    assert not index.covers("pyr")
+    assert not index.covers("z")
+
+
+if __name__ == "__main__":
+    test_prefix_completion_is_sorted_and_case_insensitive()
+    test_search_results_expire()
+    test_index_is_bounded()
+    test_search_wikipedia_uses_cache()
+    test_autocomplete_seeds_then_serves_locally()
+    test_covers_only_exhaustive_prefixes()
+    print("Topic index tests passed!")
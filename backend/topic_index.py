@@ -0,0 +1,122 @@
+import os
+import time
+import bisect
+import threading
+
+# How long an opensearch answer for a topic is reused before asking again
+TOPIC_CACHE_TTL = int(os.getenv("TOPIC_CACHE_TTL", str(24 * 3600)))
+# Titles remembered for prefix lookups; the oldest half is dropped past this
+TOPIC_INDEX_MAX_TITLES = int(os.getenv("TOPIC_INDEX_MAX_TITLES", "50000"))
+
+
+def normalize_topic(text: str) -> str:
+    """Case-insensitive form used for both topic and title keys."""
+    return " ".join(text.replace("_", " ").split()).casefold()
+
+
+class TopicIndex:
+    """
+    In-process memory of Wikipedia searches.
+
+    Holds two things:
+      - search results per normalized topic, reused for TOPIC_CACHE_TTL seconds
+      - a sorted array of every title seen in those results, so exact title
+        and prefix lookups are a bisect instead of an opensearch round-trip
+    """
+
+    def __init__(self, ttl: int = TOPIC_CACHE_TTL, max_titles: int = TOPIC_INDEX_MAX_TITLES):
+        self.ttl = ttl
+        self.max_titles = max_titles
+        self._lock = threading.Lock()
+        self._searches = {}  # normalized topic -> (stored_at, [(title, url), ...], exhaustive)
+        self._titles = {}  # normalized title -> (stored_at, title, url)
+        self._sorted_keys = []  # sorted normalized titles, for prefix scans
+
+    def lookup(self, topic: str):
+        """Cached results for topic as [(title, url), ...], or None when unknown or expired."""
+        key = normalize_topic(topic)
+        with self._lock:
+            entry = self._searches.get(key)
+            if entry is None:
+                return None
+            stored_at, results, _ = entry
+            if time.time() - stored_at > self.ttl:
+                del self._searches[key]
+                return None
+            return list(results)
+
+    def title_url(self, title: str):
+        """URL of a previously seen title (case-insensitive exact match), or None."""
+        with self._lock:
+            entry = self._titles.get(normalize_topic(title))
+            return entry[2] if entry else None
+
+    def covers(self, prefix: str) -> bool:
+        """
+        True when a fresh exhaustive search for prefix, or for a shorter
+        prefix of it, is on record, so the index already holds every match.
+        """
+        key = normalize_topic(prefix)
+        now = time.time()
+        with self._lock:
+            for end in range(1, len(key) + 1):
+                entry = self._searches.get(key[:end])
+                if entry and entry[2] and now - entry[0] <= self.ttl:
+                    return True
+        return False
+
+    def remember(self, topic: str, results, exhaustive: bool = False) -> None:
+        """
+        Record the search results for topic and index their titles.
+        exhaustive marks results that are every match for topic (the search
+        returned fewer than it asked for).
+        """
+        results = [(title, url) for title, url in results]
+        now = time.time()
+        with self._lock:
+            self._searches[normalize_topic(topic)] = (now, results, exhaustive)
+            for title, url in results:
+                key = normalize_topic(title)
+                if key not in self._titles:
+                    bisect.insort(self._sorted_keys, key)
+                self._titles[key] = (now, title, url)
+            if len(self._titles) > self.max_titles:
+                self._drop_oldest()
+
+    def complete(self, prefix: str, limit: int = 10):
+        """Up to limit indexed titles starting with prefix, as [(title, url), ...] in title order."""
+        prefix = normalize_topic(prefix)
+        matches = []
+        with self._lock:
+            position = bisect.bisect_left(self._sorted_keys, prefix)
+            while position < len(self._sorted_keys) and len(matches) < limit:
+                key = self._sorted_keys[position]
+                if not key.startswith(prefix):
+                    break
+                _, title, url = self._titles[key]
+                matches.append((title, url))
+                position += 1
+        return matches
+
+    def clear(self) -> None:
+        with self._lock:
+            self._searches.clear()
+            self._titles.clear()
+            self._sorted_keys = []
+
+    def _drop_oldest(self):
+        # Rebuilding the sorted array is O(n log n) but only happens once per
+        # max_titles / 2 insertions
+        by_age = sorted(self._titles.items(), key=lambda item: item[1][0])
+        for key, _ in by_age[:len(by_age) // 2]:
+            del self._titles[key]
+        self._sorted_keys = sorted(self._titles)
+        # Recorded searches may refer to dropped titles and no longer cover their prefix
+        self._searches.clear()
+
+
+_index = TopicIndex()
+
+
+def get_index() -> TopicIndex:
+    return _index
@@ -19,7 +19,8 @@ function App() {
   const fetchHistory = async () => {
     try {
       const isProduction = process.env.NODE_ENV === 'production';
-      const apiUrl = isProduction ? '/api/quizzes' : 'http://localhost:8001/api/quizzes';
+      // The list view leaves out the questions; they are fetched when a quiz is opened
+      const apiUrl = isProduction ? '/api/quizzes?view=list' : 'http://localhost:8001/api/quizzes?view=list';
       const response = await fetch(apiUrl);
       if (response.ok) {
         const data = await response.json();
@@ -30,12 +31,24 @@ function App() {
     }
   };
 
-  const loadQuizFromHistory = (quiz) => {
-    setQuizData(quiz);
-    setUserAnswers(quiz.user_answers || {});
-    setShowResults(!!quiz.user_answers && Object.keys(quiz.user_answers).length > 0);
-    setShowHistory(false);
-    setError(null);
+  const loadQuizFromHistory = async (entry) => {
+    try {
+      const isProduction = process.env.NODE_ENV === 'production';
+      const apiUrl = isProduction ? `/api/quiz/${entry.id}` : `http://localhost:8001/api/quiz/${entry.id}`;
+      const response = await fetch(apiUrl);
+      if (!response.ok) {
+        throw new Error(`Error ${response.status}: Failed to load quiz`);
+      }
+      const quiz = await response.json();
+      setQuizData(quiz);
+      setUserAnswers(quiz.user_answers || {});
+      setShowResults(!!quiz.user_answers && Object.keys(quiz.user_answers).length > 0);
+      setShowHistory(false);
+      setError(null);
+    } catch (err) {
+      console.error("Failed to load quiz:", err);
+      alert("Error loading quiz");
+    }
   };
 
   const deleteQuiz = async (e, quizId) => {
@@ -270,7 +283,10 @@ function App() {
                         ×
                       </button>
                     </div>
-                    <p>{new Date(quiz.created_at).toLocaleDateString()}</p>
+                    <p>
+                      {new Date(quiz.created_at).toLocaleDateString()}
+                      {quiz.score != null && ` · Score: ${quiz.score}`}
+                    </p>
                   </div>
                 ))}
               </div>